@@ -0,0 +1,66 @@
+"""
+bench_login_throttling.py - Measure what a refused login attempt costs.
+
+Floods the login throttle with attempts on one username from many IPs,
+like a password guessing script, and times the attempts it refuses
+(`check` raising `LoginThrottled`, then the 429 page render) against one
+bcrypt check at the configured cost, which each of them would have cost
+without the throttle. Also reports how many attempts got through.
+
+Usage (from the repository root):
+    python benchmarks/bench_login_throttling.py [--attempts 20000]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import bcrypt  # noqa: E402
+
+from epic_event.settings import BCRYPT_ROUNDS  # noqa: E402
+from epic_event.throttling import LoginThrottle, LoginThrottled  # noqa: E402
+from epic_event.views import home  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--attempts", type=int, default=20000)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    throttle = LoginThrottle()
+    refused = 0
+    refused_time = 0.0
+    home()
+    for attempt in range(args.attempts):
+        client_ip = f"10.{attempt // 65536 % 256}.{attempt // 256 % 256}." \
+                    f"{attempt % 256}"
+        start = time.perf_counter()
+        try:
+            throttle.check(client_ip, "Admin")
+        except LoginThrottled as e:
+            home(str(e))
+            refused += 1
+            refused_time += time.perf_counter() - start
+        else:
+            throttle.record(client_ip, "Admin", False)
+
+    hashed = bcrypt.hashpw(b"mypassword", bcrypt.gensalt(BCRYPT_ROUNDS))
+    start = time.perf_counter()
+    bcrypt.checkpw(b"wrong", hashed)
+    bcrypt_ms = (time.perf_counter() - start) * 1000
+
+    print(f"attempts {args.attempts}, let through "
+          f"{args.attempts - refused}, refused {refused}")
+    print(f"refused attempt:      {refused_time / max(refused, 1) * 1e6:8.1f} "
+          f"us")
+    print(f"bcrypt check (cost {BCRYPT_ROUNDS}): {bcrypt_ms * 1000:8.1f} us")
+    print(throttle.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+bench_pagination.py - Measure keyset pagination against the table size.
+
+Fills an in-memory database with clients, then times, for several sort
+fields, the whole ordered list (`order_by_fields`, what list pages used to
+load) and one keyset page (`keyset_page`) taken at the start, the middle
+and the end of the list. The rows fetched by a page stay the same whatever
+the table size.
+
+Usage (from the repository root):
+    python benchmarks/bench_pagination.py [--rows 10000 100000] [--limit 50]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from epic_event.models import Client, Collaborator, Database  # noqa: E402
+
+FIELDS = ("id", "company_name", "commercial.full_name")
+
+
+def make_session(rows):
+    """Return a session on a database holding `rows` clients."""
+    db = Database(":memory:")
+    db.initialize_database()
+    session = db.get_session()
+    commercials = [Collaborator(password=b"x", full_name=f"Commercial {i}",
+                                email=f"c{i}@epic.fr", role="gestion")
+                   for i in range(20)]
+    session.add_all(commercials)
+    session.flush()
+    session.bulk_insert_mappings(Client, [
+        {"full_name": f"Client {i}", "email": f"{i}@client.fr",
+         "company_name": f"Company {i % 997}" if i % 13 else None,
+         "created_date": date(2020, 1, 1) + timedelta(days=i % 1500),
+         "id_commercial": commercials[i % 20].id if i % 7 else None}
+        for i in range(rows)])
+    session.commit()
+    return session
+
+
+def timed(function, repeat=5):
+    """Return the best time of `repeat` calls, in ms, and the last result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, nargs="+",
+                        default=[10000, 100000])
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(f"{'rows':>7} {'field':<22} {'full list ms':>13} "
+          f"{'first ms':>9} {'middle ms':>10} {'last ms':>8}")
+    for rows in args.rows:
+        session = make_session(rows)
+        for field in FIELDS:
+            full_ms, items = timed(
+                lambda: Client.order_by_fields(session, field), repeat=1)
+            cursors = [None, items[rows // 2].id, items[-args.limit - 1].id]
+            pages_ms = [timed(lambda: Client.keyset_page(
+                session, field, after=cursor, limit=args.limit))[0]
+                for cursor in cursors]
+            session.expunge_all()
+            print(f"{rows:7d} {field:<22} {full_ms:13.1f} "
+                  f"{pages_ms[0]:9.2f} {pages_ms[1]:10.2f} "
+                  f"{pages_ms[2]:8.2f}")
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+bench_password_hashing.py - Measure page latency during a burst of logins.
+
+Starts a burst of logins (bcrypt checks at the default cost), each in its
+own thread like in the threaded server, and meanwhile times a page-sized
+piece of Python work (rendering a template) in another thread. The burst
+runs once with bcrypt inline in the login threads, then once in the
+bounded `PasswordHashingService`, reporting the page latency (median and
+maximum), the duration of the burst and the logins refused as busy.
+
+Usage (from the repository root):
+    python benchmarks/bench_password_hashing.py [--logins 32] [--workers 2]
+                                                [--queue-size 32]
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import bcrypt  # noqa: E402
+
+from epic_event.models import collaborator  # noqa: E402
+from epic_event.password_hashing import (PasswordHashingBusy,  # noqa: E402
+                                         PasswordHashingService)
+from epic_event.render_engine import TemplateRenderer  # noqa: E402
+
+HASHED = bcrypt.hashpw(b"mypassword", bcrypt.gensalt())
+
+
+def render_page(renderer):
+    """Render the home page, a stand-in for a page load."""
+    renderer.render_template("index.html", {"error": ""})
+
+
+def burst(logins):
+    """Run the logins and time page renders meanwhile."""
+    renderer = TemplateRenderer()
+    render_page(renderer)
+    latencies = []
+    busy = []
+    done = threading.Event()
+
+    def login():
+        try:
+            collaborator._run_bcrypt(bcrypt.checkpw, b"mypassword", HASHED)
+        except PasswordHashingBusy:
+            busy.append(1)
+
+    def pages():
+        while not done.is_set():
+            start = time.perf_counter()
+            render_page(renderer)
+            latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.005)
+
+    page_thread = threading.Thread(target=pages)
+    page_thread.start()
+    start = time.perf_counter()
+    threads = [threading.Thread(target=login) for _ in range(logins)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    page_thread.join()
+    return latencies, elapsed, len(busy)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=32)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    service = PasswordHashingService(args.workers, args.queue_size)
+    print(f"{'bcrypt':<8} {'page p50 ms':>12} {'page max ms':>12} "
+          f"{'burst s':>8} {'busy':>5}")
+    try:
+        for name, executor in (("inline", None), ("pool", service)):
+            collaborator.password_executor = executor
+            latencies, elapsed, busy = burst(args.logins)
+            print(f"{name:<8} {statistics.median(latencies):12.2f} "
+                  f"{max(latencies):12.2f} {elapsed:8.2f} {busy:5d}")
+    finally:
+        collaborator.password_executor = None
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
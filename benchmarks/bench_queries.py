@@ -0,0 +1,116 @@
+"""
+bench_queries.py - Count the SQL queries run to render list and detail pages.
+
+Fills an in-memory database, then renders each list page (sorted by every
+sortable field) and a detail page of each entity through the views,
+counting the statements sent to the database, including the one loading
+the logged-in user. With the models' `load_plans`, the count does not
+depend on the number of rows; pass --no-plans to compare with lazy
+loading. The fragment cache is emptied
+before each render, so every row reads its relationships.
+
+Usage (from the repository root):
+    python benchmarks/bench_queries.py [--rows 10 100] [--no-plans]
+"""
+import argparse
+import logging
+import os
+import sys
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from sqlalchemy import event  # noqa: E402
+
+from epic_event import views  # noqa: E402
+from epic_event import sessions  # noqa: E402
+from epic_event.models import (Client, Collaborator, Contract,  # noqa: E402
+                               Database, Event)
+from epic_event.render_engine import fragment_cache  # noqa: E402
+
+
+
+def make_session(rows):
+    """Return a session on a database holding `rows` objects per table."""
+    db = Database(":memory:")
+    db.initialize_database()
+    session = db.get_session()
+    admin = Collaborator(password=b"x", full_name="Admin",
+                         email="admin@epic.fr", role="admin")
+    staff = [Collaborator(password=b"x", full_name=f"Collaborator {i}",
+                          email=f"c{i}@epic.fr",
+                          role=("commercial", "support", "gestion")[i % 3])
+             for i in range(rows)]
+    clients = [Client(full_name=f"Client {i}", email=f"{i}@client.fr",
+                      company_name=f"Company {i}", created_date=date.today(),
+                      commercial=staff[i])
+               for i in range(rows)]
+    contracts = [Contract(total_amount="1000", amount_due="10",
+                          signed=True, client=clients[i])
+                 for i in range(rows)]
+    events = [Event(title=f"Event {i}", start_date=datetime(2025, 1, 1),
+                    end_date=datetime(2025, 1, 2), participants=10,
+                    contract=contracts[i],
+                    support=staff[i] if i % 2 else None)
+              for i in range(rows)]
+    session.add_all([admin] + staff + clients + contracts + events)
+    session.commit()
+    return db, session, admin.id
+
+
+def count_queries(db, session, user_id, view, *args, **kwargs):
+    """Render a view with an empty session and return the queries run."""
+    queries = []
+
+    def count(*_):
+        queries.append(1)
+
+    session.expunge_all()
+    headers = {"Cookie": "session_id="
+                         f"{sessions.session_store.create(user_id, 'admin')}"}
+    fragment_cache.clear()
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        page = view(*args, session=session, headers=headers, **kwargs)
+        if not isinstance(page, str):
+            page = page.text()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+    return len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--no-plans", action="store_true",
+                        help="disable the models' load plans")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    if args.no_plans:
+        for model in (Client, Collaborator, Contract, Event):
+            model.load_plans = {}
+
+    results = {}
+    for rows in args.rows:
+        db, session, admin_id = make_session(rows)
+        for model in (Client, Contract, Event, Collaborator):
+            name = model.__tablename__
+            for field in model.sortable_fields:
+                results.setdefault((name, field), []).append(count_queries(
+                    db, session, admin_id, views.entity_list_view,
+                    {"sort": [field], "per_page": [str(rows)]},
+                    entity_name=name))
+            results.setdefault((name, "detail"), []).append(count_queries(
+                db, session, admin_id, views.entity_detail_view, 2,
+                entity_name=name))
+        session.close()
+
+    print(f"{'page':<44}" + "".join(f"{rows:>8}" for rows in args.rows))
+    for (name, field), counts in results.items():
+        label = f"/{name} {'detail' if field == 'detail' else 'sort=' + field}"
+        print(f"{label:<44}" + "".join(f"{count:8d}" for count in counts))
+
+
+if __name__ == "__main__":
+    main()
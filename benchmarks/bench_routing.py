@@ -0,0 +1,66 @@
+"""
+bench_routing.py - Measure the cost of route matching.
+
+Lists the routes of the application, then times `RouteTable.match` on a
+set of representative paths, first with the application routes only and
+then with a growing number of extra routes: the cost per match should stay
+flat, since it only depends on the depth of the path.
+
+Usage (from the repository root):
+    python benchmarks/bench_routing.py [--extra 10 100 1000]
+"""
+import argparse
+import copy
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from epic_event.router import route_table  # noqa: E402
+
+PATHS = [
+    ("GET", "/"),
+    ("GET", "/events"),
+    ("GET", "/events/12/"),
+    ("GET", "/contracts/3/update/"),
+    ("POST", "/collaborators/7/password"),
+    ("GET", "/static/images/logoepicevent.webp"),
+    ("GET", "/unknown/1/2/3"),
+]
+
+
+def time_matches(table, number):
+    """Return the mean time of one match, in microseconds."""
+    def run():
+        for method, path in PATHS:
+            table.match(method, path)
+    seconds = timeit.timeit(run, number=number)
+    return seconds / (number * len(PATHS)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--extra", type=int, nargs="+",
+                        default=[10, 100, 1000])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    for route in route_table.routes():
+        print(f"{route.method:<5} {route.pattern:<38} {route.handler}")
+    print()
+
+    print(f"{'routes':>7} {'µs/match':>9}")
+    print(f"{len(route_table.routes()):7d} "
+          f"{time_matches(route_table, args.number):9.2f}")
+    for extra in args.extra:
+        table = copy.deepcopy(route_table)
+        for i in range(extra):
+            table.add("GET", f"/extra{i}/<int:pk>/action{i}", "handler")
+        print(f"{len(table.routes()):7d} "
+              f"{time_matches(table, args.number):9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+bench_server_engines.py - Compare the HTTP server engines.
+
+Starts each engine in-process on a throw-away copy of the test database and
+measures:
+- throughput and latency of concurrent clients requesting pages and
+    static files;
+- the latency of a normal request while slow clients hold connections
+    open without finishing their request.
+
+Engines compared:
+- http: `HTTPServer`, the historical single-threaded server;
+- http-threaded: `ThreadingHTTPServer` with request-scoped sessions;
+- asyncio: `AsyncHTTPServer`.
+
+Usage (from the repository root):
+    python benchmarks/bench_server_engines.py [--clients 16] [--requests 50]
+"""
+import argparse
+import asyncio
+import http.client
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from epic_event.async_server import AsyncHTTPServer  # noqa: E402
+from epic_event.models import Database  # noqa: E402
+from epic_event.models.utils import load_test_data_in_database  # noqa: E402
+from epic_event.router import MyHandler  # noqa: E402
+
+PATHS = ["/", "/static/styles.css"]
+
+
+def start_http(threaded):
+    MyHandler.request_scoped_sessions = threaded
+    server_class = ThreadingHTTPServer if threaded else HTTPServer
+    httpd = server_class(("127.0.0.1", 0), MyHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+
+    def stop():
+        httpd.shutdown()
+        httpd.server_close()
+
+    return httpd.server_address[1], stop
+
+
+def start_asyncio():
+    server = AsyncHTTPServer(("127.0.0.1", 0))
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(server.start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def cancel_connections():
+        server.server.close()
+        for task in asyncio.all_tasks():
+            if task is not asyncio.current_task():
+                task.cancel()
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(cancel_connections(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        server.close()
+        loop.close()
+
+    return server.server_address[1], stop
+
+
+ENGINES = {
+    "http": lambda: start_http(threaded=False),
+    "http-threaded": lambda: start_http(threaded=True),
+    "asyncio": start_asyncio,
+}
+
+
+def client(port, requests, timeout):
+    """Send `requests` GETs, reusing the connection when allowed."""
+    latencies, errors = [], 0
+    connection = http.client.HTTPConnection("127.0.0.1", port,
+                                            timeout=timeout)
+    for i in range(requests):
+        start = time.perf_counter()
+        try:
+            connection.request("GET", PATHS[i % len(PATHS)])
+            response = connection.getresponse()
+            response.read()
+            if response.will_close:
+                connection.close()
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            continue
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+    return latencies, errors
+
+
+def run_load(port, clients, requests, timeout):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(lambda _: client(port, requests, timeout),
+                                range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies = [lat for lats, _ in results for lat in lats]
+    errors = sum(err for _, err in results)
+    return latencies, errors, elapsed
+
+
+def open_slow_clients(port, count):
+    """Open connections that send an unfinished request and then stall."""
+    sockets = []
+    for _ in range(count):
+        sock = socket.create_connection(("127.0.0.1", port))
+        sock.sendall(b"GET / HTTP/1.1\r\nHost: bench\r\n")
+        sockets.append(sock)
+    return sockets
+
+
+def describe(latencies):
+    if not latencies:
+        return "      -         -"
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    return (f"{statistics.median(ordered) * 1000:7.1f}ms "
+            f"{p95 * 1000:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--slow-clients", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES),
+                        choices=list(ENGINES))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = Database(os.path.join(tmp, "bench.db"))
+        database.initialize_database()
+        load_test_data_in_database(database.get_session())
+        MyHandler.database = database
+        MyHandler.session = database.get_session()
+
+        print(f"{'engine':<14} {'scenario':<12} {'req/s':>8} "
+              f"{'median':>9} {'p95':>9} {'errors':>7}")
+        for name in args.engines:
+            port, stop = ENGINES[name]()
+            try:
+                latencies, errors, elapsed = run_load(
+                    port, args.clients, args.requests, args.timeout)
+                print(f"{name:<14} {'load':<12} "
+                      f"{len(latencies) / elapsed:8.0f} "
+                      f"{describe(latencies)} {errors:7d}")
+
+                slow = open_slow_clients(port, args.slow_clients)
+                try:
+                    latencies, errors, elapsed = run_load(
+                        port, 1, 10, args.timeout)
+                finally:
+                    for sock in slow:
+                        sock.close()
+                print(f"{name:<14} {'slow-clients':<12} "
+                      f"{len(latencies) / elapsed:8.0f} "
+                      f"{describe(latencies)} {errors:7d}")
+            finally:
+                stop()
+
+
+if __name__ == "__main__":
+    main()
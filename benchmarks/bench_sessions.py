@@ -0,0 +1,91 @@
+"""
+bench_sessions.py - Compare the cost of the session store backends.
+
+Opens sessions in each backend, then times the check `login_required`
+makes on every request (`get`), the login (`create`) and the archive
+toggle (`set_display_archive`). The SQLite backends use a database file
+in a temporary directory, with the application's performance profile.
+
+Usage (from the repository root):
+    python benchmarks/bench_sessions.py [--sessions 10000] [--lookups 20000]
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from sqlalchemy import create_engine, event  # noqa: E402
+
+from epic_event.sessions import (MemorySessionStore,  # noqa: E402
+                                 SignedCookieSessionStore, SQLiteSessionStore)
+from epic_event.settings import SQLITE_PERFORMANCE_PROFILE  # noqa: E402
+
+
+def make_engine(path):
+    """Return an engine applying the performance profile."""
+    engine = create_engine(f"sqlite:///{path}")
+
+    @event.listens_for(engine, "connect")
+    def apply_pragmas(dbapi_connection, _):
+        for name, value in SQLITE_PERFORMANCE_PROFILE.items():
+            dbapi_connection.execute(f"PRAGMA {name} = {value}")
+
+    return engine
+
+
+def per_call_us(function, arguments):
+    """Return the average time of `function(argument)`, in microseconds."""
+    start = time.perf_counter()
+    for argument in arguments:
+        function(argument)
+    return (time.perf_counter() - start) / len(arguments) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(f"{'backend':<24} {'create us':>10} {'get us':>8} "
+          f"{'toggle us':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        engines = []
+        stores = {
+            "memory": MemorySessionStore(max_entries=0),
+            "sqlite": SQLiteSessionStore(
+                make_engine(os.path.join(directory, "sqlite.db"))),
+            "signed": SignedCookieSessionStore({"1": b"secret"}, "1"),
+            "signed + revocations": SignedCookieSessionStore(
+                {"1": b"secret"}, "1",
+                engine=make_engine(os.path.join(directory, "signed.db"))),
+        }
+        for name, store in stores.items():
+            engine = getattr(store, "engine", None)
+            if engine is not None:
+                engines.append(engine)
+            users = range(args.sessions)
+            create_us = per_call_us(lambda user: store.create(user, "admin"),
+                                    users)
+            ids = [store.create(user, "admin") for user in users]
+            lookups = random.choices(ids, k=args.lookups)
+            get_us = per_call_us(store.get, lookups)
+            toggle_us = per_call_us(
+                lambda session_id: store.set_display_archive(session_id,
+                                                             True),
+                lookups[:1000])
+            print(f"{name:<24} {create_us:10.1f} {get_us:8.1f} "
+                  f"{toggle_us:10.1f}")
+        for engine in engines:
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
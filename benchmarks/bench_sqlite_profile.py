@@ -0,0 +1,132 @@
+"""
+bench_sqlite_profile.py - Compare SQLite's defaults with the tuned profile.
+
+Creates a database file in a temporary directory for each profile, then
+measures:
+    - the latency of small write transactions, one commit each (average
+      and 95th percentile);
+    - the reads completed per second by several reader threads while a
+      writer keeps committing. With the rollback journal, readers wait for
+      (or fail on) the writer's lock; in WAL mode they read the last
+      committed state.
+
+Usage (from the repository root):
+    python benchmarks/bench_sqlite_profile.py [--writes 500] [--readers 4]
+                                              [--seconds 3]
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from sqlalchemy import func, select  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from epic_event.models import Client, Database  # noqa: E402
+from epic_event.settings import SQLITE_PERFORMANCE_PROFILE  # noqa: E402
+
+PROFILES = {
+    "default": None,
+    "tuned": SQLITE_PERFORMANCE_PROFILE,
+}
+
+
+def make_database(directory, name, pragmas, rows=1000):
+    """Return a database file holding `rows` clients."""
+    db = Database(os.path.join(directory, f"{name}.db"), pragmas)
+    db.initialize_database()
+    with db.session_scope() as session:
+        session.bulk_insert_mappings(Client, [
+            {"full_name": f"Client {i}", "email": f"{i}@client.fr",
+             "company_name": f"Company {i % 97}",
+             "created_date": date(2024, 1, 1)}
+            for i in range(rows)])
+        session.commit()
+    return db
+
+
+def write_latencies(db, writes):
+    """Commit `writes` single-row transactions, return their times in ms."""
+    latencies = []
+    for i in range(writes):
+        start = time.perf_counter()
+        with db.session_scope() as session:
+            session.add(Client(full_name=f"Writer {i}",
+                               email=f"w{i}-{time.time_ns()}@client.fr"))
+            session.commit()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def read_throughput(db, readers, seconds):
+    """Return the reads per second, and the failed reads, of `readers`
+    threads while a writer commits continuously."""
+    stop = threading.Event()
+    counts = [0] * readers
+    errors = [0] * readers
+
+    def write():
+        i = 0
+        while not stop.is_set():
+            try:
+                with db.session_scope() as session:
+                    session.add(Client(full_name=f"Busy {i}",
+                                       email=f"b{i}-{time.time_ns()}@c.fr"))
+                    session.commit()
+            except OperationalError:
+                pass
+            i += 1
+
+    def read(index):
+        query = select(func.count()).select_from(Client).where(
+            Client.company_name == "Company 42")
+        while not stop.is_set():
+            try:
+                with db.engine.connect() as connection:
+                    connection.execute(query).scalar()
+                counts[index] += 1
+            except OperationalError:
+                errors[index] += 1
+
+    threads = [threading.Thread(target=write)] + [
+        threading.Thread(target=read, args=(i,)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / seconds, sum(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--writes", type=int, default=500)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(f"{'profile':<8} {'write avg ms':>13} {'write p95 ms':>13} "
+          f"{'reads/s':>9} {'failed reads':>13}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, pragmas in PROFILES.items():
+            db = make_database(directory, name, pragmas)
+            latencies = write_latencies(db, args.writes)
+            reads, errors = read_throughput(db, args.readers, args.seconds)
+            db.engine.dispose()
+            p95 = statistics.quantiles(latencies, n=20)[-1]
+            print(f"{name:<8} {statistics.mean(latencies):13.2f} "
+                  f"{p95:13.2f} {reads:9.0f} {errors:13d}")
+
+
+if __name__ == "__main__":
+    main()
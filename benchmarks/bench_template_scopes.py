@@ -0,0 +1,128 @@
+"""
+bench_template_scopes.py - Measure the contexts allocated by loops and
+includes.
+
+Renders each `table_*.html` partial through an include, with a list of
+fake entities, and adds up the size of the context objects created while
+rendering: dict copies of the whole context, as the renderer used to make
+for every loop iteration and include, against `Scope` frames, interpreted
+then compiled. The fragment cache is emptied before each render.
+
+Usage (from the repository root):
+    python benchmarks/bench_template_scopes.py [--rows 1000]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from epic_event import render_engine  # noqa: E402
+from epic_event.render_engine import (Scope, TemplateRenderer,  # noqa: E402
+                                      fragment_cache)
+
+TAG_DIR = os.path.join("epic_event", "templates", "templates_tag")
+PARTIALS = {
+    "table_clients.html": "clients",
+    "table_contracts.html": "contracts",
+    "table_collaborators.html": "collaborators",
+    "table_events.html": "events",
+}
+
+
+def make_items(rows):
+    """Return `rows` fake entities having the fields of every table."""
+    commercial = SimpleNamespace(id=0, full_name="Commercial")
+    items = []
+    for i in range(rows):
+        item = SimpleNamespace(
+            id=i, title=f"Item {i}", full_name=f"Name {i}", email="a@b.fr",
+            phone="0600000000", role="support", company_name=f"Company {i}",
+            commercial=commercial, support=commercial if i % 2 else None,
+            total_amount=1000, amount_due=500, signed=i % 3 == 0,
+            archived=i % 10 == 0, location="Paris", participants=i,
+            formatted_created_date="01/01/2025",
+            formatted_last_contact_date="01/01/2025",
+            formatted_start_date="01/01/2025",
+            formatted_end_date="02/01/2025")
+        item.client = item
+        item.event = item if i % 2 else None
+        item.contract = item
+        items.append(item)
+    return items
+
+
+def make_context(entity, items):
+    """Return the context of a list page."""
+    return {
+        "user": SimpleNamespace(id=0, role="admin", full_name="Admin"),
+        entity: items,
+        "sort": "id",
+        "order": "asc",
+        "sort_links": {},
+        "user_can": lambda *args: True,
+        "show_archived": False,
+        "error": "",
+    }
+
+
+def measure(template_dir, name, context, scope_factory, compiled):
+    """Return the number and total size of the contexts created."""
+    created = []
+
+    def factory(parent, *args, **kwargs):
+        context = scope_factory(parent, *args, **kwargs)
+        created.append(context)
+        return context
+
+    render_engine.Scope = factory
+    fragment_cache.clear()
+    try:
+        renderer = TemplateRenderer(template_dir, TAG_DIR)
+        if compiled:
+            renderer.render_template(name, dict(context))
+        else:
+            renderer.render_template_interpreted(name, dict(context))
+    finally:
+        render_engine.Scope = Scope
+    return len(created), sum(map(sys.getsizeof, created))
+
+
+def copy_context(parent, *args, **kwargs):
+    """Copy the whole context, as `context.copy()` did."""
+    context = dict(parent)
+    context.update(*args, **kwargs)
+    return context
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=1000)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    items = make_items(args.rows)
+
+    modes = [("copies", copy_context, False),
+             ("scopes", Scope, False),
+             ("scopes, compiled", Scope, True)]
+    print(f"{'partial':<26} {'contexts':<17} {'count':>7} {'kB':>9}")
+    with tempfile.TemporaryDirectory() as template_dir:
+        for partial, entity in PARTIALS.items():
+            name = f"page_{entity}.html"
+            with open(os.path.join(template_dir, name), "w",
+                      encoding="utf-8") as f:
+                f.write(f"{{% include '{partial}' {entity} with_sorting %}}")
+            context = make_context(entity, items)
+            for label, factory, compiled in modes:
+                count, size = measure(template_dir, name, context, factory,
+                                      compiled)
+                print(f"{partial:<26} {label:<17} {count:7d} "
+                      f"{size / 1024:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
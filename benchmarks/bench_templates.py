@@ -0,0 +1,94 @@
+"""
+bench_templates.py - Compare compiled and interpreted template rendering.
+
+Renders `events.html` with a table of fake events, once through the
+compiled-template cache (`render_template`) and once through the
+interpreter (`render_template_interpreted`), checks that both give the
+same HTML and prints the mean time of each, with the fragment cache
+emptied before every render (cold) and filled (warm). Then prints the
+counters of the expression and fragment caches.
+
+Usage (from the repository root):
+    python benchmarks/bench_templates.py [--rows 1000] [--number 10]
+"""
+import argparse
+import logging
+import os
+import sys
+import timeit
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from epic_event.render_engine import (TemplateRenderer,  # noqa: E402
+                                      expression_cache, fragment_cache)
+
+
+def make_context(rows):
+    """Return the context of the events page for `rows` events."""
+    user = SimpleNamespace(id=1, role="admin", full_name="Admin")
+    support = SimpleNamespace(id=2, full_name="Support")
+    events = []
+    for i in range(rows):
+        client = SimpleNamespace(company_name=f"Client {i}")
+        events.append(SimpleNamespace(
+            id=i, title=f"Event {i}",
+            contract=SimpleNamespace(client=client),
+            support=support if i % 3 else None,
+            formatted_start_date="01/01/2025", formatted_end_date="02/01/2025",
+            location="Paris", participants=i, archived=i % 10 == 0))
+    fields = ["title", "client", "support", "start_date", "end_date",
+              "location", "participants"]
+    return {
+        "user": user,
+        "events": events,
+        "sort": "title",
+        "order": "asc",
+        "sort_links": {field: f"?sort={field}" for field in fields},
+        "user_can": lambda *args: True,
+        "show_archived": False,
+        "with_sorting": True,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--number", type=int, default=10)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    renderer = TemplateRenderer()
+    context = make_context(args.rows)
+    compiled = renderer.render_template("events.html", context)
+    fragment_cache.clear()
+    interpreted = renderer.render_template_interpreted("events.html",
+                                                       context)
+    assert compiled == interpreted, "compiled output differs"
+
+    print(f"{'':<28} {'cold':>9}    {'warm':>9}")
+    for name in ("render_template", "render_template_interpreted"):
+        render = getattr(renderer, name)
+
+        def cold():
+            fragment_cache.clear()
+            render("events.html", context)
+        cold_seconds = timeit.timeit(cold, number=args.number)
+        warm_seconds = timeit.timeit(lambda: render("events.html", context),
+                                     number=args.number)
+        print(f"{name:<28} {cold_seconds / args.number * 1000:9.2f} ms "
+              f"{warm_seconds / args.number * 1000:9.2f} ms")
+
+    stats = expression_cache.stats()
+    print(f"expression cache: {stats['size']}/{stats['maxsize']} entries, "
+          f"hit rate {stats['hit_rate']:.2%}")
+    stats = fragment_cache.stats()
+    print(f"fragment cache: {stats['fragments']} fragments, "
+          f"{stats['size_bytes'] / 1024:.0f}/{stats['max_bytes'] / 1024:.0f}"
+          f" kB, hit rate {stats['hit_rate']:.2%}, "
+          f"{stats['evictions']} evictions")
+
+
+if __name__ == "__main__":
+    main()
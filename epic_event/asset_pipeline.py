@@ -0,0 +1,145 @@
+"""
+asset_pipeline.py - Build step for fingerprinted static assets.
+
+This module copies the files of `static/` to a build directory under a
+name containing a hash of their content (`styles.css` becomes
+`styles.3f2a9c1b7d4e.css`), together with a gzip-compressed `.gz` variant.
+Since a fingerprinted URL changes whenever the file changes, browsers can
+be told to cache it forever (`Cache-Control: immutable`) without ever
+serving a stale asset after a deploy.
+
+Main Responsibilities:
+- Builds the fingerprinted copies, their `.gz` variants and a
+    `manifest.json` mapping each source name to its fingerprinted name.
+- Provides `static_url`, the template helper returning the URL of an
+    asset: fingerprinted when the build exists, the plain `/static/` URL
+    otherwise.
+
+Usage:
+    python -m epic_event.asset_pipeline
+
+    static_url("styles.css")  # "/static/styles.3f2a9c1b7d4e.css"
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+from typing import Dict
+
+from epic_event.settings import STATIC_BUILD_DIR
+from epic_event.static_files import STATIC_DIR
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+HASH_LENGTH = 12
+
+
+def fingerprinted_name(relative_path: str, content: bytes) -> str:
+    """
+    Insert a hash of the content before the extension of a file name.
+
+    Args:
+        relative_path: Path relative to the static root, "/"-separated.
+        content: Bytes of the file.
+
+    Returns:
+        str: e.g. "images/logo.0beae175468d.webp".
+    """
+    stem, extension = os.path.splitext(relative_path)
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    return f"{stem}.{digest}{extension}"
+
+
+def build_static(source_dir: str = STATIC_DIR,
+                 build_dir: str = STATIC_BUILD_DIR) -> Dict[str, str]:
+    """
+    Build the fingerprinted assets and their manifest.
+
+    The build directory is emptied first, so assets removed from the
+    source do not linger. A `.gz` variant is only kept when it is smaller
+    than the original (already compressed images are served as is).
+
+    Args:
+        source_dir: Directory of the source assets.
+        build_dir: Directory to write the build to.
+
+    Returns:
+        dict: The manifest, mapping source names to fingerprinted names.
+    """
+    if os.path.isdir(build_dir):
+        shutil.rmtree(build_dir)
+    os.makedirs(build_dir)
+
+    manifest = {}
+    for directory, _, filenames in os.walk(source_dir):
+        for filename in sorted(filenames):
+            path = os.path.join(directory, filename)
+            relative_path = os.path.relpath(path, source_dir).replace(
+                os.sep, "/")
+            with open(path, "rb") as f:
+                content = f.read()
+
+            name = fingerprinted_name(relative_path, content)
+            target = os.path.join(build_dir, *name.split("/"))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as f:
+                f.write(content)
+
+            # mtime=0 keeps the .gz bytes, and so its ETag, reproducible.
+            compressed = gzip.compress(content, compresslevel=9, mtime=0)
+            if len(compressed) < len(content):
+                with open(target + ".gz", "wb") as f:
+                    f.write(compressed)
+            manifest[relative_path] = name
+
+    with open(os.path.join(build_dir, MANIFEST_NAME), "w",
+              encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    logger.info("%d fichiers statiques construits dans %s",
+                len(manifest), build_dir)
+    return manifest
+
+
+def load_manifest(build_dir: str = STATIC_BUILD_DIR) -> Dict[str, str]:
+    """
+    Read the manifest of a build.
+
+    Args:
+        build_dir: Directory of the build.
+
+    Returns:
+        dict: The manifest, or an empty dict if no build exists.
+    """
+    try:
+        with open(os.path.join(build_dir, MANIFEST_NAME),
+                  encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+manifest = load_manifest()
+
+
+def static_url(name: str) -> str:
+    """
+    Return the URL of a static asset, for use in templates.
+
+    Args:
+        name: Path of the asset relative to `static/`, e.g. "styles.css".
+
+    Returns:
+        str: The fingerprinted URL if the asset was built, else the plain
+        `/static/` URL.
+    """
+    return "/static/" + manifest.get(name, name)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    built = build_static()
+    print(f"{len(built)} fichiers statiques construits dans "
+          f"{STATIC_BUILD_DIR}")
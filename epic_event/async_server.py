@@ -0,0 +1,264 @@
+"""
+async_server.py - Asyncio HTTP server engine.
+
+This module provides an alternative to `http.server.HTTPServer`: connections
+are handled by an asyncio event loop, which parses HTTP itself and keeps
+idle keep-alive connections open at almost no cost. Slow clients only hold
+a coroutine, not a thread, so a few of them cannot exhaust the server.
+
+The application code is reused as is: each parsed request is handed to a
+`BufferedHandler`, a `MyHandler` writing its response to memory, which runs
+the same `dispatch_route` logic and views.
+
+Blocking work is moved off the event loop:
+- routing, database access and rendering run in a thread pool,
+    with one SQLAlchemy session per request;
+- bcrypt hashing and verification run in a bounded process pool
+    (`PasswordHashingService`).
+
+Usage:
+    server = AsyncHTTPServer(("", 8000))
+    asyncio.run(server.serve_forever())
+"""
+import asyncio
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPException, parse_headers
+from typing import List, Optional, Tuple
+
+from epic_event.models import collaborator
+from epic_event.password_hashing import PasswordHashingService
+from epic_event.router import MyHandler
+from epic_event.settings import KEEP_ALIVE_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADER_SIZE = 64 * 1024
+MAX_BODY_SIZE = 1024 * 1024
+REQUEST_TIMEOUT = 30
+
+
+class BufferedHandler(MyHandler):
+    """
+    `MyHandler` running on a request already parsed by the event loop.
+
+    The response head and body are written to memory instead of a socket,
+    then returned by `run` as one framed HTTP response.
+    """
+    protocol_version = "HTTP/1.1"
+    request_scoped_sessions = True
+    # The response is returned in one piece: streamed pages are rendered
+    # completely first.
+    stream_html = False
+    # The request line and headers were validated by the event loop.
+    request_parsed = True
+
+    def __init__(self, command: str, path: str, request_version: str,
+                 headers, body: bytes, client_address: Tuple[str, int]):
+        # BaseHTTPRequestHandler.__init__ would read from a socket: the
+        # attributes it sets up are provided directly instead.
+        self.command = command
+        self.path = path
+        self.request_version = request_version
+        self.requestline = f"{command} {path} {request_version}"
+        self.headers = headers
+        self.rfile = io.BytesIO(body)
+        self.wfile = io.BytesIO()
+        self.client_address = client_address
+        self.server = None
+        self.close_connection = (
+            headers.get("Connection", "").lower() == "close"
+            or (request_version == "HTTP/1.0"
+                and headers.get("Connection", "").lower() != "keep-alive"))
+        self.response_head: List[bytes] = []
+
+    def flush_headers(self):
+        if hasattr(self, "_headers_buffer"):
+            self.response_head.extend(self._headers_buffer)
+            self._headers_buffer = []
+
+    def run(self) -> Tuple[bytes, bool]:
+        """
+        Handle the request with the regular handler methods.
+
+        Returns:
+            tuple: The complete HTTP response, and whether the connection
+            must be closed after it. A handler which sent no response
+            gets a 500, and the connection is closed.
+        """
+        with self.request_session():
+            method = getattr(self, f"do_{self.command}", None)
+            if method is None:
+                self.send_error(501, f"Méthode non supportée : "
+                                     f"{self.command}")
+            else:
+                method()
+        if not self.response_head:
+            logger.error("Aucune réponse envoyée pour %s", self.requestline)
+            return _error_response(500, "Internal Server Error"), True
+        return self._framed_response(), self.close_connection
+
+    def _framed_response(self) -> bytes:
+        """Add the framing headers missing from the response head."""
+        body = self.wfile.getvalue()
+        head = self.response_head[:-1]
+        names = {line.split(b":", 1)[0].strip().lower() for line in head[1:]}
+
+        if b"content-length" not in names \
+                and b"transfer-encoding" not in names:
+            head.append(f"Content-Length: {len(body)}\r\n".encode("latin-1"))
+        if b"connection" not in names:
+            value = "close" if self.close_connection else "keep-alive"
+            head.append(f"Connection: {value}\r\n".encode("latin-1"))
+
+        head.append(b"\r\n")
+        return b"".join(head) + body
+
+
+def _error_response(code: int, reason: str) -> bytes:
+    """Build a minimal response for errors detected before routing."""
+    body = f"{code} {reason}".encode("utf-8")
+    return (f"HTTP/1.1 {code} {reason}\r\n"
+            f"Content-Type: text/plain; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n").encode("latin-1") + body
+
+
+class AsyncHTTPServer:
+    """
+    Asyncio server dispatching requests to `BufferedHandler`.
+
+    Attributes:
+        server_address: (host, port) to listen on.
+        handler_class: Handler building the response of each request.
+        io_executor: Thread pool for routing, database and rendering.
+        cpu_executor: Bounded process pool for bcrypt, shut down with the
+            server.
+        keep_alive_timeout: Seconds an idle connection is kept open.
+        request_timeout: Seconds allowed to receive a whole request.
+    """
+
+    def __init__(self, server_address: Tuple[str, int],
+                 handler_class=BufferedHandler,
+                 io_workers: Optional[int] = None,
+                 cpu_workers: Optional[int] = None,
+                 cpu_executor: Optional[PasswordHashingService] = None,
+                 keep_alive_timeout: float = KEEP_ALIVE_TIMEOUT,
+                 request_timeout: float = REQUEST_TIMEOUT):
+        self.server_address = server_address
+        self.handler_class = handler_class
+        self.keep_alive_timeout = keep_alive_timeout
+        self.request_timeout = request_timeout
+        # The process pool must be forked before any other thread exists:
+        # a caller which has started threads passes one forked earlier.
+        self.cpu_executor = (cpu_executor
+                             or PasswordHashingService(cpu_workers))
+        self.io_executor = ThreadPoolExecutor(max_workers=io_workers)
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        """Start listening and route bcrypt work to the process pool."""
+        collaborator.password_executor = self.cpu_executor
+        host, port = self.server_address
+        self.server = await asyncio.start_server(
+            self.handle_connection, host or None, port,
+            limit=MAX_HEADER_SIZE)
+        self.server_address = self.server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self) -> None:
+        """Start the server and serve until cancelled."""
+        await self.start()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stop listening and shut the executors down."""
+        if self.server is not None:
+            self.server.close()
+        collaborator.password_executor = None
+        self.io_executor.shutdown(wait=False, cancel_futures=True)
+        self.cpu_executor.shutdown()
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        """Serve the requests of one connection until it is closed."""
+        client_address = writer.get_extra_info("peername")
+        loop = asyncio.get_running_loop()
+        served = 0
+        try:
+            while True:
+                request = await self._read_request(reader, writer)
+                if request is None:
+                    break
+                served += 1
+                handler = self.handler_class(*request, client_address)
+                handler.requests_on_connection = served
+                response, close = await loop.run_in_executor(
+                    self.io_executor, handler.run)
+                writer.write(response)
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        except Exception as e:
+            logger.exception("Erreur lors du traitement de la requête : %s",
+                             e)
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter):
+        """
+        Read and parse one request from the connection.
+
+        Returns:
+            tuple | None: (command, path, version, headers, body), or None
+            when the connection must be closed (idle timeout, client gone,
+            malformed request or body sent with Transfer-Encoding, in which
+            case an error is sent first).
+        """
+        try:
+            raw_head = await asyncio.wait_for(
+                reader.readuntil(b"\r\n\r\n"), self.keep_alive_timeout)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError,
+                ConnectionError):
+            return None
+        except asyncio.LimitOverrunError:
+            writer.write(_error_response(431, "Request Header Fields Too "
+                                              "Large"))
+            return None
+
+        request_line, _, raw_headers = raw_head.partition(b"\r\n")
+        try:
+            command, path, version = \
+                request_line.decode("latin-1").split()
+            headers = parse_headers(io.BytesIO(raw_headers))
+            length = int(headers.get("Content-Length", 0))
+        except (ValueError, HTTPException):
+            writer.write(_error_response(400, "Bad Request"))
+            return None
+
+        if version not in ("HTTP/1.0", "HTTP/1.1") or length < 0:
+            writer.write(_error_response(400, "Bad Request"))
+            return None
+        if length > MAX_BODY_SIZE:
+            writer.write(_error_response(413, "Payload Too Large"))
+            return None
+        if "Transfer-Encoding" in headers:
+            # Only Content-Length bodies are read: a chunked body would
+            # be taken for the next request.
+            writer.write(_error_response(501, "Not Implemented"))
+            return None
+
+        try:
+            body = await asyncio.wait_for(reader.readexactly(length),
+                                          self.request_timeout)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+            return None
+
+        return command, path, version, headers, body
@@ -0,0 +1,134 @@
+"""
+compression.py - Negotiated compression of HTTP responses.
+
+This module chooses a content coding from the client's `Accept-Encoding`
+header and compresses response bodies with `zlib`.
+
+Compression is streamed: the body is encoded and fed to the compressor in
+slices, so a large page never exists twice in memory in uncompressed form;
+only the (much smaller) compressed chunks are kept.
+
+Functions:
+    parse_accept_encoding(accept_encoding) -> Dict[str, float]
+    accepts_encoding(accept_encoding, encoding) -> bool
+    negotiate_encoding(accept_encoding) -> Optional[str]
+    iter_encoded(content) -> Iterator[bytes]
+    iter_compressed(chunks, encoding, level, sync_flush) -> Iterator[bytes]
+"""
+import zlib
+from typing import Dict, Iterable, Iterator, Optional
+
+# zlib window bits giving each HTTP content coding its container format.
+ENCODINGS = {
+    "gzip": 16 + zlib.MAX_WBITS,
+    "deflate": zlib.MAX_WBITS,
+}
+
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_accept_encoding(accept_encoding: str) -> Dict[str, float]:
+    """
+    Parse an `Accept-Encoding` header into quality values.
+
+    Args:
+        accept_encoding: Header value, e.g. "gzip, deflate;q=0.5".
+
+    Returns:
+        dict: Quality value of each listed coding, names lowercased.
+    """
+    qualities = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name] = quality
+    return qualities
+
+
+def accepts_encoding(accept_encoding: str, encoding: str) -> bool:
+    """
+    Tell whether a client accepts a given content coding.
+
+    Args:
+        accept_encoding: `Accept-Encoding` header value.
+        encoding: Content coding, e.g. "gzip".
+
+    Returns:
+        bool: True if the coding (or "*") has a non-zero quality.
+    """
+    qualities = parse_accept_encoding(accept_encoding)
+    return qualities.get(encoding, qualities.get("*", 0.0)) > 0
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the content coding to use from an `Accept-Encoding` header.
+
+    Args:
+        accept_encoding: Header value, e.g. "gzip, deflate;q=0.5".
+
+    Returns:
+        str | None: "gzip" or "deflate", or None to send the body as is.
+            On equal quality values gzip is preferred.
+    """
+    qualities = parse_accept_encoding(accept_encoding)
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def iter_encoded(content: str, chunk_size: int = CHUNK_SIZE,
+                 charset: str = "utf-8") -> Iterator[bytes]:
+    """
+    Encode a string slice by slice.
+
+    Args:
+        content: Text to encode.
+        chunk_size: Number of characters per slice.
+        charset: Character encoding.
+
+    Yields:
+        bytes: The encoded slices, in order.
+    """
+    for start in range(0, len(content), chunk_size):
+        yield content[start:start + chunk_size].encode(charset)
+
+
+def iter_compressed(chunks: Iterable[bytes], encoding: str,
+                    level: int = 6,
+                    sync_flush: bool = False) -> Iterator[bytes]:
+    """
+    Compress a stream of byte chunks.
+
+    Args:
+        chunks: Uncompressed data, in order.
+        encoding: "gzip" or "deflate".
+        level: zlib compression level, from 1 (fastest) to 9 (smallest).
+        sync_flush: If True, each input chunk is flushed to the output
+            (Z_SYNC_FLUSH), so a streamed response can be decompressed
+            as it arrives, at the cost of a few bytes per chunk.
+
+    Yields:
+        bytes: Compressed data; empty chunks are skipped.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, ENCODINGS[encoding])
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if sync_flush:
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
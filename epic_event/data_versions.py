@@ -0,0 +1,117 @@
+"""
+data_versions.py - Version counters of the application data.
+
+Each table has a counter, increased every time a transaction modifying it
+is committed (the listeners are registered by `models.database`). Caches
+add the versions of the tables they depend on to their keys, so that an
+entry is no longer found once the underlying data changed.
+
+By default the counters live in the process. Pre-forked workers call
+`share_data_versions` with their engine: the counters are then kept in a
+`data_versions` table, increased by the worker which commits, and read
+again by every worker at the start of each request
+(`refresh_data_versions`), so that none of them serves fragments rendered
+before a commit of another.
+
+Usage:
+    key = ("client_row", client.id, data_version("clients"))
+    bump_data_version("clients")  # after a commit
+"""
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+metadata = MetaData()
+
+data_versions_table = Table(
+    "data_versions", metadata,
+    Column("name", String, primary_key=True),
+    Column("version", Integer, nullable=False),
+)
+
+_versions: Dict[str, int] = {}
+_lock = threading.Lock()
+_engine: Optional[Engine] = None
+
+
+def data_version(*tables: str) -> Tuple[int, ...]:
+    """
+    Return the current version of some tables.
+
+    Args:
+        *tables: Table names, e.g. "clients", "events".
+
+    Returns:
+        tuple: One counter per table, in order (0 for an unchanged table).
+    """
+    versions = _versions
+    return tuple(versions.get(table, 0) for table in tables)
+
+
+def bump_data_version(*tables: str) -> None:
+    """
+    Record that the data of some tables changed.
+
+    Args:
+        *tables: Names of the modified tables.
+    """
+    if _engine is None:
+        with _lock:
+            for table in tables:
+                _versions[table] = _versions.get(table, 0) + 1
+        return
+
+    statement = insert(data_versions_table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[data_versions_table.c.name],
+        set_={"version": data_versions_table.c.version + 1})
+    try:
+        with _engine.begin() as connection:
+            connection.execute(statement, [{"name": table, "version": 1}
+                                           for table in tables])
+    except SQLAlchemyError as e:
+        logger.error("Failed to bump the data versions of %s: %s",
+                     ", ".join(tables), e)
+        return
+    refresh_data_versions()
+
+
+def refresh_data_versions() -> None:
+    """Read the shared counters again; nothing to do when not shared."""
+    global _versions
+    if _engine is None:
+        return
+    try:
+        with _engine.connect() as connection:
+            rows = connection.execute(select(data_versions_table)).all()
+    except SQLAlchemyError as e:
+        logger.error("Failed to read the data versions: %s", e)
+        return
+    with _lock:
+        _versions = {name: version for name, version in rows}
+
+
+def share_data_versions(engine: Optional[Engine]) -> None:
+    """
+    Keep the counters in the `data_versions` table of a database.
+
+    Must be called before any fragment is cached: the counters start
+    again from the values stored in the table.
+
+    Args:
+        engine: Engine of the database shared by the processes, or None
+            to keep the counters in the process again (from their last
+            values).
+    """
+    global _engine
+    if engine is not None:
+        metadata.create_all(engine)
+    _engine = engine
+    refresh_data_versions()
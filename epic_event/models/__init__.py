@@ -1,12 +1,11 @@
 from epic_event.models.client import Client
 from epic_event.models.collaborator import Collaborator
 from epic_event.models.contract import Contract
-from epic_event.models.database import SESSION_CONTEXT, Database
+from epic_event.models.database import Database
 from epic_event.models.event import Event
 from epic_event.models.utils import load_data_in_database
 
 __all__ = ["Database",
-           "SESSION_CONTEXT",
            "load_data_in_database",
            "Collaborator",
            "Client",
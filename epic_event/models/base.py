@@ -1,3 +1,21 @@
+from sqlalchemy import Index, text
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
+
+
+def active_index(name: str, *columns: str) -> Index:
+    """
+    Declare a partial index over the rows which are not archived.
+
+    The WHERE clause is written like the `archived.is_(False)` filter of
+    the queries, which SQLite requires to use the index.
+
+    Args:
+        name: Index name.
+        *columns: Indexed column names.
+
+    Returns:
+        Index: The index, for a model's `__table_args__`.
+    """
+    return Index(name, *columns, sqlite_where=text("archived IS 0"))
@@ -4,10 +4,11 @@ import re
 from datetime import date, datetime
 from typing import Optional, Union
 
-from sqlalchemy import Boolean, Column, Date, ForeignKey, Integer, String
+from sqlalchemy import (Boolean, Column, Date, ForeignKey, Index, Integer,
+                        String)
 from sqlalchemy.orm import Session, relationship
 
-from epic_event.models.base import Base
+from epic_event.models.base import Base, active_index
 from epic_event.models.entity import Entity
 
 logger = logging.getLogger(__name__)
@@ -31,6 +32,21 @@ class Client(Base, Entity):
     """
 
     __tablename__ = 'clients'
+    __table_args__ = (
+        Index("ix_clients_id_commercial", "id_commercial"),
+        active_index("ix_clients_active_company_name", "company_name", "id"),
+        active_index("ix_clients_active_full_name", "full_name", "id"),
+    )
+    sortable_fields = ("id", "full_name", "email", "phone", "company_name",
+                       "created_date", "last_contact_date",
+                       "commercial.full_name")
+    filterable_fields = ("id", "full_name", "email", "phone", "company_name",
+                         "created_date", "last_contact_date", "commercial",
+                         "id_commercial", "commercial__full_name")
+    load_plans = {
+        "list": ("commercial",),
+        "detail": ("commercial", "contracts.event"),
+    }
 
     id: int = Column(Integer, primary_key=True)
     full_name: str = Column(String, nullable=False)
@@ -9,10 +9,36 @@ from sqlalchemy.orm import Session, relationship
 
 from epic_event.models.base import Base
 from epic_event.models.entity import Entity
+from epic_event.password_hashing import PasswordHashingBusy, hash_cost
+from epic_event.settings import BCRYPT_ROUNDS
 
 SERVICES = ["gestion", "commercial", "support"]
 logger = logging.getLogger(__name__)
 
+# Executor running bcrypt outside the calling thread (the
+# PasswordHashingService set when the server starts). None runs bcrypt
+# inline.
+password_executor = None
+
+
+def _run_bcrypt(func, *args):
+    """
+    Run a bcrypt function, in `password_executor` when one is set.
+
+    Args:
+        func: `bcrypt.hashpw` or `bcrypt.checkpw`.
+        *args: Arguments of the bcrypt function.
+
+    Returns:
+        The result of the bcrypt function.
+
+    Raises:
+        PasswordHashingBusy: If the executor's queue is full.
+    """
+    if password_executor is None:
+        return func(*args)
+    return password_executor.submit(func, *args).result()
+
 
 class Collaborator(Base, Entity):
     """
@@ -29,6 +55,11 @@ class Collaborator(Base, Entity):
     """
 
     __tablename__ = 'collaborators'
+    sortable_fields = ("id", "full_name", "email", "role")
+    filterable_fields = ("id", "full_name", "email", "role")
+    load_plans = {
+        "detail": ("events.contract.client", "events.support", "clients"),
+    }
 
     id = Column(Integer, primary_key=True)
     password = Column(LargeBinary(60), nullable=False)
@@ -146,7 +177,7 @@ class Collaborator(Base, Entity):
 
     def set_password(self, raw_password: str) -> None:
         """
-        Hashes and stores the given password.
+        Hashes and stores the given password, at the cost BCRYPT_ROUNDS.
 
         Args:
             raw_password (str): The plain-text password.
@@ -154,9 +185,10 @@ class Collaborator(Base, Entity):
         Raises:
             TypeError: If the password is not a string.
             ValueError: If the password is too long for bcrypt.
+            PasswordHashingBusy: If the hashing queue is full.
         """
 
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(BCRYPT_ROUNDS)
         if not isinstance(raw_password, str):
             error = "Password must be a string."
             logger.exception(error)
@@ -166,12 +198,17 @@ class Collaborator(Base, Entity):
             logger.exception(error)
             raise ValueError(error)
 
-        self.password = bcrypt.hashpw(raw_password.encode("utf-8"), salt)
+        self.password = _run_bcrypt(bcrypt.hashpw,
+                                    raw_password.encode("utf-8"), salt)
 
     def check_password(self, raw_password: str) -> bool:
         """
         Verifies the given raw password against the stored hash.
 
+        When the password matches a hash of another cost than
+        BCRYPT_ROUNDS, it is hashed again at that cost; the caller saves
+        the collaborator to persist the new hash.
+
         Args:
             raw_password (str): The plain-text password to verify.
 
@@ -181,15 +218,33 @@ class Collaborator(Base, Entity):
         Raises:
             TypeError: If the password is not a string.
             ValueError: If  not a valid bcrypt hash
+            PasswordHashingBusy: If the hashing queue is full.
         """
 
         if not isinstance(raw_password, str):
             raise TypeError("Password must be a string.")
 
         try:
-            return bcrypt.checkpw(raw_password.encode("utf-8"),
-                                  self.password)
+            valid = _run_bcrypt(bcrypt.checkpw,
+                                raw_password.encode("utf-8"), self.password)
 
         except (ValueError, TypeError) as e:
             logger.exception("Password verification failed: %s", e)
             return False
+
+        if valid and self.needs_rehash():
+            old_cost = hash_cost(self.password)
+            try:
+                self.set_password(raw_password)
+            except (PasswordHashingBusy, ValueError) as e:
+                # The old hash still works: retry at the next login.
+                logger.warning("Password rehash of %s postponed: %s",
+                               self.full_name, e)
+            else:
+                logger.info("Password of %s rehashed from cost %s to %s",
+                            self.full_name, old_cost, BCRYPT_ROUNDS)
+        return valid
+
+    def needs_rehash(self) -> bool:
+        """Return True if the stored hash is not of cost BCRYPT_ROUNDS."""
+        return hash_cost(self.password or b"") != BCRYPT_ROUNDS
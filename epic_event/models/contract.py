@@ -1,12 +1,13 @@
 """Contract ORM model with validation, error handling, and relationships."""
 import logging
 
-from sqlalchemy import Boolean, Column, Date, ForeignKey, Integer, String
+from sqlalchemy import (Boolean, Column, Date, ForeignKey, Index, Integer,
+                        String)
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, relationship
 
 from epic_event.models import Client
-from epic_event.models.base import Base
+from epic_event.models.base import Base, active_index
 from epic_event.models.entity import Entity
 
 logger = logging.getLogger(__name__)
@@ -27,6 +28,21 @@ class Contract(Base, Entity):
     """
 
     __tablename__ = 'contracts'
+    __table_args__ = (
+        Index("ix_contracts_client_id", "client_id"),
+        active_index("ix_contracts_active_created_date", "created_date", "id"),
+        active_index("ix_contracts_active_signed", "signed", "id"),
+    )
+    sortable_fields = ("id", "client.company_name", "total_amount",
+                       "amount_due", "created_date", "signed", "event.title")
+    filterable_fields = ("id", "client_id", "client__company_name",
+                         "client__id_commercial", "total_amount",
+                         "amount_due", "created_date", "signed", "event",
+                         "event__title")
+    load_plans = {
+        "list": ("client.commercial", "event"),
+        "detail": ("client.commercial", "event.support"),
+    }
 
     id = Column(Integer, primary_key=True)
     total_amount = Column(String, nullable=False)
@@ -110,7 +126,7 @@ class Contract(Base, Entity):
 
         try:
             with db.no_autoflush:
-                client = db.query(Client).filter_by(id=client_id).first()
+                client = Client.get(db, client_id, include_archived=True)
             if not client:
                 error = f"No client found with id={client_id}."
                 logger.exception(error)
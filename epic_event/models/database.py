@@ -6,13 +6,18 @@ connection, session lifecycle, and schema creation using SQLAlchemy ORM.
 
 Features:
     - Connects to a local SQLite database by default.
+    - Applies a performance profile (PRAGMAs) to every new connection, and
+      can checkpoint the write-ahead log periodically.
     - Lazily initializes a session when needed.
+    - Provides short-lived sessions scoped to a single unit of work
+      (e.g. one HTTP request in threaded mode).
     - Handles the creation of all ORM model tables via declarative `Base`.
+    - Brings existing database files up to date with versioned migrations
+      (`MIGRATIONS`), applied at startup.
+    - Increases the data version of the tables modified by each committed
+      transaction (see `data_versions`), for the template fragment cache.
     - Logs errors using the standard Python `logging` module.
 
-Globals:
-    SESSION_CONTEXT (dict): In-memory session cache for authenticated users or views.
-
 Classes:
     Database: Encapsulates SQLAlchemy engine, session factory, and schema creation logic.
 
@@ -27,16 +32,69 @@ Notes:
     - Intended for use in both development and production environments.
 """
 import logging
+import threading
+from contextlib import contextmanager
+from itertools import chain
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, sessionmaker
 
+from epic_event.data_versions import bump_data_version
 from epic_event.models.base import Base
 
-SESSION_CONTEXT = {}
 logger = logging.getLogger(__name__)
 
+# Schema changes of existing databases, in version order. The version of a
+# database file is stored in its `PRAGMA user_version`. `create_all` gives
+# new databases the current schema and SQLite commits DDL immediately, so
+# the statements must be idempotent (IF NOT EXISTS...).
+MIGRATIONS: List[Tuple[int, str, Tuple[str, ...]]] = [
+    (1, "Index foreign keys and active rows", (
+        "CREATE INDEX IF NOT EXISTS ix_clients_id_commercial "
+        "ON clients (id_commercial)",
+        "CREATE INDEX IF NOT EXISTS ix_clients_active_company_name "
+        "ON clients (company_name, id) WHERE archived IS 0",
+        "CREATE INDEX IF NOT EXISTS ix_clients_active_full_name "
+        "ON clients (full_name, id) WHERE archived IS 0",
+        "CREATE INDEX IF NOT EXISTS ix_contracts_client_id "
+        "ON contracts (client_id)",
+        "CREATE INDEX IF NOT EXISTS ix_contracts_active_created_date "
+        "ON contracts (created_date, id) WHERE archived IS 0",
+        "CREATE INDEX IF NOT EXISTS ix_contracts_active_signed "
+        "ON contracts (signed, id) WHERE archived IS 0",
+        "CREATE INDEX IF NOT EXISTS ix_events_contract_id "
+        "ON events (contract_id)",
+        "CREATE INDEX IF NOT EXISTS ix_events_support_id_start_date "
+        "ON events (support_id, start_date)",
+        "CREATE INDEX IF NOT EXISTS ix_events_active_start_date "
+        "ON events (start_date, id) WHERE archived IS 0",
+    )),
+]
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_modified_tables(session: Session, flush_context) -> None:
+    """Remember the tables written by a flush until the transaction ends."""
+    tables = session.info.setdefault("modified_tables", set())
+    for instance in chain(session.new, session.dirty, session.deleted):
+        tables.add(instance.__tablename__)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_modified_tables(session: Session) -> None:
+    """Increase the data version of the tables modified by a commit."""
+    tables = session.info.pop("modified_tables", None)
+    if tables:
+        bump_data_version(*tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_modified_tables(session: Session) -> None:
+    """Discard the tables of a rolled back transaction."""
+    session.info.pop("modified_tables", None)
+
 
 class Database:
     """
@@ -50,27 +108,59 @@ class Database:
         Base (DeclarativeMeta): The declarative base for ORM models.
         SessionLocal (sessionmaker): Factory for creating new Session objects.
         session (Session | None): The current active session, lazily initialized.
+        pragmas (dict): PRAGMAs applied to every new connection.
 
     Methods:
         get_session() -> Session:
             Lazily initializes and returns a SQLAlchemy session.
 
+        session_scope() -> Iterator[Session]:
+            Yields a new session that is closed when the block exits.
+
         initialize_database() -> None:
-            Creates database tables for all declared ORM models.
+            Creates database tables for all declared ORM models, then
+            applies the pending migrations.
             Raises SQLAlchemyError if table creation fails.
+
+        migrate() -> int:
+            Applies the pending migrations, returns the schema version.
+
+        checkpoint(mode) -> Tuple[int, int, int]:
+            Checkpoints the write-ahead log.
+
+        start_checkpoints(interval) / stop_checkpoints():
+            Checkpoint the write-ahead log periodically in a thread.
     """
 
-    def __init__(self, db_name: str = "epic_event.db"):
+    def __init__(self, db_name: str = "epic_event.db",
+                 pragmas: Optional[Dict[str, Any]] = None):
         """Database handler using SQLAlchemy ORM.
 
             Args:
                 db_name (str): SQLAlchemy-compatible database name.
+                pragmas (dict): PRAGMA names and values applied to every
+                    new connection, in order (see
+                    `settings.DATABASE_PRAGMAS`). None keeps SQLite's
+                    defaults.
             """
         self.db_url = f"sqlite:///{db_name}"
         self.engine = create_engine(self.db_url, echo=False)
+        self.pragmas = dict(pragmas or {})
+        if self.pragmas:
+            event.listen(self.engine, "connect", self._apply_pragmas)
         self.Base = Base
         self.SessionLocal = sessionmaker(bind=self.engine)
         self.session = None
+        self._stop_checkpoints = None
+
+    def _apply_pragmas(self, dbapi_connection, connection_record) -> None:
+        """Configure a new SQLite connection with the PRAGMAs."""
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in self.pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
 
     def get_session(self) -> Session:
         """Lazily initialize and return a SQLAlchemy session."""
@@ -78,14 +168,119 @@ class Database:
             self.session = self.SessionLocal()
         return self.session
 
+    @contextmanager
+    def session_scope(self) -> Iterator[Session]:
+        """Provide a new session, closed when the block exits.
+
+        Unlike `get_session`, every call opens its own session, so it can
+        be used concurrently from several threads (one per request). The
+        session is marked request-scoped in its `info`, which lets
+        `Entity.get` trust its identity map.
+
+        Yields:
+            Session: A fresh SQLAlchemy session.
+        """
+        session = self.SessionLocal()
+        session.info["request_scoped"] = True
+        try:
+            yield session
+        finally:
+            session.close()
+
     def initialize_database(self) -> None:
-        """Create tables for all models declared with Base.
+        """Create tables for all models declared with Base, then migrate.
 
             Raises :
                 SQLAlchemyError : If a database error occurs during commit.
         """
         try:
             self.Base.metadata.create_all(self.engine)
+            self.migrate()
         except SQLAlchemyError as e:
             logger.exception("Failed to initialize the database: %s", e)
             raise
+
+    def migrate(self) -> int:
+        """Apply the migrations newer than the database's schema version.
+
+        Each migration runs in its own transaction, which also records its
+        version: an interrupted run resumes at the failed migration.
+
+            Returns:
+                int: The schema version of the database.
+
+            Raises :
+                SQLAlchemyError : If a migration fails.
+        """
+        with self.engine.connect() as connection:
+            version = connection.exec_driver_sql(
+                "PRAGMA user_version").scalar()
+
+        for number, description, statements in MIGRATIONS:
+            if number <= version:
+                continue
+            with self.engine.begin() as connection:
+                for statement in statements:
+                    connection.exec_driver_sql(statement)
+                connection.exec_driver_sql(f"PRAGMA user_version = {number}")
+            version = number
+            logger.info("Database migrated to version %s: %s", number,
+                        description)
+        return version
+
+    def checkpoint(self, mode: str = "PASSIVE") -> Tuple[int, int, int]:
+        """Copy the write-ahead log into the database file.
+
+        PASSIVE does not wait for readers or writers; TRUNCATE waits for
+        them (up to busy_timeout) and then empties the log file.
+
+            Args:
+                mode (str): PASSIVE, FULL, RESTART or TRUNCATE.
+
+            Returns:
+                tuple: 1 if the checkpoint could not complete (0
+                    otherwise), the pages in the log and the pages
+                    checkpointed (-1 outside WAL mode).
+
+            Raises :
+                SQLAlchemyError : If the checkpoint fails.
+        """
+        with self.engine.connect() as connection:
+            return tuple(connection.exec_driver_sql(
+                f"PRAGMA wal_checkpoint({mode})").one())
+
+    def start_checkpoints(self, interval: float,
+                          mode: str = "TRUNCATE") -> None:
+        """Checkpoint the write-ahead log every `interval` seconds.
+
+        SQLite checkpoints the log when it grows past 1000 pages, but the
+        log file keeps its largest size; a long reader can also delay it.
+        The checkpoints run in a daemon thread, which a fork does not copy:
+        pre-forked workers start their own.
+
+            Args:
+                interval (float): Seconds between checkpoints, 0 to
+                    disable them.
+                mode (str): Checkpoint mode, see `checkpoint`.
+        """
+        if interval <= 0 or self._stop_checkpoints is not None:
+            return
+        stop = threading.Event()
+
+        def run() -> None:
+            while not stop.wait(interval):
+                try:
+                    busy, log, done = self.checkpoint(mode)
+                    logger.debug("WAL checkpoint: %s/%s pages", done, log)
+                except SQLAlchemyError as e:
+                    logger.warning("WAL checkpoint failed: %s", e)
+
+        self._stop_checkpoints = stop
+        threading.Thread(target=run, name="wal-checkpoint",
+                         daemon=True).start()
+
+    def stop_checkpoints(self) -> None:
+        """Stop the periodic checkpoints started by `start_checkpoints`."""
+        if self._stop_checkpoints is not None:
+            self._stop_checkpoints.set()
+            self._stop_checkpoints = None
@@ -4,8 +4,13 @@ Entity ORM Utilities Module.
 This module provides a reusable base class `Entity` for SQLAlchemy ORM models.
 It encapsulates common operations such as:
 
-- Filtering records based on nested field relationships (with `__` syntax).
-- Sorting by both simple and nested attributes using dot notation.
+- Filtering records based on nested field relationships (with `__` syntax),
+  with Django-like lookups (`__in`, `__gt`, `__range`, `__icontains`,
+  `__isnull`...) compiled to SQL over cached join plans.
+- Eager loading the relationships each view displays (`load_plans`).
+- Sorting by both simple and nested attributes using dot notation, in SQL
+  (ORDER BY over outer joins), restricted to each model's `sortable_fields`.
+- Keyset pagination over the same orderings (`keyset_page`).
 - Validating and persisting changes with robust error handling.
 - Soft-deleting records by toggling an `archived` flag.
 - Resolving dotted field paths for deeply nested attribute access.
@@ -18,6 +23,7 @@ Typical usage example:
 
     class Client(Entity, Base):
         __tablename__ = "clients"
+        sortable_fields = ("id", "name")
         id = Column(Integer, primary_key=True)
         name = Column(String)
         archived = Column(Boolean, default=False)
@@ -27,7 +33,11 @@ Typical usage example:
 
     # Then you can use:
     clients = Client.filter_by_fields(session, name="John")
+    events = Event.filter_by_fields(session, support__isnull=True,
+                                    participants__gte=100)
     clients = Client.order_by_fields(session, "name")
+    client = Client.get(session, 42)
+    page = Client.keyset_page(session, "name", after=42, limit=50)
     client.update(session, name="Jane Doe")
     client.save(session)
     Client.soft_delete(session, client_id)
@@ -35,21 +45,165 @@ Typical usage example:
 """
 
 import logging
-from typing import Any, Dict, List
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
+from sqlalchemy import and_, literal, or_
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.inspection import inspect
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import (Query, RelationshipProperty, Session, aliased,
+                            contains_eager, joinedload, selectinload)
 
 logger = logging.getLogger(__name__)
 
+TRUE_VALUES = ("1", "true", "oui", "on")
+FALSE_VALUES = ("0", "false", "non", "off")
+
+
+def _escape_like(value: str) -> str:
+    """Escape the LIKE wildcards of a value (escape character: \\)."""
+    return (value.replace("\\", "\\\\").replace("%", "\\%")
+            .replace("_", "\\_"))
+
+
+def _is_null(target: Any, value: Any) -> Any:
+    """Compile `__isnull`, on a column or a relationship."""
+    if isinstance(target.property, RelationshipProperty):
+        if target.property.uselist:
+            return ~target.any() if value else target.any()
+        return target == None if value else target != None  # noqa: E711
+    return target.is_(None) if value else target.is_not(None)
+
+
+def _exact(target: Any, value: Any) -> Any:
+    """Compile an equality, `IS NULL` for None."""
+    return target.is_(None) if value is None else target == value
+
+
+# SQL expression of each lookup, from the filtered attribute and the value.
+LOOKUPS: Dict[str, Callable[[Any, Any], Any]] = {
+    "exact": _exact,
+    "in": lambda target, value: target.in_(list(value)),
+    "gt": lambda target, value: target > value,
+    "gte": lambda target, value: target >= value,
+    "lt": lambda target, value: target < value,
+    "lte": lambda target, value: target <= value,
+    "range": lambda target, value: target.between(*value),
+    "icontains": lambda target, value: target.ilike(
+        f"%{_escape_like(str(value))}%", escape="\\"),
+    "isnull": _is_null,
+}
+
+
+def split_lookup(key: str) -> Tuple[str, str]:
+    """
+    Split a filter key into its field path and lookup.
+
+    Args:
+        key: Filter key, e.g. "support__isnull" or "full_name".
+
+    Returns:
+        tuple: The field path ("support") and the lookup ("isnull"),
+            "exact" if the key has none.
+    """
+    path, _, lookup = key.rpartition("__")
+    if path and lookup in LOOKUPS:
+        return path, lookup
+    return key, "exact"
+
+
+class _FilterPlan:
+    """
+    Joins and attributes needed to filter a model on some field paths.
+
+    Each relationship prefix shared by the paths is joined once, with a
+    LEFT OUTER JOIN on an alias, so that `__isnull` can match rows without
+    a related object.
+
+    Attributes:
+        joins: Relationship attributes to outer join, in order.
+        targets: Attribute (column or relationship) of each field path.
+        distinct: True if a joined relationship is a collection, which
+            repeats the filtered rows.
+    """
+    __slots__ = ("joins", "targets", "distinct")
+
+    def __init__(self, model: Any, paths: Tuple[str, ...]):
+        self.joins = []
+        self.targets = {}
+        self.distinct = False
+        aliases = {}
+        for path in paths:
+            *relations, field = path.split("__")
+            current = model
+            for depth, relation in enumerate(relations):
+                prefix = tuple(relations[:depth + 1])
+                if prefix not in aliases:
+                    attribute = getattr(current, relation)
+                    if not isinstance(attribute.property,
+                                      RelationshipProperty):
+                        raise AttributeError(
+                            f"'{relation}' n'est pas une relation")
+                    aliases[prefix] = aliased(attribute.property.mapper.class_)
+                    self.joins.append(attribute.of_type(aliases[prefix]))
+                    self.distinct |= bool(attribute.property.uselist)
+                current = aliases[prefix]
+            self.targets[path] = getattr(current, field)
+
+
+@lru_cache(maxsize=256)
+def _filter_plan(model: Any, paths: Tuple[str, ...]) -> _FilterPlan:
+    """Return the filter plan of a model and a sorted tuple of paths."""
+    return _FilterPlan(model, paths)
+
+
+class Page:
+    """
+    One page of a keyset-paginated list.
+
+    Attributes:
+        items: The objects of the page, in display order.
+        has_previous: True if objects come before the first one.
+        has_next: True if objects come after the last one.
+        previous_cursor: Id of the first object: pass it as `before` to
+            get the previous page (None if there is none).
+        next_cursor: Id of the last object: pass it as `after` to get the
+            next page (None if there is none).
+    """
+    __slots__ = ("items", "has_previous", "has_next")
+
+    def __init__(self, items: List[Any], has_previous: bool, has_next: bool):
+        self.items = items
+        self.has_previous = has_previous and bool(items)
+        self.has_next = has_next and bool(items)
+
+    @property
+    def previous_cursor(self) -> Optional[int]:
+        return self.items[0].id if self.has_previous else None
+
+    @property
+    def next_cursor(self) -> Optional[int]:
+        return self.items[-1].id if self.has_next else None
+
 
 class Entity:
     """
     Base class for ORM models providing reusable filtering,
     sorting, saving, updating, and soft deleting features,
     with support for joined relationships and dotted path resolution.
+
+    Attributes:
+        sortable_fields: Dotted paths accepted by `order_by_fields`.
+        filterable_fields: `__` paths accepted by `parse_filters`.
+        load_plans: Relationships loaded with the objects, by view ("list",
+            "detail"): dotted paths of the relationships the view's
+            templates read, so that rendering does not lazy load them row
+            by row.
     """
+    sortable_fields: Tuple[str, ...] = ("id",)
+    filterable_fields: Tuple[str, ...] = ("id",)
+    load_plans: Dict[str, Tuple[str, ...]] = {}
 
     @staticmethod
     def _resolve(obj: Any, attr_path: str) -> Any:
@@ -94,18 +248,100 @@ class Entity:
             logger.exception(e)
             return False
 
+    @classmethod
+    def _apply_filters(cls, query: Query, filters: Dict[str, Any]) -> Query:
+        """
+        Add the joins and WHERE clauses of some filters to a query.
+
+        Args:
+            query: Query selecting `cls`.
+            filters: Filter keys ("path__lookup") and their values.
+
+        Returns:
+            The filtered query.
+
+        Raises:
+            AttributeError: If a field of a path does not exist.
+        """
+        if not filters:
+            return query
+        parsed = [(split_lookup(key), value) for key, value in filters.items()]
+        plan = _filter_plan(cls, tuple(sorted({path for (path, _), _
+                                              in parsed})))
+        for join in plan.joins:
+            query = query.outerjoin(join)
+        for (path, lookup), value in parsed:
+            query = query.filter(LOOKUPS[lookup](plan.targets[path], value))
+        return query.distinct() if plan.distinct else query
+
+    @classmethod
+    def _load_options(cls, load_plan: Optional[str],
+                      joined: Iterable[Tuple[str, Any, Any]] = ()) -> \
+            List[Any]:
+        """
+        Return the loader options of a load plan.
+
+        A collection is loaded with one SELECT ... IN per relationship
+        (`selectinload`), a single object within the query (`joinedload`).
+        Relationships already joined by the query (for sorting) are loaded
+        from their join (`contains_eager`), which they always are.
+
+        Args:
+            load_plan: Key of `load_plans`, or None to load nothing more.
+            joined: Relationship name, attribute and alias of each join of
+                the query, from `cls`, in path order.
+
+        Returns:
+            list: Options for `Query.options`.
+        """
+        joined = list(joined)
+        paths = [path.split(".") for path in cls.load_plans.get(load_plan, ())]
+        if joined:
+            paths.append([name for name, _, _ in joined])
+
+        options = []
+        for path in paths:
+            loader = None
+            current = cls
+            for depth, name in enumerate(path):
+                # Still on the joins of the query: reuse them.
+                if depth < len(joined) and joined[depth][0] == name \
+                        and (depth == 0 or current is joined[depth - 1][2]):
+                    _, attribute, target = joined[depth]
+                    option = attribute.of_type(target)
+                    loader = (contains_eager(option) if loader is None
+                              else loader.contains_eager(option))
+                    current = target
+                    continue
+                attribute = getattr(current, name)
+                strategy = (selectinload if attribute.property.uselist
+                            else joinedload)
+                loader = (strategy(attribute) if loader is None
+                          else getattr(loader, strategy.__name__)(attribute))
+                current = attribute.property.mapper.class_
+            options.append(loader)
+        return options
+
     @classmethod
     def filter_by_fields(cls,
                          db: Session,
                          archived: bool = False,
+                         load_plan: Optional[str] = "list",
                          **filters: Dict[str, Any]
                          ) -> List[Any]:
         """
         Filter instances based on field-value pairs, supporting nested relationships.
 
+        A key may end with a lookup: `__in` (sequence), `__gt`, `__gte`,
+        `__lt`, `__lte`, `__range` (pair of bounds), `__icontains` or
+        `__isnull` (boolean, also on a relationship); without one, the
+        field must be equal to the value.
+
         Args:
             db: SQLAlchemy session.
             archived: Include archived objects if True.
+            load_plan: Relationships to load with the objects, a key of
+                `load_plans` (None for none).
             **filters: Key-value pairs where keys may include relations via '__'.
 
         Returns:
@@ -116,86 +352,380 @@ class Entity:
         """
         try:
             query = db.query(cls)
-            relations = set()
 
             if hasattr(cls, "archived") and not archived:
                 query = query.filter(cls.archived.is_(False))
 
-            for field_path, value in filters.items():
-                path_parts = field_path.split("__")
-                current_model = cls
-                relation_chain = []
+            query = cls._apply_filters(query, filters)
+            query = query.options(*cls._load_options(load_plan))
+
+            return query.all()
+
+        except (AttributeError, SQLAlchemyError) as e:
+            logger.exception(e)
+            raise
+
+    @classmethod
+    def parse_filters(cls, raw_filters: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Convert filters read from a query string to typed filters.
 
-                for part in path_parts[:-1]:
-                    attr = getattr(current_model, part)
-                    relation_chain.append(attr)
-                    current_model = attr.property.mapper.class_
+        Values are converted to the type of the filtered column: booleans
+        from 1/0, true/false or oui/non, dates in ISO format. `__in` takes
+        comma-separated values, `__range` two comma-separated bounds.
 
-                final_attr = getattr(current_model, path_parts[-1])
+        Args:
+            raw_filters: Filter keys and their string values, e.g.
+                {"support__isnull": "1", "signed": "0"}.
 
-                for rel in relation_chain:
-                    query = query.join(rel)
+        Returns:
+            dict: The filters, for `filter_by_fields` or `keyset_page`.
 
-                query = query.filter(final_attr == value)
-                relations.update(path_parts[:-1])
+        Raises:
+            ValueError: If a path is not in `filterable_fields`, or a value
+                cannot be converted.
+        """
+        filters = {}
+        for key, raw in raw_filters.items():
+            path, lookup = split_lookup(key)
+            if path not in cls.filterable_fields:
+                raise ValueError(f"{cls.__name__} ne peut pas être filtré "
+                                 f"par '{path}'")
+            target = _filter_plan(cls, (path,)).targets[path]
+            if lookup == "isnull":
+                filters[key] = cls._parse_value(raw, bool)
+                continue
+            if isinstance(target.property, RelationshipProperty):
+                raise ValueError(f"'{path}' n'accepte que le filtre "
+                                 f"'__isnull'")
+            python_type = target.type.python_type
+            if lookup == "icontains":
+                filters[key] = raw
+            elif lookup in ("in", "range"):
+                values = [cls._parse_value(value, python_type)
+                          for value in raw.split(",")]
+                if lookup == "range" and len(values) != 2:
+                    raise ValueError(f"'{key}' attend deux bornes")
+                filters[key] = values
+            else:
+                filters[key] = cls._parse_value(raw, python_type)
+        return filters
 
-            for rel in relations:
-                if hasattr(cls, rel):
-                    query = query.options(joinedload(getattr(cls, rel)))
+    @staticmethod
+    def _parse_value(raw: str, python_type: type) -> Any:
+        """Convert a query string value to a column type."""
+        if python_type is bool:
+            if raw.lower() in TRUE_VALUES:
+                return True
+            if raw.lower() in FALSE_VALUES:
+                return False
+            raise ValueError(f"Booléen invalide : '{raw}'")
+        if python_type in (date, datetime):
+            return python_type.fromisoformat(raw)
+        return python_type(raw)
 
-            return query.all()
+    @classmethod
+    def _join_sort_path(cls, query: Query, field_path: str,
+                        eager: bool = True,
+                        load_plan: Optional[str] = None) -> Tuple[Query, Any]:
+        """
+        Join the relationships of a dotted field path to a query.
 
-        except (AttributeError, SQLAlchemyError) as e:
-            logger.exception(e)
-            raise
+        Each relationship of the path is joined with a LEFT OUTER JOIN, so
+        that rows without a related object are kept, and loaded from that
+        join (no lazy load per row).
+
+        Args:
+            query: Query selecting `cls`.
+            field_path: Dot-separated field path (e.g. "client.company_name"),
+                one of `sortable_fields`.
+            eager: Load the related objects from the joins, and those of
+                `load_plan`; False for a query which does not select `cls`
+                objects.
+            load_plan: Key of `load_plans`, or None.
+
+        Returns:
+            The joined query, and the column of the last field of the path.
+
+        Raises:
+            ValueError: If the field is not in `sortable_fields`.
+        """
+        if field_path not in cls.sortable_fields:
+            raise ValueError(f"{cls.__name__} ne peut pas être trié par "
+                             f"'{field_path}'")
+
+        *relations, field = field_path.split(".")
+        current = cls
+        joined = []
+        for relation in relations:
+            attribute = getattr(current, relation)
+            target = aliased(attribute.property.mapper.class_)
+            query = query.outerjoin(attribute.of_type(target))
+            joined.append((relation, attribute, target))
+            current = target
+        if eager:
+            query = query.options(*cls._load_options(load_plan, joined))
+        return query, getattr(current, field)
+
+    @classmethod
+    def _order_query(cls, query: Query, field_path: str,
+                     descending: bool = False,
+                     load_plan: Optional[str] = None) -> Query:
+        """
+        Add the ORDER BY of a dotted field path to a query.
+
+        NULL values come first in ascending order and last in descending
+        order, like empty values did when sorting in Python; equal values
+        are ordered by ascending id.
+
+        Args:
+            query: Query selecting `cls`.
+            field_path: Dot-separated field path, one of `sortable_fields`.
+            descending: Sort in descending order if True.
+            load_plan: Relationships to load with the objects, a key of
+                `load_plans`.
+
+        Returns:
+            The ordered query.
+
+        Raises:
+            ValueError: If the field is not in `sortable_fields`.
+        """
+        query, column = cls._join_sort_path(query, field_path,
+                                            load_plan=load_plan)
+        return query.order_by(*cls._ordering(column, not descending, True))
+
+    @classmethod
+    def _ordering(cls, column: Any, ascending: bool,
+                  id_ascending: bool) -> Tuple[Any, Any]:
+        """Return the ORDER BY clauses of a sort column and the id.
+
+        NULL values are placed as if they were smaller than any value.
+        """
+        order = (column.asc().nulls_first() if ascending
+                 else column.desc().nulls_last())
+        return order, cls.id.asc() if id_ascending else cls.id.desc()
+
+    @classmethod
+    def _keyset_condition(cls, column: Any, value: Any, item_id: int,
+                          ascending: bool, id_ascending: bool) -> Any:
+        """
+        Return the condition selecting the rows after a given one.
+
+        "After" follows the order given by `_ordering` with the same
+        arguments.
+
+        Args:
+            column: The sort column.
+            value: Value of the sort column in the reference row.
+            item_id: Id of the reference row.
+            ascending: Direction of the sort column.
+            id_ascending: Direction of the id tiebreaker.
+
+        Returns:
+            A SQL boolean expression.
+        """
+        if column is cls.id:
+            # Sorting by id: a plain range on the primary key, which SQLite
+            # seeks to (the tiebreaker is then irrelevant).
+            return cls.id > item_id if ascending else cls.id < item_id
+
+        id_after = cls.id > item_id if id_ascending else cls.id < item_id
+        if value is None:
+            # NULL rows come first in ascending order, last in descending.
+            if ascending:
+                return or_(and_(column.is_(None), id_after),
+                           column.is_not(None))
+            return and_(column.is_(None), id_after)
+
+        # A bound literal, as booleans cannot be compared with > directly.
+        value = literal(value, column.type)
+        # The redundant bound (>= or <=) lets SQLite seek an index on the
+        # sort column instead of scanning it from the start.
+        if ascending:
+            condition = and_(column >= value, or_(column > value, id_after))
+        else:
+            condition = and_(column <= value, or_(column < value, id_after))
+        if not ascending:
+            condition = or_(condition, column.is_(None))
+        return condition
 
     @classmethod
     def order_by_fields(cls,
                         db: Session,
                         field_path: str,
                         descending: bool = False,
-                        archived: bool = False
+                        archived: bool = False,
+                        load_plan: Optional[str] = "list"
                         ) -> List[Any]:
         """
         Return all objects ordered by a specified field, including nested fields.
 
+        The sort is done by the database, see `_order_query`.
+
         Args:
             db: SQLAlchemy session.
-            field_path: Dot-separated field path (e.g. "user.name").
+            field_path: Dot-separated field path (e.g. "user.name"), one of
+                the model's `sortable_fields`.
             descending: Sort in descending order if True.
             archived: Include archived records if True.
+            load_plan: Relationships to load with the objects, a key of
+                `load_plans` (None for none).
 
         Returns:
             Sorted list of ORM instances.
 
         Raises:
+            ValueError: If the field is not in `sortable_fields`.
             SQLAlchemyError : If a database error occurs during the query.
         """
         try:
             query = db.query(cls)
 
             if hasattr(cls, "archived") and not archived:
-                with db.no_autoflush:
-                    query = query.filter(cls.archived.is_(False))
+                query = query.filter(cls.archived.is_(False))
+
+            return cls._order_query(query, field_path, descending,
+                                    load_plan).all()
+
+        except SQLAlchemyError as e:
+            logger.exception(e)
+            raise
+
+    @classmethod
+    def keyset_page(cls,
+                    db: Session,
+                    field_path: str = "id",
+                    descending: bool = False,
+                    archived: bool = False,
+                    after: Optional[int] = None,
+                    before: Optional[int] = None,
+                    limit: int = 50,
+                    criteria: Iterable[Any] = (),
+                    filters: Optional[Dict[str, Any]] = None,
+                    load_plan: Optional[str] = "list"
+                    ) -> Page:
+        """
+        Return one page of objects ordered like `order_by_fields`.
+
+        Pages are delimited by a cursor, the id of the last object of the
+        previous page (`after`) or of the first object of the next one
+        (`before`), instead of an offset: the database seeks directly to
+        the cursor's position in the sort order, so every page costs the
+        same whatever its position, and at most `limit + 1` rows are read.
+
+        If the cursor row no longer exists, the first page is returned.
+
+        Args:
+            db: SQLAlchemy session.
+            field_path: Dot-separated field path, one of `sortable_fields`.
+            descending: Sort in descending order if True.
+            archived: Include archived records if True.
+            after: Id of the object preceding the page.
+            before: Id of the object following the page (ignored if
+                `after` is given).
+            limit: Maximum number of objects in the page.
+            criteria: Additional SQLAlchemy filter expressions.
+            filters: Filters, as accepted by `filter_by_fields`.
+            load_plan: Relationships to load with the objects, a key of
+                `load_plans` (None for none).
+
+        Returns:
+            Page: The objects of the page and the cursors of its neighbours.
+
+        Raises:
+            ValueError: If the field is not in `sortable_fields`.
+            AttributeError: If a filtered field does not exist.
+            SQLAlchemyError : If a database error occurs during the query.
+        """
+        try:
+            query = db.query(cls)
+            if hasattr(cls, "archived") and not archived:
+                query = query.filter(cls.archived.is_(False))
+            for criterion in criteria:
+                query = query.filter(criterion)
+            query = cls._apply_filters(query, filters)
+            query, column = cls._join_sort_path(query, field_path,
+                                                load_plan=load_plan)
+
+            backward = after is None and before is not None
+            cursor = before if backward else after
+            ascending = descending == backward
+            if cursor is not None:
+                reference, value = cls._join_sort_path(
+                    db.query(cls), field_path, eager=False)
+                row = reference.with_entities(value).filter(
+                    cls.id == cursor).first()
+                if row is None:
+                    cursor = None
+                    backward = False
+                    ascending = not descending
+                else:
+                    query = query.filter(cls._keyset_condition(
+                        column, row[0], cursor, ascending, not backward))
+
+            items = query.order_by(
+                *cls._ordering(column, ascending, not backward)
+            ).limit(limit + 1).all()
+
+        except SQLAlchemyError as e:
+            logger.exception(e)
+            raise
+
+        more = len(items) > limit
+        items = items[:limit]
+        if backward:
+            items.reverse()
+            return Page(items, has_previous=more, has_next=True)
+        return Page(items, has_previous=cursor is not None, has_next=more)
+
+    @classmethod
+    def get(cls,
+            db: Session,
+            pk: int,
+            include_archived: bool = False,
+            load_plan: Optional[str] = None
+            ) -> Optional[Any]:
+        """
+        Return the object of a primary key, or None.
 
-            if "." in field_path:
-                relation = field_path.split(".")[0]
-                if hasattr(cls, relation):
-                    with db.no_autoflush:
-                        query = query.options(
-                            joinedload(getattr(cls, relation))
-                        )
+        In a request-scoped session (`Database.session_scope`), the
+        identity map is looked up first: an object already loaded by the
+        request is returned without querying the database. Any other
+        session may be long-lived and hold objects changed since by other
+        sessions, so the object is queried, like `filter_by_fields`.
 
-            results = query.all()
+        Args:
+            db: SQLAlchemy session.
+            pk: Primary key of the object.
+            include_archived: Return the object even if it is archived.
+            load_plan: Relationships to load with the object if it is
+                queried, a key of `load_plans`.
 
+        Returns:
+            The ORM instance, or None if it does not exist or is archived.
+
+        Raises:
+            SQLAlchemyError : If a database error occurs during the query.
+        """
+        options = cls._load_options(load_plan)
+        try:
+            if db.info.get("request_scoped"):
+                obj = db.get(cls, pk, options=options)
+            else:
+                query = db.query(cls).options(*options).filter(cls.id == pk)
+                if hasattr(cls, "archived") and not include_archived:
+                    query = query.filter(cls.archived.is_(False))
+                obj = query.first()
         except SQLAlchemyError as e:
             logger.exception(e)
             raise
 
-        return sorted(results,
-                      key=lambda obj: cls._resolve(obj, field_path),
-                      reverse=descending
-                      )
+        # Like the `archived IS 0` filter of the queries.
+        if obj is not None and not include_archived \
+                and getattr(obj, "archived", False) is not False:
+            return None
+        return obj
 
     def save(self, db: Session) -> None:
         """
@@ -259,7 +789,7 @@ class Entity:
             SQLAlchemyError: If a database error occurs during the commit.
         """
         try:
-            obj = db.query(cls).filter_by(id=item_id).first()
+            obj = cls.get(db, item_id, include_archived=True)
 
             if not obj or not hasattr(obj, "archived"):
                 error = f"{cls.__name__} with ID={item_id} not found"
@@ -3,12 +3,13 @@ import logging
 from datetime import datetime
 from typing import Dict, Optional
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import (Boolean, Column, DateTime, ForeignKey, Index, Integer,
+                        String, Text)
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, relationship
 
 from epic_event.models import Collaborator, Contract
-from epic_event.models.base import Base
+from epic_event.models.base import Base, active_index
 from epic_event.models.entity import Entity
 
 logger = logging.getLogger(__name__)
@@ -32,6 +33,23 @@ class Event(Base, Entity):
     """
 
     __tablename__ = 'events'
+    __table_args__ = (
+        Index("ix_events_contract_id", "contract_id"),
+        Index("ix_events_support_id_start_date", "support_id", "start_date"),
+        active_index("ix_events_active_start_date", "start_date", "id"),
+    )
+    sortable_fields = ("id", "title", "contract.client.company_name",
+                       "support.full_name", "start_date", "end_date",
+                       "location", "participants")
+    filterable_fields = ("id", "title", "contract_id",
+                         "contract__client__company_name",
+                         "contract__client__id_commercial", "support",
+                         "support_id", "support__full_name", "start_date",
+                         "end_date", "location", "participants")
+    load_plans = {
+        "list": ("contract.client", "support"),
+        "detail": ("contract.client.commercial", "support"),
+    }
 
     id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False)
@@ -190,17 +208,15 @@ class Event(Base, Entity):
             SQLAlchemyError : If a database error occurs during the query.
         """
         try:
-            contracts = Contract.filter_by_fields(db, id=contract_id)
+            contract = Contract.get(db, contract_id)
         except SQLAlchemyError:
             raise
 
-        if not contracts:
+        if not contract:
             error = f"Contract ID {contract_id} not found."
             logger.exception(error)
             raise ValueError(error)
 
-        contract = contracts[0]
-
         if not contract.signed:
             error = "The contract must be signed before assigning to an event."
             logger.exception(error)
@@ -223,7 +239,8 @@ class Event(Base, Entity):
         if support_id is not None:
             try:
                 with db.no_autoflush:
-                    collaborator = db.query(Collaborator).filter_by(id=support_id).first()
+                    collaborator = Collaborator.get(db, support_id,
+                                                    include_archived=True)
             except SQLAlchemyError as e:
                 logger.exception(e)
                 raise
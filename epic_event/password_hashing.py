@@ -0,0 +1,230 @@
+"""
+password_hashing.py - Process pool running bcrypt for the request threads.
+
+bcrypt takes hundreds of milliseconds of CPU per password at the default
+cost. Run in the request threads, a burst of logins holds every thread
+(and the GIL between bcrypt rounds), so that pages wait behind them.
+`PasswordHashingService` runs it in worker processes instead: the
+request thread only waits for the result.
+
+The queue is bounded: at most `workers + queue_size` passwords are hashed
+or waiting at once. Beyond that, `submit` waits up to `queue_timeout`
+seconds for a free place, then raises `PasswordHashingBusy`, which the
+views turn into a "server busy" page rather than piling up requests.
+
+Collaborator uses the service set in `models.collaborator`
+(`password_executor`); without one, bcrypt runs inline.
+
+The bcrypt cost is sized for the host: `calibrate` times hashes of
+increasing cost and keeps the highest one within a latency budget. Run as
+a command, it prints it, or writes it to BCRYPT_ROUNDS in settings.py
+with --write; existing hashes are redone at their next login.
+
+Usage:
+    service = PasswordHashingService(workers=2, queue_size=16)
+    collaborator.password_executor = service
+    ...
+    service.shutdown()
+
+    python -m epic_event.password_hashing [--target-ms 250] [--write]
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import bcrypt
+
+from epic_event import settings
+from epic_event.settings import (BCRYPT_MIN_ROUNDS, BCRYPT_TARGET_MS,
+                                 PASSWORD_HASHING_QUEUE_SIZE,
+                                 PASSWORD_HASHING_QUEUE_TIMEOUT,
+                                 PASSWORD_HASHING_WORKERS)
+
+logger = logging.getLogger(__name__)
+
+# bcrypt accepts costs from 4 to 31.
+MAX_BCRYPT_ROUNDS = 31
+SETTINGS_ROUNDS = re.compile(r"^BCRYPT_ROUNDS = \d+$", re.MULTILINE)
+
+
+def hash_cost(hashed: bytes) -> Optional[int]:
+    """
+    Return the cost of a bcrypt hash.
+
+    Args:
+        hashed: A hash such as b"$2b$12$...".
+
+    Returns:
+        int | None: The cost, or None if it is not a bcrypt hash.
+    """
+    parts = hashed.split(b"$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def time_hash(rounds: int, repeat: int = 3) -> float:
+    """Return the best time of `repeat` bcrypt hashes, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        salt = bcrypt.gensalt(rounds)
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibration password", salt)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def calibrate(target_ms: float = BCRYPT_TARGET_MS,
+              min_rounds: int = BCRYPT_MIN_ROUNDS,
+              repeat: int = 3) -> Tuple[int, List[Tuple[int, float]]]:
+    """
+    Choose the highest bcrypt cost hashing within a latency budget.
+
+    Each cost unit doubles the time of a hash: costs are timed from
+    min_rounds up, and the search stops once the next one would exceed
+    the target.
+
+    Args:
+        target_ms: Time a hash may take on this host, in milliseconds.
+        min_rounds: Lowest acceptable cost, kept even when it is slower
+            than the target.
+        repeat: Hashes timed per cost (the best one counts).
+
+    Returns:
+        tuple: The chosen cost, and the (cost, milliseconds) measured.
+    """
+    rounds = min_rounds
+    timings = [(rounds, time_hash(rounds, repeat))]
+    while rounds < MAX_BCRYPT_ROUNDS and timings[-1][1] * 2 <= target_ms:
+        rounds += 1
+        timings.append((rounds, time_hash(rounds, repeat)))
+    if timings[-1][1] > target_ms and rounds > min_rounds:
+        rounds -= 1
+    return rounds, timings
+
+
+def write_rounds(rounds: int, path: str = settings.__file__) -> None:
+    """
+    Store a bcrypt cost as BCRYPT_ROUNDS in the settings file.
+
+    Raises:
+        ValueError: If the file has no `BCRYPT_ROUNDS = <n>` line.
+    """
+    with open(path, encoding="utf-8") as file:
+        source = file.read()
+    source, count = SETTINGS_ROUNDS.subn(f"BCRYPT_ROUNDS = {rounds}", source)
+    if not count:
+        raise ValueError(f"BCRYPT_ROUNDS introuvable dans {path}.")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(source)
+
+
+class PasswordHashingBusy(RuntimeError):
+    """Raised when the password hashing queue is full."""
+
+
+class PasswordHashingService:
+    """
+    Bounded process pool for bcrypt.
+
+    Thread-safe. The pool is forked when the service is created, which
+    must happen while the process has a single thread: before
+    sentry_sdk.init, the session sweeper or the WAL checkpoints start
+    theirs.
+
+    Attributes:
+        workers: Number of worker processes.
+        queue_size: Passwords allowed to wait for a free worker.
+        queue_timeout: Seconds `submit` waits for a place in the queue.
+        submitted: Passwords handed to the pool.
+        rejected: Passwords refused because the queue was full.
+    """
+
+    def __init__(self, workers: Optional[int] = PASSWORD_HASHING_WORKERS,
+                 queue_size: int = PASSWORD_HASHING_QUEUE_SIZE,
+                 queue_timeout: float = PASSWORD_HASHING_QUEUE_TIMEOUT):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.submitted = 0
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(self.workers + queue_size)
+        self._lock = threading.Lock()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("fork"))
+        # Start the worker processes now, not on the first login.
+        self._executor.submit(int).result()
+
+    def submit(self, func: Callable, *args: Any) -> Future:
+        """
+        Run a bcrypt function in the pool.
+
+        Args:
+            func: `bcrypt.hashpw`, `bcrypt.checkpw` or another picklable
+                function.
+            *args: Its arguments.
+
+        Returns:
+            Future: The future of the call.
+
+        Raises:
+            PasswordHashingBusy: If the queue stayed full for
+                queue_timeout seconds.
+        """
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self.rejected += 1
+            logger.warning("Password hashing queue full (%s passwords)",
+                           self.workers + self.queue_size)
+            raise PasswordHashingBusy(
+                "Le serveur est occupé, veuillez réessayer dans quelques "
+                "instants.")
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.submitted += 1
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, cancelling the waiting passwords."""
+        self._executor.shutdown(cancel_futures=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the counters, e.g. for logging or a benchmark."""
+        return {"workers": self.workers, "queue_size": self.queue_size,
+                "submitted": self.submitted, "rejected": self.rejected}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Choisir le coût bcrypt adapté à cette machine.")
+    parser.add_argument("--target-ms", type=float, default=BCRYPT_TARGET_MS,
+                        help="Durée visée d'un hachage, en millisecondes.")
+    parser.add_argument("--min-rounds", type=int, default=BCRYPT_MIN_ROUNDS,
+                        help="Coût minimal accepté.")
+    parser.add_argument("--write", action="store_true",
+                        help="Enregistrer le coût dans settings.py.")
+    args = parser.parse_args()
+
+    rounds, timings = calibrate(args.target_ms, args.min_rounds)
+    for cost, elapsed in timings:
+        print(f"coût {cost:2d} : {elapsed:8.1f} ms")
+    print(f"Coût retenu : {rounds} (actuel : {settings.BCRYPT_ROUNDS})")
+    if args.write:
+        write_rounds(rounds)
+        print(f"BCRYPT_ROUNDS = {rounds} enregistré dans {settings.__file__}")
+
+
+if __name__ == "__main__":
+    main()
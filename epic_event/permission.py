@@ -8,12 +8,11 @@ This module provides the decorators and functions for:
 The available roles are: admin, gestion, support, commercial.
 The managed entities are: collaborators, clients, contracts, events.
 """
-import re
 from functools import wraps
 from typing import TypeAlias, Union
 
-from epic_event.models import (SESSION_CONTEXT, Client, Collaborator, Contract,
-                               Event)
+from epic_event import sessions
+from epic_event.models import Client, Collaborator, Contract, Event
 from epic_event.render_engine import TemplateRenderer
 from epic_event.settings import entities
 
@@ -53,9 +52,11 @@ def login_required(func):
     """
         Decorator to verify that the user is authenticated.
 
-        Checks for a valid session cookie. If the session is invalid
-        or absent, returns the homepage with an error message.
-        If session is valid, inject user and session ID into kwargs.
+        Checks for a valid session cookie. If the session is invalid,
+        expired or absent, returns the homepage with an error message.
+        If session is valid, inject the user, the session ID and the
+        archive display flag into kwargs. The user is loaded by the
+        SQLAlchemy session received by the view.
 
         Args:
             func (callable): The view function to protect.
@@ -64,30 +65,31 @@ def login_required(func):
             callable: The decorated function.
         """
     def wrapper(*args, **kwargs):
-        headers = kwargs.get("headers", {})
-        cookie = headers.get("Cookie", "")
-        match = re.search(r"session_id=([a-f0-9\-]+)", cookie)
+        session_id = sessions.get_session_id(kwargs.get("headers", {}))
 
-        if not match:
+        if not session_id:
             return renderer.render_template(
                 "index.html",
                 {"error": "Non authentifié"})
 
-        session_id = match.group(1)
-
-        current_session = SESSION_CONTEXT.get(session_id, None)
-        if not current_session:
+        record = sessions.session_store.get(session_id)
+        if record is None:
             return renderer.render_template(
                 "index.html",
                 {"error": "veuillez vous identifier"})
 
-        user = SESSION_CONTEXT.get(session_id).get("user", None)
-
+        # The session only keeps the user's id: the user is taken from the
+        # identity map of the request's session, or loaded once. An
+        # archived collaborator is no longer authenticated.
+        session = kwargs.get("session")
+        user = Collaborator.get(session, record.user_id)
         if not user:
+            sessions.session_store.delete(session_id)
             return renderer.render_template("index.html", {
                 "error": "veuillez vous identifier"})
         kwargs["user"] = user
         kwargs["session_id"] = session_id
+        kwargs["display_archive"] = record.display_archive
         return func(*args, **kwargs)
 
     return wrapper
@@ -150,8 +152,7 @@ def has_permission(action):
 
             if pk is not None:
                 model = eval(entities.get(entity_name))
-                results = model.filter_by_fields(session, id=pk)
-                item = results[0] if results else None
+                item = model.get(session, pk)
 
             if item:
 
@@ -165,6 +166,8 @@ def has_permission(action):
                         })
 
                 if _has_object_permission(action, user, entity_name, item):
+                    # The view reuses the object instead of reading it again.
+                    kwargs["item"] = item
                     return view_func(*args, **kwargs)
 
             else:
@@ -174,10 +177,9 @@ def has_permission(action):
                     if data:
                         contract_id = int(data["contract_id"][0])
                         with session.no_autoflush:
-                            contract = Contract.filter_by_fields(
-                                session,
-                                id=contract_id)[0]
-                            if contract.client.commercial != user:
+                            contract = Contract.get(session, contract_id)
+                            if contract is not None \
+                                    and contract.client.commercial != user:
                                 error = ("Vous ne pouvez créer que les "
                                          "événements de vos clients")
                                 return _unauthorized(
@@ -0,0 +1,238 @@
+"""
+prefork.py - Pre-fork multi-process HTTP server.
+
+This module runs the application in several worker processes sharing one
+listening socket, so that template rendering and bcrypt work are no longer
+held to a single core by the GIL.
+
+Main Responsibilities:
+- Creates the listening socket once, in the parent, before forking.
+- Runs an `HTTPServer` in each worker on the inherited socket.
+- Supervises the workers: restarts any that crash and replaces those
+    that are recycled after a number of requests or above an RSS threshold.
+
+Usage:
+    listen_socket = create_listen_socket(("", 8000))
+    supervisor = PreforkSupervisor(listen_socket, 4, run_worker)
+    supervisor.serve_forever()
+
+Notes:
+    - Relies on `os.fork`, so it is only available on POSIX systems.
+    - Each worker must build its own `Database` engine after the fork;
+      connections must never be shared between processes.
+"""
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from http.server import HTTPServer
+from socketserver import ThreadingMixIn
+from typing import Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# A worker dying sooner than this after being spawned is considered to be
+# crash-looping: the supervisor waits before starting it again.
+MIN_WORKER_UPTIME = 1.0
+
+# Set in a worker when the supervisor asks it to stop (SIGTERM); the worker
+# finishes the request in progress before exiting.
+shutdown_requested = threading.Event()
+
+
+def create_listen_socket(server_address: Tuple[str, int],
+                         backlog: int = 128) -> socket.socket:
+    """
+    Create the listening socket shared by every worker.
+
+    The socket is non-blocking: all workers wait on it, and those that lose
+    the race for a connection get an error from `accept` instead of blocking.
+
+    Args:
+        server_address: (host, port) to listen on.
+        backlog: Size of the kernel accept queue.
+
+    Returns:
+        socket.socket: A bound and listening socket.
+    """
+    listen_socket = socket.create_server(server_address, backlog=backlog)
+    listen_socket.setblocking(False)
+    return listen_socket
+
+
+def current_rss_mb() -> float:
+    """
+    Return the resident memory of the current process in megabytes.
+
+    Reads `/proc/self/statm` when available, and falls back to the peak
+    RSS reported by `getrusage` on other systems.
+    """
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        import resource  # POSIX only, like the rest of this module
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS, in kilobytes elsewhere.
+        divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return peak / divisor
+
+
+class PreforkWorkerServer(HTTPServer):
+    """
+    HTTP server run by a worker process on an inherited listening socket.
+
+    The worker stops serving once it has handled `max_requests` requests or
+    once its resident memory exceeds `max_rss_mb`; the supervisor then
+    replaces it with a fresh process. A value of 0 disables a limit.
+
+    Requests are counted by the handler (`count_request`), not connections:
+    a persistent connection carries many of them, and it is closed after
+    the response to the last request the worker may serve.
+    """
+
+    # Select timeout, so the recycling conditions are checked regularly.
+    timeout = 0.5
+
+    def __init__(self, listen_socket: socket.socket, handler_class,
+                 max_requests: int = 0, max_rss_mb: int = 0):
+        host, port = listen_socket.getsockname()[:2]
+        super().__init__((host, port), handler_class,
+                         bind_and_activate=False)
+        self.socket.close()
+        self.socket = listen_socket
+        self.server_name = socket.getfqdn(host)
+        self.server_port = port
+        self.max_requests = max_requests
+        self.max_rss_mb = max_rss_mb
+        self.handled_requests = 0
+        self._count_lock = threading.Lock()
+
+    def get_request(self):
+        conn, address = self.socket.accept()
+        conn.setblocking(True)
+        return conn, address
+
+    def count_request(self) -> bool:
+        """
+        Count a request received by the handler.
+
+        Returns:
+            bool: True once the worker has reached max_requests, so that
+            the connection is closed after the response.
+        """
+        with self._count_lock:
+            self.handled_requests += 1
+            return bool(self.max_requests
+                        and self.handled_requests >= self.max_requests)
+
+    def should_recycle(self) -> bool:
+        """Tell whether the worker must stop serving and exit."""
+        if shutdown_requested.is_set():
+            return True
+        if self.max_requests and self.handled_requests >= self.max_requests:
+            logger.info("Worker %s recyclé après %s requêtes.",
+                        os.getpid(), self.handled_requests)
+            return True
+        if self.max_rss_mb and current_rss_mb() > self.max_rss_mb:
+            logger.info("Worker %s recyclé : mémoire au-delà de %s Mo.",
+                        os.getpid(), self.max_rss_mb)
+            return True
+        return False
+
+    def serve_until_recycled(self) -> None:
+        """Handle requests until the worker has to be recycled or stopped."""
+        while not self.should_recycle():
+            self.handle_request()
+
+
+class ThreadingPreforkWorkerServer(ThreadingMixIn, PreforkWorkerServer):
+    """Worker server handling each request of the worker in a thread."""
+    daemon_threads = True
+
+
+class PreforkSupervisor:
+    """
+    Parent process forking and supervising the workers.
+
+    Attributes:
+        listen_socket: Socket inherited by every worker.
+        workers: Number of workers to keep alive.
+        worker_main: Callable run in each child with the listening socket;
+            the worker exits when it returns.
+    """
+
+    def __init__(self, listen_socket: socket.socket, workers: int,
+                 worker_main: Callable[[socket.socket], None]):
+        self.listen_socket = listen_socket
+        self.workers = workers
+        self.worker_main = worker_main
+        self.children: Dict[int, float] = {}
+
+    def spawn_worker(self) -> int:
+        """Fork a worker process and return its pid."""
+        pid = os.fork()
+        if pid == 0:
+            self._run_child()
+        self.children[pid] = time.monotonic()
+        logger.info("Worker %s démarré.", pid)
+        return pid
+
+    def _run_child(self) -> None:
+        """Body of a forked worker; never returns."""
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM,
+                      lambda signum, frame: shutdown_requested.set())
+        exit_code = 0
+        try:
+            self.worker_main(self.listen_socket)
+        except Exception as e:
+            logger.exception("Arrêt inattendu du worker %s : %s",
+                             os.getpid(), e)
+            exit_code = 1
+        finally:
+            logging.shutdown()
+            os._exit(exit_code)
+
+    def serve_forever(self) -> None:
+        """Spawn the workers and keep them alive until interrupted."""
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            for _ in range(self.workers):
+                self.spawn_worker()
+
+            while True:
+                pid, status = os.wait()
+                started = self.children.pop(pid, None)
+                if started is None:
+                    continue
+                exit_code = os.waitstatus_to_exitcode(status)
+                if exit_code != 0:
+                    logger.error("Worker %s terminé avec le code %s, "
+                                 "redémarrage.", pid, exit_code)
+                    if time.monotonic() - started < MIN_WORKER_UPTIME:
+                        time.sleep(MIN_WORKER_UPTIME)
+                self.spawn_worker()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """Terminate every worker and wait for them to exit."""
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.children.pop(pid, None)
+        for pid in list(self.children):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+            self.children.pop(pid, None)
+        self.listen_socket.close()
@@ -6,22 +6,361 @@ Supported features:
 - {% for %} / {% endfor %} for iteration.
 - {% include 'file.html' var %} for partial inclusion.
 - {% extends 'base.html' %} and {% block name %}...{% endblock %} for inheritance.
+- {% cache key_expr ttl %}...{% endcache %} for fragment caching.
+
+Templates are compiled to Python functions, cached until their files
+change (see template_compiler).
+
+Every template can also use the functions of TEMPLATE_GLOBALS, such as
+{{ static_url('styles.css') }} for the fingerprinted URL of an asset.
+
+Loops and includes do not copy the context: they render in a Scope, a
+small frame holding the loop variable or include argument and pointing
+to the enclosing context.
+
+`stream_template` renders a page lazily, as a TemplateStream of encoded
+chunks, so that it can be sent while it is being rendered.
+
+A cached fragment is rendered once per value of its key expression and
+kept for ttl seconds (0: until evicted) in `fragment_cache`, an LRU
+bounded to TEMPLATE_FRAGMENT_CACHE_BYTES. Keys should include the
+`data_version` of the tables the fragment shows, so that it is rendered
+again once they change:
+    {% cache ("client_row", client.id, data_version("clients")) 300 %}
+
+Expressions evaluated by `safe_eval` are compiled once and kept in an LRU
+cache of TEMPLATE_EXPRESSION_CACHE_SIZE code objects (see ExpressionCache).
 """
 import logging
 import os
 import re
+import sys
+import threading
+import time
+from collections import OrderedDict
 from collections.abc import Iterable
-from typing import Any, Dict, List, Optional, Tuple, Union
+from types import CodeType
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlencode
 
+from epic_event.asset_pipeline import static_url
+from epic_event.data_versions import data_version
+from epic_event.settings import (TEMPLATE_EXPRESSION_CACHE_SIZE,
+                                 TEMPLATE_FRAGMENT_CACHE_BYTES,
+                                 TEMPLATE_STREAM_CHUNK_SIZE)
+from epic_event.template_compiler import CompiledTemplate, TemplateCompiler
 
 TemplatePart = Union[str, Any]
 Context = Dict[str, Any]
 logger = logging.getLogger(__name__)
 
+EXPRESSION = re.compile(r"{{\s*(.*?)\s*}}")
+FOR_LOOP = re.compile(r"(\w+)\s+in\s+(.+)")
+CACHE_TAG = re.compile(r"(.+?)\s+(\d+(?:\.\d+)?)")
+
+EVALUATION_ERRORS = (SyntaxError, NameError, TypeError, ZeroDivisionError,
+                     AttributeError, KeyError, ValueError)
+
+TEMPLATE_GLOBALS: Context = {
+    "static_url": static_url,
+    "data_version": data_version,
+}
+
+# Query parameters of the list pages which are not filters.
+LIST_PARAMETERS = ("sort", "order", "after", "before", "per_page")
+
+
+def compile_expression(expr: str) -> CodeType:
+    """Compiles an expression the way `eval` compiles a source string.
+
+    Args:
+        expr: The string containing the Python expression.
+
+    Returns:
+        The code object of the expression.
+
+    Raises:
+        SyntaxError: If the expression is not valid Python.
+    """
+    # eval() strips leading spaces and tabs from string sources.
+    return compile(expr.lstrip(" \t"), "<string>", "eval")
+
+
+class Scope(dict):
+    """
+    A context frame layered over an enclosing context.
+
+    Only the names set in the frame are stored in it; other names are
+    looked up in `parent`. Opening a frame for a loop iteration or an
+    include therefore costs one small dict instead of a copy of the whole
+    context, and names set in the frame never leak into the parent.
+
+    Reading a name of the frame is a plain dict lookup: `eval` only falls
+    back to `__missing__` for the names of enclosing contexts, which are
+    then remembered in the frame. A frame never outlives the iteration of
+    the enclosing loop that opened it, so these values cannot go stale.
+
+    Attributes:
+        parent: The enclosing context (a dict or another Scope).
+    """
+    __slots__ = ("parent",)
+
+    def __init__(self, parent: Context, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.parent = parent
+
+    def __missing__(self, key: str) -> Any:
+        value = self[key] = self.parent[key]
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return dict.__contains__(self, key) or key in self.parent
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+
+class ExpressionCache:
+    """
+    LRU cache of compiled expressions, keyed by their source.
+
+    Thread-safe, so that the threaded and asyncio servers can share it.
+
+    Attributes:
+        maxsize: Maximum number of code objects kept. 0 disables caching.
+        hits: Lookups answered from the cache.
+        misses: Lookups that compiled the expression.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._codes: "OrderedDict[str, CodeType]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, expr: str) -> CodeType:
+        """
+        Return the code object of an expression, compiling it on a miss.
+
+        Args:
+            expr: The string containing the Python expression.
+
+        Returns:
+            The code object of the expression.
+
+        Raises:
+            SyntaxError, ValueError: If the expression cannot be compiled.
+                Failures are not cached.
+        """
+        with self._lock:
+            code = self._codes.get(expr)
+            if code is not None:
+                self._codes.move_to_end(expr)
+                self.hits += 1
+                return code
+            self.misses += 1
+
+        code = compile_expression(expr)
+        if self.maxsize > 0:
+            with self._lock:
+                self._codes[expr] = code
+                self._codes.move_to_end(expr)
+                while len(self._codes) > self.maxsize:
+                    self._codes.popitem(last=False)
+        return code
+
+    def resize(self, maxsize: int) -> None:
+        """Change the maximum size, evicting the oldest entries if needed."""
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._codes) > max(maxsize, 0):
+                self._codes.popitem(last=False)
+
+    def clear(self) -> None:
+        """Empty the cache and reset the counters."""
+        with self._lock:
+            self._codes.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def size(self) -> int:
+        """Number of code objects currently cached."""
+        return len(self._codes)
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups answered from the cache, from 0 to 1."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the counters, e.g. for logging or a benchmark."""
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hit_rate, "size": self.size,
+                "maxsize": self.maxsize}
+
+
+expression_cache = ExpressionCache(TEMPLATE_EXPRESSION_CACHE_SIZE)
+
+
+class FragmentCache:
+    """
+    LRU cache of rendered template fragments, bounded by their size.
+
+    Thread-safe. Entries expire after their TTL; the least recently used
+    ones are evicted once the fragments exceed the byte budget.
+
+    Attributes:
+        max_bytes: Memory budget of the cached strings. 0 disables caching.
+        hits: Lookups answered from the cache.
+        misses: Lookups of a missing or expired fragment.
+        evictions: Fragments dropped to stay within the budget.
+        expirations: Fragments dropped because their TTL elapsed.
+        size_bytes: Memory used by the cached strings.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.size_bytes = 0
+        self._fragments: "OrderedDict[Any, Tuple[str, int, float]]" = \
+            OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[str]:
+        """
+        Return a cached fragment.
+
+        Args:
+            key: Hashable key of the fragment.
+
+        Returns:
+            The rendered fragment, or None if missing or expired.
+        """
+        with self._lock:
+            entry = self._fragments.get(key)
+            if entry is not None:
+                text, size, expires = entry
+                if not expires or expires > time.monotonic():
+                    self._fragments.move_to_end(key)
+                    self.hits += 1
+                    return text
+                del self._fragments[key]
+                self.size_bytes -= size
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def set(self, key: Any, text: str, ttl: float) -> None:
+        """
+        Store a fragment, evicting the least recently used ones if needed.
+
+        Args:
+            key: Hashable key of the fragment.
+            text: The rendered fragment.
+            ttl: Lifetime in seconds, 0 for no expiry.
+        """
+        size = sys.getsizeof(text)
+        if size > self.max_bytes:
+            return
+        expires = time.monotonic() + ttl if ttl > 0 else 0.0
+        with self._lock:
+            previous = self._fragments.pop(key, None)
+            if previous is not None:
+                self.size_bytes -= previous[1]
+            self._fragments[key] = (text, size, expires)
+            self.size_bytes += size
+            while self.size_bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._fragments.popitem(last=False)
+                self.size_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Empty the cache and reset the counters."""
+        with self._lock:
+            self._fragments.clear()
+            self.size_bytes = 0
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the counters, e.g. for logging or a benchmark."""
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "fragments": len(self._fragments),
+                "size_bytes": self.size_bytes, "max_bytes": self.max_bytes}
+
+
+fragment_cache = FragmentCache(TEMPLATE_FRAGMENT_CACHE_BYTES)
+
+
+def evaluation_error(expr: str, error: Exception) -> str:
+    """Logs a failed evaluation and returns the message rendered instead.
+
+    Args:
+        expr: The expression that failed.
+        error: The exception raised.
+
+    Returns:
+        The error message inserted in the page.
+    """
+    logger.exception(error)
+    return f"[Error evaluating '{expr}': {error}]"
+
+
+def evaluate(code: CodeType, expr: str, context: Context) -> Any:
+    """Evaluates a compiled expression using a restricted context.
+
+    Args:
+        code: The code object returned by `compile_expression`.
+        expr: The source of the expression, for error messages.
+        context: A dictionary providing variables for evaluation.
+
+    Returns:
+        The result of the evaluated expression, or an error message.
+    """
+    try:
+        return eval(code, {"__builtins__": {}}, context)
+    except EVALUATION_ERRORS as e:
+        return evaluation_error(expr, e)
+
+
+def fragment_key(code: CodeType, expr: str, body: str,
+                 context: Context) -> Optional[Tuple[str, Any]]:
+    """Evaluates the key of a {% cache %} fragment.
+
+    Args:
+        code: The code object of the key expression.
+        expr: The source of the key expression, for error messages.
+        body: Source of the fragment, so that two fragments using the same
+            key expression do not share entries.
+        context: A dictionary providing variables for evaluation.
+
+    Returns:
+        The cache key, or None if the expression fails or is not hashable:
+        the fragment is then rendered without cache.
+    """
+    try:
+        key = (body, eval(code, {"__builtins__": {}}, context))
+        hash(key)
+    except EVALUATION_ERRORS as e:
+        logger.warning("Clé de cache invalide '%s' : %s", expr, e)
+        return None
+    return key
+
 
 def safe_eval(expr: str, context: Context) -> Any:
     """Safely evaluates a Python expression using a restricted context.
 
+    The expression is compiled once, then taken from `expression_cache`.
+
     Args:
         expr: The string containing the Python expression.
         context: A dictionary providing variables for evaluation.
@@ -30,26 +369,87 @@ def safe_eval(expr: str, context: Context) -> Any:
         The result of the evaluated expression, or an error message.
     """
     try:
-        return eval(expr, {"__builtins__": {}}, context)
-    except (SyntaxError, NameError, TypeError, ZeroDivisionError,
-            AttributeError, KeyError, ValueError) as e:
-        logger.exception(e)
-        return f"[Error evaluating '{expr}': {e}]"
+        code = expression_cache.get(expr)
+    except (SyntaxError, ValueError) as e:
+        return evaluation_error(expr, e)
+    return evaluate(code, expr, context)
+
+
+class TemplateStream:
+    """
+    A page rendered lazily, iterated as encoded chunks.
+
+    Rendering happens while the stream is iterated: only the current chunk
+    is held in memory, whatever the size of the page. The stream can be
+    consumed once, either by iterating it or with `text()`.
+
+    Attributes:
+        chunk_size: Number of characters gathered before a chunk is yielded.
+        flush_after: Marker ending the first chunk as soon as it is
+            rendered (the end of the page head by default), so the browser
+            can start loading styles early. None disables it.
+        charset: Encoding of the chunks.
+    """
+
+    def __init__(self, pieces: Iterable[str],
+                 chunk_size: int = TEMPLATE_STREAM_CHUNK_SIZE,
+                 flush_after: Optional[str] = "</head>",
+                 charset: str = "utf-8"):
+        self.chunk_size = chunk_size
+        self.flush_after = flush_after
+        self.charset = charset
+        self._pieces = pieces
+
+    def __iter__(self) -> Iterator[bytes]:
+        buffer, size = [], 0
+        marker = self.flush_after
+        for piece in self._pieces:
+            if not piece:
+                continue
+            buffer.append(piece)
+            size += len(piece)
+            if size >= self.chunk_size or (marker and marker in piece):
+                marker = None
+                yield "".join(buffer).encode(self.charset)
+                buffer, size = [], 0
+        if buffer:
+            yield "".join(buffer).encode(self.charset)
+
+    def text(self) -> str:
+        """Render the whole page as one string."""
+        return "".join(self._pieces)
 
 
 class TemplateRenderer:
     """Template rendering engine using custom tag syntax."""
 
     def __init__(self, template_dir: str = "epic_event/templates",
-                 tag_dir: str = "epic_event/templates/templates_tag"):
+                 tag_dir: str = "epic_event/templates/templates_tag",
+                 template_globals: Optional[Context] = None):
         """Initializes the renderer with template and tag directories.
 
         Args:
             template_dir: Base directory for main templates.
             tag_dir: Directory for partials or included templates.
+            template_globals: Names available in every template,
+                TEMPLATE_GLOBALS by default.
         """
         self.template_dir = template_dir
         self.tag_dir = tag_dir
+        self.template_globals = (TEMPLATE_GLOBALS if template_globals is None
+                                 else template_globals)
+        self.compiler = TemplateCompiler(self, {
+            "compile": expression_cache.get,
+            "evaluate": evaluate,
+            "error": evaluation_error,
+            "expression": EXPRESSION,
+            "for_loop": FOR_LOOP,
+            "cache_tag": CACHE_TAG,
+            "scope": Scope,
+            "fragment_key": fragment_key,
+            "fragment_cache": fragment_cache,
+        })
+        self._compiled: Dict[str, CompiledTemplate] = {}
 
     def read_template(self, template_name: str) -> Optional[str]:
         """Reads the content of a template file by name.
@@ -82,6 +482,80 @@ class TemplateRenderer:
     def render_template(self, template_name: str, context: Context) -> str:
         """Renders a template with the provided context.
 
+        The template is compiled to a Python function on first use, then
+        recompiled only when it or one of the templates it uses changes.
+
+        Args:
+            template_name: Entry-point template filename.
+            context: Variables to inject into the template.
+
+        Returns:
+            A fully rendered HTML string.
+        """
+        return ''.join(self._render_pieces(template_name, context))
+
+    def stream_template(self, template_name: str, context: Context,
+                        chunk_size: int = TEMPLATE_STREAM_CHUNK_SIZE) -> \
+            TemplateStream:
+        """Renders a template lazily, as a stream of encoded chunks.
+
+        Nothing is rendered before the stream is iterated.
+
+        Args:
+            template_name: Entry-point template filename.
+            context: Variables to inject into the template.
+            chunk_size: Number of characters per chunk.
+
+        Returns:
+            A TemplateStream yielding the page in UTF-8 chunks.
+        """
+        return TemplateStream(self._render_pieces(template_name, context),
+                              chunk_size)
+
+    def _render_pieces(self, template_name: str, context: Context) -> \
+            Iterator[str]:
+        """Yields the output of a compiled template piece by piece.
+
+        Args:
+            template_name: Entry-point template filename.
+            context: Variables to inject into the template.
+
+        Yields:
+            The rendered strings, in order.
+        """
+        compiled = self.get_compiled(template_name)
+        if compiled is None:
+            yield f"<h1>Template '{template_name}' not found</h1>"
+            return
+        context = {**self.template_globals, **context}
+        yield from compiled.function(context)
+
+    def get_compiled(self, template_name: str) -> \
+            Optional[CompiledTemplate]:
+        """Returns the compiled template, compiling it if needed.
+
+        Args:
+            template_name: Entry-point template filename.
+
+        Returns:
+            The compiled template, or None if the file does not exist.
+        """
+        compiled = self._compiled.get(template_name)
+        if compiled is None or compiled.is_stale():
+            compiled = self.compiler.compile(template_name)
+            if compiled is None:
+                self._compiled.pop(template_name, None)
+                return None
+            self._compiled[template_name] = compiled
+        return compiled
+
+    def render_template_interpreted(self, template_name: str,
+                                    context: Context) -> str:
+        """Renders a template without compiling it.
+
+        Produces the same output as `render_template`, reading and
+        interpreting the template files on every call.
+
         Args:
             template_name: Entry-point template filename.
             context: Variables to inject into the template.
@@ -104,6 +578,7 @@ class TemplateRenderer:
             parsed = self._split_template(base_code)
             parsed = self._replace_blocks(parsed, blocks_context)
 
+        context = {**self.template_globals, **context}
         return ''.join(self._render_blocks(parsed, context))
 
     def _render_blocks(self, parts: List[TemplatePart], context: Context) -> \
@@ -121,8 +596,8 @@ class TemplateRenderer:
         i = 0
         while i < len(parts):
             part = parts[i]
-            if isinstance(part, str) and part.strip().startswith("{%"):
-                tag = part.strip()[2:-2].strip()
+            tag = self._tag(part)
+            if tag is not None:
                 if tag.startswith("if "):
                     block, i = self._handle_if(tag[3:], parts, context, i)
                     output.extend(block)
@@ -133,9 +608,12 @@ class TemplateRenderer:
                     output.extend(self._handle_include(tag.split(), context))
                     i += 1
                     continue
+                elif tag.startswith("cache "):
+                    block, i = self._handle_cache(tag[6:], parts, context, i)
+                    output.extend(block)
                 i += 1
             elif isinstance(part, str):
-                output.append(re.sub(r"{{\s*(.*?)\s*}}", lambda m: str(
+                output.append(EXPRESSION.sub(lambda m: str(
                     safe_eval(m.group(1), context)), part))
                 i += 1
             else:
@@ -143,26 +621,42 @@ class TemplateRenderer:
                 i += 1
         return output
 
-    def _handle_if(self, condition: str, parts: List[TemplatePart],
-                   context: Context, i: int) -> Tuple[List[str], int]:
-        """Processes an {% if %}...{% else %}...{% endif %} block.
+    @staticmethod
+    def _tag(part: TemplatePart) -> Optional[str]:
+        """Returns the inside of a {% tag %} part, or None for other parts.
+
+        Args:
+            part: A template part.
+
+        Returns:
+            The stripped tag content, e.g. "if user", or None.
+        """
+        if isinstance(part, str) and part.strip().startswith("{%"):
+            return part.strip()[2:-2].strip()
+        return None
+
+    @classmethod
+    def _scan_if(cls, parts: List[TemplatePart], i: int) -> \
+            Tuple[List[TemplatePart], List[TemplatePart], int]:
+        """Splits an {% if %} block into its two branches.
+
+        The else branch ends at the first literal "{% endif %}".
 
         Args:
-            condition: Condition expression for the if.
             parts: The full list of template parts.
-            context: Variable dictionary.
-            i: Current index in parts.
+            i: Index of the {% if %} tag in parts.
 
         Returns:
-            A tuple of rendered content and updated index.
+            The parts of the true and false branches, and the index of the
+            tag ending the block.
         """
         true_block, false_block = [], []
         depth = 1
         i += 1
         while i < len(parts):
             part = parts[i]
-            if isinstance(part, str) and part.strip().startswith("{%"):
-                tag_inner = part.strip()[2:-2].strip()
+            tag_inner = cls._tag(part)
+            if tag_inner is not None:
                 if tag_inner.startswith("if "):
                     depth += 1
                 elif tag_inner == "endif":
@@ -177,30 +671,27 @@ class TemplateRenderer:
                     break
             true_block.append(part)
             i += 1
+        return true_block, false_block, i
 
-        block = true_block if safe_eval(condition, context) else false_block
-        return self._render_blocks(block, context), i
-
-    def _handle_for(self, condition: str, parts: List[TemplatePart],
-                    context: Context, i: int) -> Tuple[List[str], int]:
-        """Processes a {% for %}...{% endfor %} block.
+    @classmethod
+    def _scan_for(cls, parts: List[TemplatePart], i: int) -> \
+            Tuple[List[TemplatePart], int]:
+        """Collects the body of a {% for %} block.
 
         Args:
-            condition: The loop declaration (e.g., "item in items").
-            parts: Template parts.
-            context: Context for rendering.
-            i: Index in parts.
+            parts: The full list of template parts.
+            i: Index of the {% for %} tag in parts.
 
         Returns:
-            Tuple of rendered loop content and new index.
+            The parts of the loop body, and the index of its {% endfor %}.
         """
         loop_block = []
         depth = 1
         i += 1
         while i < len(parts):
             part = parts[i]
-            if isinstance(part, str) and part.strip().startswith("{%"):
-                tag_inner = part.strip()[2:-2].strip()
+            tag_inner = cls._tag(part)
+            if tag_inner is not None:
                 if tag_inner.startswith("for "):
                     depth += 1
                 elif tag_inner == "endfor":
@@ -209,8 +700,71 @@ class TemplateRenderer:
                         break
             loop_block.append(part)
             i += 1
+        return loop_block, i
+
+    @classmethod
+    def _scan_cache(cls, parts: List[TemplatePart], i: int) -> \
+            Tuple[List[TemplatePart], int]:
+        """Collects the body of a {% cache %} block.
+
+        Args:
+            parts: The full list of template parts.
+            i: Index of the {% cache %} tag in parts.
 
-        match = re.match(r"(\w+)\s+in\s+(.+)", condition)
+        Returns:
+            The parts of the fragment, and the index of its {% endcache %}.
+        """
+        body = []
+        depth = 1
+        i += 1
+        while i < len(parts):
+            part = parts[i]
+            tag_inner = cls._tag(part)
+            if tag_inner is not None:
+                if tag_inner.startswith("cache "):
+                    depth += 1
+                elif tag_inner == "endcache":
+                    depth -= 1
+                    if depth == 0:
+                        break
+            body.append(part)
+            i += 1
+        return body, i
+
+    def _handle_if(self, condition: str, parts: List[TemplatePart],
+                   context: Context, i: int) -> Tuple[List[str], int]:
+        """Processes an {% if %}...{% else %}...{% endif %} block.
+
+        Args:
+            condition: Condition expression for the if.
+            parts: The full list of template parts.
+            context: Variable dictionary.
+            i: Current index in parts.
+
+        Returns:
+            A tuple of rendered content and updated index.
+        """
+        true_block, false_block, i = self._scan_if(parts, i)
+
+        block = true_block if safe_eval(condition, context) else false_block
+        return self._render_blocks(block, context), i
+
+    def _handle_for(self, condition: str, parts: List[TemplatePart],
+                    context: Context, i: int) -> Tuple[List[str], int]:
+        """Processes a {% for %}...{% endfor %} block.
+
+        Args:
+            condition: The loop declaration (e.g., "item in items").
+            parts: Template parts.
+            context: Context for rendering.
+            i: Index in parts.
+
+        Returns:
+            Tuple of rendered loop content and new index.
+        """
+        loop_block, i = self._scan_for(parts, i)
+
+        match = FOR_LOOP.match(condition)
         if not match:
             return [f"[Error: malformed for loop: '{condition}']"], i
 
@@ -224,11 +778,44 @@ class TemplateRenderer:
 
         result = []
         for item in iterable:
-            new_ctx = context.copy()
-            new_ctx[var_name] = item
-            result.extend(self._render_blocks(loop_block, new_ctx))
+            result.extend(self._render_blocks(
+                loop_block, Scope(context, {var_name: item})))
         return result, i
 
+    def _handle_cache(self, declaration: str, parts: List[TemplatePart],
+                      context: Context, i: int) -> Tuple[List[str], int]:
+        """Processes a {% cache key_expr ttl %}...{% endcache %} block.
+
+        Args:
+            declaration: The key expression and TTL in seconds.
+            parts: Template parts.
+            context: Context for rendering.
+            i: Index in parts.
+
+        Returns:
+            Tuple of the fragment, from the cache or rendered, and new index.
+        """
+        body, i = self._scan_cache(parts, i)
+
+        match = CACHE_TAG.fullmatch(declaration)
+        if not match:
+            return [f"[Error: malformed cache tag: '{declaration}']"], i
+
+        key_expr, ttl = match.groups()
+        try:
+            code = expression_cache.get(key_expr)
+        except (SyntaxError, ValueError) as e:
+            return [evaluation_error(key_expr, e)], i
+
+        key = fragment_key(code, key_expr, "".join(map(str, body)), context)
+        if key is None:
+            return self._render_blocks(body, context), i
+        fragment = fragment_cache.get(key)
+        if fragment is None:
+            fragment = "".join(self._render_blocks(body, context))
+            fragment_cache.set(key, fragment, float(ttl))
+        return [fragment], i
+
     def _handle_include(self, tag_parts: List[str], context: Context) -> \
             List[str]:
         """Handles {% include 'template.html' var %} directives.
@@ -244,7 +831,7 @@ class TemplateRenderer:
             return ["[Error: malformed include tag]"]
 
         template_name = tag_parts[1].strip("'\"")
-        sub_context = context.copy()
+        sub_context = Scope(context)
 
         if len(tag_parts) >= 3:
             var_expr = tag_parts[2]
@@ -351,10 +938,27 @@ def make_sort_url(field: str, current_sort: str, current_order: str) -> str:
     return base
 
 
+def make_filter_string(query_params: Dict[str, List[str]]) -> str:
+    """
+    Re-encodes the filters of a list page, to append them to its links.
+
+    Args:
+        query_params: HTTP GET query parameters of the current page.
+    Returns:
+        str: "&key=value..." for every parameter which is not a sorting or
+            pagination one, "" if there are none.
+    """
+    filters = [(key, values[0]) for key, values in query_params.items()
+               if key not in LIST_PARAMETERS and values]
+    return "&" + urlencode(filters) if filters else ""
+
+
 def make_query_string(query_params):
     """
     Generates a query string dictionary for multi-field sorting.
 
+    The filters of the current page are kept.
+
     Args:
         query_params (Optional[Dict[str, List[str]]]):
             HTTP GET query parameters for sorting
@@ -366,11 +970,13 @@ def make_query_string(query_params):
     """
     sort_field = query_params.get("sort", ["id"])[0]
     order = query_params.get("order", ["asc"])[0]
+    filters = make_filter_string(query_params)
 
-    return {
+    links = {
         "email": make_sort_url("email", sort_field, order),
         "id": make_sort_url("id", sort_field, order),
         "client": make_sort_url("contract.client.company_name", sort_field, order),
+        "client_company": make_sort_url("client.company_name", sort_field, order),
         "total_amount": make_sort_url("total_amount", sort_field, order),
         "amount_due": make_sort_url("amount_due", sort_field, order),
         "created_date": make_sort_url("created_date", sort_field, order),
@@ -388,3 +994,40 @@ def make_query_string(query_params):
         "location": make_sort_url("location", sort_field, order),
         "participants": make_sort_url("participants", sort_field, order),
     }
+    if filters:
+        links = {key: url + filters for key, url in links.items()}
+    return links
+
+
+def make_page_links(query_params: Dict[str, List[str]], page: Any,
+                    sort_field: str, descending: bool,
+                    per_page: int) -> Dict[str, str]:
+    """
+    Generates the query strings of the pages around a keyset page.
+
+    The sort, order and page size are the ones the list was queried with,
+    not the raw query parameters; the filters are kept. Every value is
+    URL-encoded.
+
+    Args:
+        query_params: HTTP GET query parameters of the current page.
+        page: The `Page` being displayed.
+        sort_field: Field the list is sorted on.
+        descending: Whether the sort is descending.
+        per_page: Page size, after clamping.
+    Returns:
+        Dict[str, str]:
+            "previous" and/or "next" query strings, only for the pages
+            that exist.
+    """
+    base = "?" + urlencode({"sort": sort_field,
+                            "order": "desc" if descending else "asc",
+                            "per_page": int(per_page)})
+    base += make_filter_string(query_params)
+
+    links = {}
+    if page.has_previous:
+        links["previous"] = f"{base}&before={page.previous_cursor}"
+    if page.has_next:
+        links["next"] = f"{base}&after={page.next_cursor}"
+    return links
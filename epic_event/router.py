@@ -7,27 +7,50 @@ to various view functions of the application.
 
 Main Responsibilities:
 - Dispatches requests to entity-specific CRUD views (list, detail, create,
-    update, delete).
-- Manages authentication routes (login, logout).
-- Serves static files from the `/static/` directory.
+    update, delete), through a declarative route table compiled once.
+- Manages authentication routes (login, logout), refusing login attempts
+    beyond the limits of `login_throttle` with a 429 before checking them.
+- Serves static files from the `/static/` directory, from an in-memory
+    cache and with HTTP caching headers (ETag, Last-Modified, 304);
+    fingerprinted assets are sent precompressed and marked immutable.
 - Handles collaborator password management and client contact marking.
 - Manages session-based actions like archive display toggling.
+- Optionally opens one SQLAlchemy session per request, so the handler can
+    be served by a `ThreadingHTTPServer`.
+- Frames every response with an exact `Content-Length`, so connections can
+    be kept alive in HTTP/1.1 mode.
+- Compresses HTML pages according to the client's `Accept-Encoding`.
+- Streams the pages rendered lazily (`TemplateStream`) while they are
+    rendered, with `Transfer-Encoding: chunked` in HTTP/1.1.
 
 Usage:
 This module is used as the HTTP entry point of the application.
 It connects HTTP requests to the relevant business logic in `views`.
 
 """
+import html
 import logging
-import mimetypes
-import os
-import re
+import shutil
+import socket
 import urllib.parse
+from contextlib import contextmanager
+from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler
 from urllib.parse import parse_qs, urlparse
 
-from epic_event.models import SESSION_CONTEXT
-from epic_event.settings import entities
+from epic_event import sessions
+from epic_event.compression import (accepts_encoding, iter_compressed,
+                                     iter_encoded, negotiate_encoding)
+from epic_event.data_versions import refresh_data_versions
+from epic_event.render_engine import TemplateStream
+from epic_event.settings import (COMPRESSION_ENABLED, COMPRESSION_LEVEL,
+                                 COMPRESSION_MIN_SIZE, HTML_STREAMING_ENABLED,
+                                 KEEP_ALIVE_MAX_REQUESTS,
+                                 STATIC_BUILD_DIR,
+                                 STATIC_IMMUTABLE_CACHE_CONTROL, entities)
+from epic_event.routing import RouteTable
+from epic_event.static_files import StaticFiles, is_not_modified
+from epic_event.throttling import LoginThrottle, LoginThrottled
 from epic_event.views import (client_contact_view, collaborator_password_view,
                               entity_create_post_view, entity_create_view,
                               entity_delete_view, entity_detail_view,
@@ -38,13 +61,74 @@ from epic_event.views import (client_contact_view, collaborator_password_view,
 logger = logging.getLogger(__name__)
 
 
+route_table = RouteTable()
+route_table.add("GET", "/", "handle_home")
+route_table.add("GET", "/static/<path:filename>", "serve_static_file")
+route_table.add("GET", "/login", "handle_login_get")
+route_table.add("POST", "/login", "handle_login")
+route_table.add("GET", "/logout", "handle_logout")
+route_table.add("POST", "/toggle_archive_display",
+                "handle_toggle_archive_display")
+route_table.add("GET", "/<entity>", "handle_entity_list", query_params=True)
+route_table.add("GET", "/<entity>/create", "handle_entity_create",
+                query_params=True)
+route_table.add("POST", "/<entity>/create", "handle_entity_create_post")
+route_table.add("GET", "/<entity>/<int:pk>", "handle_entity_detail")
+route_table.add("GET", "/<entity>/<int:pk>/update", "handle_entity_update")
+route_table.add("POST", "/<entity>/<int:pk>/update",
+                "handle_entity_update_post")
+route_table.add("GET", "/<entity>/<int:pk>/delete", "handle_entity_delete")
+route_table.add("POST", "/<entity>/<int:pk>/delete", "handle_entity_delete")
+route_table.add("GET", "/collaborators/<int:pk>/password",
+                "handle_collaborator_password_get")
+route_table.add("POST", "/collaborators/<int:pk>/password",
+                "handle_collaborator_password_post")
+route_table.add("POST", "/clients/<int:client_id>/contact",
+                "handle_client_contact")
+
+
 class MyHandler(BaseHTTPRequestHandler):
     """
     Custom HTTP handler for routing and processing application requests.
     Handles CRUD operations, authentication, and static files.
+
+    Attributes:
+        session: Session shared by every request (single-threaded mode).
+        database: `Database` used to open a session per request.
+        request_scoped_sessions: If True, each request gets its own session
+            from `database`, closed when the request ends.
+        protocol_version: "HTTP/1.1" keeps connections alive between
+            requests; "HTTP/1.0" closes them after each response.
+        timeout: Seconds an idle connection is kept open (None: no limit).
+        keep_alive_max_requests: Requests served on one connection before
+            it is closed (0: no limit).
+        route_table: Routes of the application, see `routing`.
+        static_files: Cache of the files served under `/static/`, loaded
+            when the module is imported.
+        fingerprinted_files: Cache of the fingerprinted assets built by
+            `asset_pipeline`, served with an immutable Cache-Control.
+        stream_html: If True, pages rendered as a `TemplateStream` are
+            written while they are rendered; otherwise they are rendered
+            completely first.
+        login_throttle: Rate limits and concurrency cap of the login
+            attempts, see `throttling`.
     """
     session = None
     database = None
+    request_scoped_sessions = False
+    protocol_version = "HTTP/1.0"
+    timeout = None
+    keep_alive_max_requests = KEEP_ALIVE_MAX_REQUESTS
+    route_table = route_table
+    static_files = StaticFiles()
+    fingerprinted_files = StaticFiles(
+        STATIC_BUILD_DIR, cache_control=STATIC_IMMUTABLE_CACHE_CONTROL)
+    stream_html = HTML_STREAMING_ENABLED
+    login_throttle = LoginThrottle()
+    requests_on_connection = 0
+    request_parsed = False
+    last_request_of_worker = False
+    _body = None
 
     def log_message(self, format, *args):
         pass
@@ -52,6 +136,117 @@ class MyHandler(BaseHTTPRequestHandler):
     def log_request(self, code='-', size='-'):
         pass
 
+    def handle_one_request(self):
+        self.requests_on_connection += 1
+        self.request_parsed = False
+        self._body = None
+        with self.request_session():
+            super().handle_one_request()
+
+    def parse_request(self):
+        self.request_parsed = super().parse_request()
+        # A pre-forked worker counts requests to know when to recycle.
+        count_request = getattr(self.server, "count_request", None)
+        if self.request_parsed and count_request is not None:
+            self.last_request_of_worker = count_request()
+        if self.request_parsed:
+            # Sees the commits of the other pre-forked workers.
+            refresh_data_versions()
+        return self.request_parsed
+
+    def end_headers(self):
+        if not self.close_connection and (
+                self.last_request_of_worker
+                or (self.keep_alive_max_requests
+                    and self.requests_on_connection
+                    >= self.keep_alive_max_requests)):
+            self.send_header("Connection", "close")
+        super().end_headers()
+
+    def send_error(self, code, message=None, explain=None, headers=None):
+        """
+        Send an HTML error page framed with an exact Content-Length.
+
+        Same as `BaseHTTPRequestHandler.send_error`, except that the
+        connection is only closed when the request itself could not be
+        parsed; errors returned by the routing keep it alive.
+
+        Args:
+            code (int): HTTP status code.
+            message (str, optional): Short message, defaults to the reason.
+            explain (str, optional): Longer explanation shown in the body.
+            headers (dict, optional): Additional HTTP headers to be added.
+        """
+        try:
+            short_message, long_message = self.responses[code]
+        except KeyError:
+            short_message, long_message = "???", "???"
+        message = short_message if message is None else message
+        explain = long_message if explain is None else explain
+
+        self.log_error("code %d, message %s", code, message)
+        self.send_response(code, message)
+        if not self.request_parsed:
+            self.send_header("Connection", "close")
+        if headers:
+            for name, value in headers.items():
+                self.send_header(name, value)
+
+        body = b""
+        if code >= 200 and code not in (HTTPStatus.NO_CONTENT,
+                                        HTTPStatus.RESET_CONTENT,
+                                        HTTPStatus.NOT_MODIFIED):
+            body = (self.error_message_format % {
+                "code": code,
+                "message": html.escape(message, quote=False),
+                "explain": html.escape(explain, quote=False)
+            }).encode("utf-8", "replace")
+            self.send_header("Content-Type", self.error_content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if self.command != "HEAD" and body:
+            self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        """
+        Read the request body once.
+
+        Later calls return the same bytes. The body must always be consumed
+        before the next request is read from a persistent connection.
+
+        Returns:
+            bytes: The raw body, as announced by Content-Length.
+        """
+        if self._body is None:
+            length = int(self.headers.get("Content-Length", 0) or 0)
+            self._body = self.rfile.read(length) if length > 0 else b""
+        return self._body
+
+    @contextmanager
+    def request_session(self):
+        """
+        Bind a SQLAlchemy session to the current request.
+
+        In request-scoped mode, a new session is opened from
+        `database.SessionLocal` and stored on the instance (shadowing the
+        class attribute), then closed once the request is handled.
+        Otherwise the shared class-level session is used.
+
+        Yields:
+            Session: The session to use for this request.
+        """
+        if not self.request_scoped_sessions or self.database is None:
+            yield self.session
+            return
+
+        with self.database.session_scope() as session:
+            self.session = session
+            try:
+                yield session
+            finally:
+                del self.session
+
     def parsed_url(self):
         """
             Analyze the request URL.
@@ -66,113 +261,146 @@ class MyHandler(BaseHTTPRequestHandler):
         """
         Dispatch HTTP request to the appropriate handler based on method and URL path.
 
+        The handler is looked up in `route_table`; path parameters are
+        passed to it as keyword arguments, already converted (`<int:pk>`
+        gives an int), along with the parsed query string for the routes
+        declared with `query_params`.
+
         Args:
             method (str): HTTP method of the request (e.g., "GET", "POST").
 
         Returns:
             Any: The result of the matched handler function (typically an HTTP response).
 
-        Behavior:
-            - Routes GET requests for:
-                - Home page
-                - Logout
-                - Entity list, detail, create form
-                - Entity actions: update, delete, password
-            - Routes POST requests for:
-                - Login
-                - Archive display toggle
-                - Entity creation, update, delete
-                - Collaborator password update
-                - Client contact marking
-
-            Returns a 403 error for direct GET access to /login.
-            Returns a 404 error if no matching route is found.
+        Returns a 405 error, with an Allow header, if the path exists for
+        other methods only.
+        Returns a 404 error if no matching route is found.
         """
         path, query_params = self.parsed_url()
-        segments = path.strip("/").split("/")
-
-        if method == "GET":
-            if path == "/":
-                return self.handle_home()
-
-            if path == "/logout":
-                return self.handle_logout()
-
-            if path == "/login":
-                return self.send_error(403, "Accès direct interdit")
+        route, params, allowed = self.route_table.match(method, path)
 
-            if len(segments) == 1:
-                entity = segments[0]
-                return self.handle_entity_list(entity, query_params)
+        if route is None:
+            if allowed:
+                return self.send_error(
+                    405, "Méthode non autorisée",
+                    headers={"Allow": ", ".join(allowed)})
+            return self.send_error(404, "Page non trouvée")
 
-            if len(segments) == 2 and segments[1] == "create":
-                return self.handle_entity_create(segments[0], query_params)
+        if route.query_params:
+            params["query_params"] = query_params
+        return getattr(self, route.handler)(**params)
 
-            if len(segments) == 2:
-                entity, pk = segments
-                return self.handle_entity_detail(entity, int(pk))
-
-            if len(segments) == 3:
-                entity, pk, action = segments
-                if action == "delete":
-                    return self.handle_entity_delete(entity, int(pk))
-                if action == "update":
-                    return self.handle_entity_update(entity, int(pk))
-                if action == "password":
-                    return self.handle_collaborator_password_get(int(pk))
-
-        elif method == "POST":
-
-            if path == "/login":
-                return self.handle_login()
-
-            if path == "/toggle_archive_display":
-                return self.handle_toggle_archive_display()
+    def do_GET(self):
+        return self.dispatch_route("GET")
 
-            if len(segments) == 2 and segments[1] == "create":
-                return self.handle_entity_create_post(segments[0])
+    def do_POST(self):
+        try:
+            return self.dispatch_route("POST")
+        finally:
+            self._read_body()
 
-            if len(segments) == 3:
-                entity, pk, action = segments
-                if action == "delete":
-                    return self.handle_entity_delete_post(entity, int(pk))
-                if action == "update":
-                    return self.handle_entity_update_post(entity, int(pk))
-                if action == "password":
-                    return self.handle_collaborator_password_post(int(pk))
+    def _send_html(self, content, headers=None, status=200):
+        """
+            Sends an HTTP response with HTML content.
 
-            if len(segments) == 3 and segments[0] == "clients" and segments[
-                2] == "contact":
-                return self.handle_client_contact(int(segments[1]))
+            The content is compressed with gzip or deflate when the client
+            accepts it and it is larger than COMPRESSION_MIN_SIZE.
+            A `TemplateStream` is streamed, see `_stream_html`.
 
-            if path == "toggle_archive_display":
-                return self.handle_toggle_archive_display()
+            Args:
+                content (str | TemplateStream): The HTML content to send.
+                headers (dict, optional): Additional HTTP headers to be added.
+                status (int): HTTP status code of a non-streamed response.
+            """
+        if isinstance(content, TemplateStream):
+            if self.stream_html:
+                self._stream_html(content, headers)
+                return
+            content = content.text()
+
+        encoding = None
+        if COMPRESSION_ENABLED and len(content) >= COMPRESSION_MIN_SIZE:
+            encoding = negotiate_encoding(
+                self.headers.get("Accept-Encoding", ""))
+
+        if encoding:
+            chunks = list(iter_compressed(iter_encoded(content), encoding,
+                                          COMPRESSION_LEVEL))
+        else:
+            chunks = [content.encode("utf-8")]
 
-        return self.send_error(404, "Page non trouvée")
+        self.send_response(status)
+        self.send_header("Content-type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(sum(map(len, chunks))))
+        if COMPRESSION_ENABLED:
+            self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        if headers:
+            for name, value in headers.items():
+                self.send_header(name, value)
+        self.end_headers()
+        for chunk in chunks:
+            self.wfile.write(chunk)
 
-    def do_GET(self):
-        if self.path.startswith("/static/"):
-            return self.serve_static_file()
-        return self.dispatch_route("GET")
+    def _stream_html(self, stream, headers=None):
+        """
+            Sends an HTML page while it is being rendered.
 
-    def do_POST(self):
-        return self.dispatch_route("POST")
+            Each chunk of the stream is written as soon as it is rendered:
+            framed with `Transfer-Encoding: chunked` when both sides speak
+            HTTP/1.1, delimited by closing the connection otherwise. The
+            chunks are compressed on the fly, flushed one by one, when the
+            client accepts gzip or deflate.
 
-    def _send_html(self, content, headers=None):
-        """
-            Sends an HTTP response with HTML content.
+            If rendering fails once the headers are sent, the response is
+            left unterminated and the connection closed, so the client sees
+            a truncated page rather than a complete one.
 
             Args:
-                content (str): The HTML content to send.
+                stream (TemplateStream): The page to send.
                 headers (dict, optional): Additional HTTP headers to be added.
             """
+        chunked = (self.protocol_version == "HTTP/1.1"
+                   and self.request_version == "HTTP/1.1")
+        encoding = None
+        if COMPRESSION_ENABLED:
+            encoding = negotiate_encoding(
+                self.headers.get("Accept-Encoding", ""))
+
+        chunks = iter(stream)
+        if encoding:
+            chunks = iter_compressed(chunks, encoding, COMPRESSION_LEVEL,
+                                     sync_flush=True)
+
         self.send_response(200)
         self.send_header("Content-type", "text/html; charset=utf-8")
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        else:
+            self.send_header("Connection", "close")
+        if COMPRESSION_ENABLED:
+            self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
         if headers:
             for name, value in headers.items():
                 self.send_header(name, value)
         self.end_headers()
-        self.wfile.write(content.encode("utf-8"))
+
+        try:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                if chunked:
+                    chunk = b"%X\r\n%s\r\n" % (len(chunk), chunk)
+                self.wfile.write(chunk)
+        except Exception:
+            logger.exception("Rendu interrompu : %s", self.path)
+            self.close_connection = True
+            return
+        if chunked:
+            self.wfile.write(b"0\r\n\r\n")
 
     def _redirect(self, path="/", headers=None):
         """
@@ -184,35 +412,83 @@ class MyHandler(BaseHTTPRequestHandler):
             """
         self.send_response(302)
         self.send_header("Location", path)
+        self.send_header("Content-Length", "0")
         if headers:
             for name, value in headers.items():
                 self.send_header(name, value)
         self.end_headers()
 
-    def serve_static_file(self):
+    def serve_static_file(self, filename=None):
 
         """
         Serves a static file from the 'static' directory.
 
-        Sends the content of the requested file with the appropriate MIME type.
+        Assets come from the in-memory `static_files` cache, with their
+        ETag, Last-Modified and Cache-Control headers. Fingerprinted assets
+        are looked up first; their precompressed gzip variant is sent when
+        the client accepts it. Conditional requests for an unchanged file
+        get a 304 Not Modified without body. Files too large to be cached
+        are sent from disk.
         If the file is missing, returns a 404 error.
 
-        """
-
-        static_dir = os.path.join(os.path.dirname(__file__), "static")
-        relative_path = self.path[
-                        len("/static/"):]
-        file_path = os.path.join(static_dir, relative_path)
-        if os.path.isfile(file_path):
-            content_type, _ = mimetypes.guess_type(file_path)
-            content_type = content_type or "application/octet-stream"
-            self.send_response(200)
-            self.send_header("Content-type", content_type)
+        Args:
+            filename (str, optional): Path of the file below `/static/`;
+                taken from the request path when omitted.
+        """
+        if filename is None:
+            path, _ = self.parsed_url()
+            filename = path[len("/static/"):]
+        relative_path = urllib.parse.unquote(filename)
+        asset = (self.fingerprinted_files.resolve(relative_path)
+                 or self.static_files.resolve(relative_path))
+        if asset is None:
+            self.send_error(404, f"Fichier statique non trouvé : {self.path}")
+            return
+
+        variant = asset
+        if asset.gzip is not None and accepts_encoding(
+                self.headers.get("Accept-Encoding", ""), "gzip"):
+            variant = asset.gzip
+
+        not_modified = is_not_modified(variant, self.headers)
+        self.send_response(304 if not_modified else 200)
+        self.send_header("ETag", variant.etag)
+        self.send_header("Last-Modified", variant.last_modified)
+        self.send_header("Cache-Control", variant.cache_control)
+        if asset.gzip is not None:
+            self.send_header("Vary", "Accept-Encoding")
+        if not_modified:
             self.end_headers()
-            with open(file_path, "rb") as f:
-                self.wfile.write(f.read())
+            return
+
+        self.send_header("Content-type", variant.content_type)
+        self.send_header("Content-Length", str(variant.size))
+        if variant is not asset:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        if variant.content is not None:
+            self.wfile.write(variant.content)
         else:
-            self.send_error(404, f"Fichier statique non trouvé : {self.path}")
+            self._send_file(variant.path)
+
+    def _send_file(self, file_path):
+        """
+        Write a file to the client without loading it in memory.
+
+        Uses `socket.sendfile` (zero-copy `os.sendfile` where available)
+        when the response goes straight to a socket, and a buffered copy
+        otherwise.
+
+        Args:
+            file_path (str): Path of the file to send.
+        """
+        with open(file_path, "rb") as f:
+            connection = getattr(self, "connection", None)
+            if isinstance(connection, socket.socket):
+                self.wfile.flush()
+                connection.sendfile(f)
+            else:
+                shutil.copyfileobj(f, self.wfile)
 
     def handle_home(self):
         """
@@ -229,24 +505,50 @@ class MyHandler(BaseHTTPRequestHandler):
 
         Reads the POST data, tries to authenticate the user,
         then redirects to the collaborators page if success,
-        or returns the login page with an error message otherwise.
-        """
-        content_length = int(self.headers.get('Content-Length', 0))
-        post_data = self.rfile.read(content_length)
-        post_params = urllib.parse.parse_qs(post_data.decode('utf-8'))
-
-        result = login(self.session, post_params)
+        or returns the login page with an error message otherwise
+        (with a 503 status when the server is too busy to check the
+        password).
+
+        Attempts refused by `login_throttle` get a 429 status, before any
+        database query or password check.
+        """
+        post_params = urllib.parse.parse_qs(self._read_body().decode('utf-8'))
+        client_ip = self.client_address[0]
+        full_name = post_params.get("full_name", [""])[0]
+
+        try:
+            with self.login_throttle.verification():
+                self.login_throttle.check(client_ip, full_name)
+                result = login(self.session, post_params)
+        except LoginThrottled as e:
+            self._send_html(routes["/"](str(e)),
+                            headers={"Retry-After": str(e.retry_after)},
+                            status=429)
+            return
+        if not result.get("busy"):
+            self.login_throttle.record(client_ip, full_name,
+                                       result["success"])
 
         if result["success"]:
             session_id = result["session_id"]
             self._redirect(
                 path="/collaborators",
-                headers={"Set-Cookie": f"session_id={session_id};"
-                                       f" HttpOnly; Path=/"}
+                headers={"Set-Cookie": sessions.session_cookie(session_id)}
             )
+        elif result.get("busy"):
+            self._send_html(result["html"], headers={"Retry-After": "1"},
+                            status=503)
         else:
             self._send_html(result["html"])
 
+    def handle_login_get(self):
+        """
+        Refuses direct GET access to the login endpoint.
+
+        The login form is displayed by the home page and posted to /login.
+        """
+        self.send_error(403, "Accès direct interdit")
+
     def handle_logout(self):
         """
         Handles user logout.
@@ -254,7 +556,7 @@ class MyHandler(BaseHTTPRequestHandler):
         Calls the logout function to clear the session, then redirects
         to the home page while deleting the session cookie.
         """
-        logout(headers=self.headers)
+        logout(session=self.session, headers=self.headers)
         self._redirect(headers={
             "Set-Cookie": "session_id=deleted; Path=/; Max-Age=0"
         })
@@ -323,7 +625,8 @@ class MyHandler(BaseHTTPRequestHandler):
             entity (str): Name of the entity to create.
             query_params (dict): Query parameters from the URL.
 
-        Sends the rendered HTML form for entity creation if the entity is known.
+        Sends the rendered HTML form for entity creation if the entity is known,
+        otherwise returns a 404 error.
         """
         if entity in entities:
 
@@ -333,6 +636,8 @@ class MyHandler(BaseHTTPRequestHandler):
                                          headers=self.headers,
                                          )
             self._send_html(content)
+        else:
+            self.send_error(404, f"Entité inconnue : {entity}")
 
     def handle_entity_delete(self, entity, pk):
         """
@@ -367,9 +672,7 @@ class MyHandler(BaseHTTPRequestHandler):
             pk (int): Primary key (ID) of the collaborator.
         """
         entity = "collaborators"
-        content_length = int(self.headers.get('Content-Length', 0))
-        post_data = self.rfile.read(content_length)
-        form_data = urllib.parse.parse_qs(post_data.decode("utf-8"))
+        form_data = urllib.parse.parse_qs(self._read_body().decode('utf-8'))
         cleaned_data = {k: v[0] for k, v in form_data.items()}
         content = user_password_post_view(pk,
                                           cleaned_data,
@@ -394,10 +697,9 @@ class MyHandler(BaseHTTPRequestHandler):
             self.send_error(
                 404,
                 f"Entité inconnue : {entity}")
+            return
 
-        content_length = int(self.headers.get('Content-Length', 0))
-        post_data = self.rfile.read(content_length)
-        form_data = urllib.parse.parse_qs(post_data.decode('utf-8'))
+        form_data = urllib.parse.parse_qs(self._read_body().decode('utf-8'))
 
         cleaned_data = {k: v[0] for k, v in form_data.items()}
 
@@ -431,56 +733,55 @@ class MyHandler(BaseHTTPRequestHandler):
         else:
             self._send_html(result)
 
-    def handle_entity_update(self, entity_name, pk):
+    def handle_entity_update(self, entity, pk):
         """
         Handles the request to display the update form for a specific entity item.
 
         Args:
-            entity_name (str): Name of the entity.
+            entity (str): Name of the entity.
             pk (int): Primary key (ID) of the entity item.
 
         Sends the rendered HTML update form if the entity is known,
         otherwise returns a 404 error.
         """
-        if entity_name in entities:
+        if entity in entities:
             content = entity_update_view(pk,
                                          session=self.session,
-                                         entity_name=entity_name,
+                                         entity_name=entity,
                                          headers=self.headers)
             self._send_html(content)
         else:
-            self.send_error(404, f"Entité inconnue : {entity_name}")
+            self.send_error(404, f"Entité inconnue : {entity}")
 
-    def handle_entity_update_post(self, entity_name, pk):
+    def handle_entity_update_post(self, entity, pk):
         """
         Handles POST request to update a specific entity item.
 
         Args:
-            entity_name (str): Name of the entity.
+            entity (str): Name of the entity.
             pk (int): Primary key (ID) of the entity item.
 
         Parses form data and processes the update via the corresponding view.
         Redirects to the entity detail page on success,
         otherwise sends back the HTML response with errors.
         """
-        if entity_name not in entities:
+        if entity not in entities:
             self.send_error(
                 404,
-                f"Entité inconnue : {entity_name}")
+                f"Entité inconnue : {entity}")
+            return
 
-        content_length = int(self.headers.get('Content-Length', 0))
-        post_data = self.rfile.read(content_length)
-        form_data = urllib.parse.parse_qs(post_data.decode('utf-8'))
+        form_data = urllib.parse.parse_qs(self._read_body().decode('utf-8'))
 
         cleaned_data = {k: v[0] for k, v in form_data.items()}
 
         result = entity_update_post_view(pk,
                                          cleaned_data,
                                          session=self.session,
-                                         entity_name=entity_name,
+                                         entity_name=entity,
                                          headers=self.headers)
         if result is True:
-            self._redirect(path=f"/{entity_name}/{pk}")
+            self._redirect(path=f"/{entity}/{pk}")
         else:
             self._send_html(result)
 
@@ -490,19 +791,23 @@ class MyHandler(BaseHTTPRequestHandler):
 
         Reads the 'show_archived' parameter from the POST request body,
         updates the user's session setting accordingly,
-        then redirects back to the referring page.
+        then redirects back to the referring page. Without a valid
+        session, nothing is changed. A signed session cookie holds the
+        setting, so it is sent again.
         """
-        content_length = int(self.headers.get('Content-Length', 0))
-        body = self.rfile.read(content_length).decode()
+        body = self._read_body().decode()
         params = urllib.parse.parse_qs(body)
-        cookie = self.headers.get("Cookie", "")
-        match = re.search(r"session_id=([a-f0-9\-]+)", cookie)
-        session_id = match.group(1)
+        session_id = sessions.get_session_id(self.headers)
+        new_session_id = None
 
-        SESSION_CONTEXT[session_id]["Display_archive"] = \
-            params.get("show_archived", ["off"])[
-                0] == "on"
+        if session_id:
+            new_session_id = sessions.session_store.set_display_archive(
+                session_id, params.get("show_archived", ["off"])[0] == "on")
         referer = self.headers.get('Referer', '/')
         self.send_response(303)
         self.send_header('Location', referer)
+        if new_session_id and new_session_id != session_id:
+            self.send_header('Set-Cookie',
+                             sessions.session_cookie(new_session_id))
+        self.send_header('Content-Length', '0')
         self.end_headers()
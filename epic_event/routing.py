@@ -0,0 +1,223 @@
+"""
+routing.py - Declarative URL route table.
+
+Routes are declared once with a pattern such as `/<entity>/<int:pk>/update`
+and compiled into a tree with one node per path segment. Matching a path
+walks one node per segment, so its cost depends on the depth of the path,
+not on the number of routes.
+
+Main Responsibilities:
+- Parses patterns with typed parameters: `<name>` (one segment),
+    `<int:name>` (digits, converted to int) and `<path:name>` (the rest of
+    the path, last parameter only).
+- Prefers static segments over parameters (`/events/create` wins over
+    `/<entity>/<int:pk>`), backtracking when a branch does not match.
+- Ignores a trailing slash: `/events/1/` and `/events/1` are the same URL.
+- Tells apart unknown paths (404) from known paths requested with another
+    method (405, with the methods allowed).
+- Lists the declared routes for introspection.
+
+Usage:
+    table = RouteTable()
+    table.add("GET", "/<entity>/<int:pk>", "handle_entity_detail")
+    match = table.match("GET", "/events/3/")
+    # match.route.handler == "handle_entity_detail"
+    # match.params == {"entity": "events", "pk": 3}
+"""
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+_PARAMETER = re.compile(r"^<(?:(\w+):)?(\w+)>$")
+
+
+def _is_int(segment: str) -> bool:
+    return segment.isascii() and segment.isdigit()
+
+
+# Converter name -> (accepts segment, convert segment).
+CONVERTERS: Dict[str, Tuple[Callable[[str], bool], Callable[[str], Any]]] = {
+    "str": (bool, str),
+    "int": (_is_int, int),
+    "path": (bool, str),
+}
+
+
+class Route(NamedTuple):
+    """
+    A declared route.
+
+    Attributes:
+        method: HTTP method, e.g. "GET".
+        pattern: URL pattern, e.g. "/<entity>/<int:pk>".
+        handler: Name of the handler method called for this route.
+        query_params: Whether the handler receives the parsed query string.
+    """
+    method: str
+    pattern: str
+    handler: str
+    query_params: bool = False
+
+
+class RouteMatch(NamedTuple):
+    """
+    Result of matching a request against the route table.
+
+    Attributes:
+        route: The matched route, or None.
+        params: Converted path parameters of the route.
+        allowed: When `route` is None, the methods the path accepts:
+            empty for an unknown path (404), else a 405 is due.
+    """
+    route: Optional[Route]
+    params: Dict[str, Any]
+    allowed: Tuple[str, ...] = ()
+
+
+class _Node:
+    """One path segment of the route tree."""
+    __slots__ = ("static", "params", "routes")
+
+    def __init__(self):
+        self.static: Dict[str, "_Node"] = {}
+        self.params: List[Tuple[str, str, "_Node"]] = []
+        self.routes: Dict[str, Route] = {}
+
+
+def split_path(path: str) -> List[str]:
+    """
+    Split a URL path into segments, ignoring the surrounding slashes.
+
+    Args:
+        path: URL path, e.g. "/events/1/".
+
+    Returns:
+        list: e.g. ["events", "1"]; [] for "/".
+    """
+    path = path.strip("/")
+    return path.split("/") if path else []
+
+
+class RouteTable:
+    """
+    Compiled set of routes.
+
+    Attributes:
+        root: Root node of the route tree.
+    """
+
+    def __init__(self):
+        self.root = _Node()
+        self._routes: List[Route] = []
+
+    def add(self, method: str, pattern: str, handler: str,
+            query_params: bool = False) -> Route:
+        """
+        Declare a route.
+
+        Args:
+            method: HTTP method.
+            pattern: URL pattern with optional `<converter:name>` segments.
+            handler: Name of the handler method.
+            query_params: Pass the parsed query string to the handler.
+
+        Returns:
+            Route: The declared route.
+
+        Raises:
+            ValueError: If the pattern is malformed or the route is already
+                declared.
+        """
+        node = self.root
+        segments = split_path(pattern)
+        for position, segment in enumerate(segments):
+            parameter = _PARAMETER.match(segment)
+            if parameter is None:
+                node = node.static.setdefault(segment, _Node())
+                continue
+
+            converter, name = parameter.group(1) or "str", parameter.group(2)
+            if converter not in CONVERTERS:
+                raise ValueError(f"Convertisseur inconnu '{converter}' "
+                                 f"dans {pattern}")
+            if converter == "path" and position != len(segments) - 1:
+                raise ValueError(f"<path:{name}> doit terminer le motif "
+                                 f"{pattern}")
+            for known_converter, known_name, child in node.params:
+                if (known_converter, known_name) == (converter, name):
+                    node = child
+                    break
+            else:
+                child = _Node()
+                node.params.append((converter, name, child))
+                node = child
+
+        if method in node.routes:
+            raise ValueError(f"Route déjà déclarée : {method} {pattern}")
+        route = Route(method, pattern, handler, query_params)
+        node.routes[method] = route
+        self._routes.append(route)
+        return route
+
+    def routes(self) -> List[Route]:
+        """Return the declared routes, in declaration order."""
+        return list(self._routes)
+
+    def match(self, method: str, path: str) -> RouteMatch:
+        """
+        Find the route of a request.
+
+        Args:
+            method: HTTP method of the request.
+            path: URL path, without the query string.
+
+        Returns:
+            RouteMatch: The route and its parameters; if no route accepts
+            this method, the methods allowed on the path instead.
+        """
+        segments = split_path(path)
+        params: Dict[str, Any] = {}
+        node = self._find(self.root, segments, 0, method, params)
+        if node is not None:
+            return RouteMatch(node.routes[method], params)
+
+        node = self._find(self.root, segments, 0, None, {})
+        allowed = tuple(sorted(node.routes)) if node is not None else ()
+        return RouteMatch(None, {}, allowed)
+
+    def _find(self, node: _Node, segments: List[str], index: int,
+              method: Optional[str], params: Dict[str, Any]) \
+            -> Optional[_Node]:
+        """
+        Depth-first search of the node matching the remaining segments.
+
+        Static children are tried before parameters. With `method`, only
+        nodes with a route for this method match; without, any route does.
+        """
+        if index == len(segments):
+            if node.routes and (method is None or method in node.routes):
+                return node
+            return None
+
+        segment = segments[index]
+        child = node.static.get(segment)
+        if child is not None:
+            found = self._find(child, segments, index + 1, method, params)
+            if found is not None:
+                return found
+
+        for converter, name, child in node.params:
+            accepts, convert = CONVERTERS[converter]
+            if converter == "path":
+                if child.routes and (method is None
+                                     or method in child.routes):
+                    params[name] = "/".join(segments[index:])
+                    return child
+                continue
+            if not accepts(segment):
+                continue
+            params[name] = convert(segment)
+            found = self._find(child, segments, index + 1, method, params)
+            if found is not None:
+                return found
+            del params[name]
+        return None
@@ -0,0 +1,571 @@
+"""
+sessions.py - Store of the logged-in users' sessions.
+
+A session is created by the login view and identified by the session_id
+cookie. It is kept as a compact SessionRecord: the user's id and role at
+login, and the display flags (archived entities shown or not). The user
+is loaded from the database by `login_required` on each request.
+
+A session ends on logout, after SESSION_IDLE_TTL seconds without a
+request, or SESSION_ABSOLUTE_TTL seconds after the login, whichever comes
+first. Three backends implement SessionStore:
+    - MemorySessionStore: a dict in the process, bounded to
+      SESSION_MAX_ENTRIES sessions, least recently used first out.
+    - SQLiteSessionStore: a `sessions` table, which survives restarts and
+      is shared by the pre-forked workers.
+    - SignedCookieSessionStore: no server-side state, the cookie carries
+      the session signed with HMAC; only logouts are recorded.
+
+Expired sessions are refused when read; `start_sweeper` also deletes them
+periodically from a daemon thread, so that abandoned ones free memory.
+
+Usage:
+    session_id = session_store.create(user.id, user.role)
+    record = session_store.get(session_id)  # None once expired
+    session_id = session_store.set_display_archive(session_id, True)
+    session_store.delete(session_id)
+"""
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import re
+import secrets
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import (Boolean, Column, Float, Integer, MetaData, String,
+                        Table, delete, func, insert, or_, select, update)
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from epic_event.settings import (SESSION_ABSOLUTE_TTL, SESSION_IDLE_TTL,
+                                 SESSION_MAX_ENTRIES)
+
+logger = logging.getLogger(__name__)
+
+SESSION_COOKIE = re.compile(r"session_id=([\w\-.]+)")
+
+
+def get_session_id(headers) -> Optional[str]:
+    """Return the session id of the request's cookie, or None."""
+    match = SESSION_COOKIE.search(headers.get("Cookie", "") or "")
+    return match.group(1) if match else None
+
+
+def session_cookie(session_id: str) -> str:
+    """Return the Set-Cookie value sending a session id."""
+    return f"session_id={session_id}; HttpOnly; Path=/"
+
+
+class SessionRecord:
+    """
+    State of a logged-in user's session.
+
+    Attributes:
+        user_id: Primary key of the collaborator.
+        role: Role of the collaborator at login.
+        display_archive: Whether archived entities are shown.
+        created: Login time (seconds since the epoch).
+        last_seen: Time of the last request.
+    """
+
+    __slots__ = ("user_id", "role", "display_archive", "created",
+                 "last_seen")
+
+    def __init__(self, user_id: int, role: str, display_archive: bool,
+                 created: float, last_seen: float):
+        self.user_id = user_id
+        self.role = role
+        self.display_archive = display_archive
+        self.created = created
+        self.last_seen = last_seen
+
+    def __repr__(self) -> str:
+        return (f"SessionRecord(user_id={self.user_id!r}, "
+                f"role={self.role!r}, "
+                f"display_archive={self.display_archive!r})")
+
+
+class SessionStore:
+    """
+    Interface of the session backends.
+
+    Attributes:
+        idle_ttl: Seconds without a request after which a session expires.
+            0 disables the limit.
+        absolute_ttl: Seconds after the login after which a session
+            expires. 0 disables the limit.
+    """
+
+    def __init__(self, idle_ttl: float = SESSION_IDLE_TTL,
+                 absolute_ttl: float = SESSION_ABSOLUTE_TTL):
+        self.idle_ttl = idle_ttl
+        self.absolute_ttl = absolute_ttl
+        self._stop_sweeper = None
+
+    def is_expired(self, record: SessionRecord, now: float) -> bool:
+        """Return True if a session has outlived one of its TTLs."""
+        return bool(
+            (self.idle_ttl and now - record.last_seen > self.idle_ttl)
+            or (self.absolute_ttl
+                and now - record.created > self.absolute_ttl))
+
+    def create(self, user_id: int, role: str) -> str:
+        """
+        Open a session for a user.
+
+        Args:
+            user_id: Primary key of the collaborator.
+            role: Role of the collaborator.
+
+        Returns:
+            str: The new session id, to send in the cookie.
+        """
+        raise NotImplementedError
+
+    def get(self, session_id: str) -> Optional[SessionRecord]:
+        """
+        Return a session and record the request time.
+
+        Args:
+            session_id: Id from the cookie.
+
+        Returns:
+            SessionRecord | None: The session, or None if unknown or
+                expired.
+        """
+        raise NotImplementedError
+
+    def set_display_archive(self, session_id: str,
+                            value: bool) -> Optional[str]:
+        """
+        Change the archive display flag of a session.
+
+        Args:
+            session_id: Id from the cookie.
+            value: True to show the archived entities.
+
+        Returns:
+            str | None: The session id to keep in the cookie (a new one
+                for signed cookies), or None if unknown or expired.
+        """
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        """End a session (unknown ids are ignored)."""
+        raise NotImplementedError
+
+    def sweep(self) -> int:
+        """Delete the expired sessions, return how many were deleted."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        """Number of stored sessions, for the backends which know it."""
+        raise NotImplementedError
+
+    def start_sweeper(self, interval: float) -> None:
+        """Delete the expired sessions every `interval` seconds.
+
+        The sweeper runs in a daemon thread, which a fork does not copy:
+        pre-forked workers start their own.
+
+            Args:
+                interval (float): Seconds between sweeps, 0 to disable
+                    them.
+        """
+        if interval <= 0 or self._stop_sweeper is not None:
+            return
+        stop = threading.Event()
+
+        def run() -> None:
+            while not stop.wait(interval):
+                try:
+                    swept = self.sweep()
+                    if swept:
+                        logger.debug("%s expired sessions deleted", swept)
+                except SQLAlchemyError as e:
+                    logger.warning("Session sweep failed: %s", e)
+
+        self._stop_sweeper = stop
+        threading.Thread(target=run, name="session-sweeper",
+                         daemon=True).start()
+
+    def stop_sweeper(self) -> None:
+        """Stop the periodic sweeps started by `start_sweeper`."""
+        if self._stop_sweeper is not None:
+            self._stop_sweeper.set()
+            self._stop_sweeper = None
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Sessions kept in the process, least recently used first out.
+
+    Thread-safe. The sessions are lost when the process exits and are not
+    seen by the other pre-forked workers.
+
+    Attributes:
+        max_entries: Maximum number of sessions kept; beyond it, the least
+            recently used one is dropped (its user must log in again).
+            0 disables the limit.
+        evictions: Sessions dropped to stay within max_entries.
+    """
+
+    def __init__(self, idle_ttl: float = SESSION_IDLE_TTL,
+                 absolute_ttl: float = SESSION_ABSOLUTE_TTL,
+                 max_entries: int = SESSION_MAX_ENTRIES):
+        super().__init__(idle_ttl, absolute_ttl)
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._records: "OrderedDict[str, SessionRecord]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, user_id: int, role: str) -> str:
+        session_id = str(uuid.uuid4())
+        now = time.time()
+        with self._lock:
+            self._records[session_id] = SessionRecord(user_id, role, False,
+                                                      now, now)
+            while self.max_entries and len(self._records) > self.max_entries:
+                self._records.popitem(last=False)
+                self.evictions += 1
+        return session_id
+
+    def get(self, session_id: str) -> Optional[SessionRecord]:
+        now = time.time()
+        with self._lock:
+            record = self._records.get(session_id)
+            if record is None:
+                return None
+            if self.is_expired(record, now):
+                del self._records[session_id]
+                return None
+            record.last_seen = now
+            self._records.move_to_end(session_id)
+            return record
+
+    def set_display_archive(self, session_id: str,
+                            value: bool) -> Optional[str]:
+        record = self.get(session_id)
+        if record is None:
+            return None
+        record.display_archive = value
+        return session_id
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._records.pop(session_id, None)
+
+    def sweep(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [session_id
+                       for session_id, record in self._records.items()
+                       if self.is_expired(record, now)]
+            for session_id in expired:
+                del self._records[session_id]
+        return len(expired)
+
+    def clear(self) -> None:
+        """End every session."""
+        with self._lock:
+            self._records.clear()
+            self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+metadata = MetaData()
+
+sessions_table = Table(
+    "sessions", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", Integer, nullable=False),
+    Column("role", String, nullable=False),
+    Column("display_archive", Boolean, nullable=False, default=False),
+    Column("created", Float, nullable=False),
+    Column("last_seen", Float, nullable=False, index=True),
+)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions kept in a `sessions` table of a SQLite database.
+
+    The table is created if needed, and can live in the application's
+    database. Each worker process must use its own engine.
+
+    To spare a write per request, the time of the last request is only
+    saved once it is more than touch_interval seconds old: an idle session
+    may thus expire up to touch_interval seconds early.
+
+    Attributes:
+        engine: SQLAlchemy engine of the database.
+        touch_interval: Minimum seconds between two saves of last_seen.
+    """
+
+    def __init__(self, engine: Engine,
+                 idle_ttl: float = SESSION_IDLE_TTL,
+                 absolute_ttl: float = SESSION_ABSOLUTE_TTL,
+                 touch_interval: float = 60):
+        super().__init__(idle_ttl, absolute_ttl)
+        self.engine = engine
+        self.touch_interval = touch_interval
+        metadata.create_all(engine)
+
+    def create(self, user_id: int, role: str) -> str:
+        session_id = str(uuid.uuid4())
+        now = time.time()
+        with self.engine.begin() as connection:
+            connection.execute(insert(sessions_table).values(
+                id=session_id, user_id=user_id, role=role,
+                display_archive=False, created=now, last_seen=now))
+        return session_id
+
+    def get(self, session_id: str) -> Optional[SessionRecord]:
+        now = time.time()
+        with self.engine.connect() as connection:
+            row = connection.execute(
+                select(sessions_table.c.user_id, sessions_table.c.role,
+                       sessions_table.c.display_archive,
+                       sessions_table.c.created,
+                       sessions_table.c.last_seen)
+                .where(sessions_table.c.id == session_id)).one_or_none()
+        if row is None:
+            return None
+        record = SessionRecord(*row)
+        if self.is_expired(record, now):
+            self.delete(session_id)
+            return None
+        if now - record.last_seen > self.touch_interval:
+            record.last_seen = now
+            with self.engine.begin() as connection:
+                connection.execute(
+                    update(sessions_table)
+                    .where(sessions_table.c.id == session_id)
+                    .values(last_seen=now))
+        return record
+
+    def set_display_archive(self, session_id: str,
+                            value: bool) -> Optional[str]:
+        if self.get(session_id) is None:
+            return None
+        with self.engine.begin() as connection:
+            connection.execute(
+                update(sessions_table)
+                .where(sessions_table.c.id == session_id)
+                .values(display_archive=value))
+        return session_id
+
+    def delete(self, session_id: str) -> None:
+        with self.engine.begin() as connection:
+            connection.execute(delete(sessions_table).where(
+                sessions_table.c.id == session_id))
+
+    def sweep(self) -> int:
+        now = time.time()
+        conditions = []
+        if self.idle_ttl:
+            conditions.append(
+                sessions_table.c.last_seen < now - self.idle_ttl)
+        if self.absolute_ttl:
+            conditions.append(
+                sessions_table.c.created < now - self.absolute_ttl)
+        if not conditions:
+            return 0
+        with self.engine.begin() as connection:
+            return connection.execute(delete(sessions_table).where(
+                or_(*conditions))).rowcount
+
+    def __len__(self) -> int:
+        with self.engine.connect() as connection:
+            return connection.execute(
+                select(func.count()).select_from(sessions_table)).scalar()
+
+
+revoked_sessions_table = Table(
+    "revoked_sessions", metadata,
+    Column("token_id", String, primary_key=True),
+    Column("expires", Float, nullable=False, index=True),
+)
+
+
+def _encode(data: bytes) -> str:
+    """Base64url without padding, for cookie values."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class SignedCookieSessionStore(SessionStore):
+    """
+    Sessions carried by the cookie itself, signed with HMAC-SHA256.
+
+    The session id is `<key version>.<payload>.<signature>`, the payload
+    holding the user id, role, archive display flag, expiry time and a
+    random token id. Any process holding the keys can check it, without
+    shared state: the pre-forked workers, or several hosts, serve any
+    request.
+
+    Keys are rotated by adding a version to `keys` and signing with it
+    (`key_version`): cookies signed with an older key stay valid until
+    that key is removed. Logout records the token id in a revocation
+    list until the cookie expires, in the `revoked_sessions` table when
+    an engine is given (shared by the processes using the database), in
+    memory otherwise. The table is mirrored in memory and read again every
+    refresh_interval seconds: a logout in another process takes effect
+    within that delay, and requests do not query the database.
+
+    A cookie cannot be updated without being sent again, so the idle TTL
+    is not enforced: a session lasts absolute_ttl seconds.
+
+    Attributes:
+        keys: Secret keys (bytes) by version.
+        key_version: Version of the key signing new cookies.
+        engine: Engine holding the revocation list, or None.
+        refresh_interval: Seconds between two reads of the revocation
+            table.
+    """
+
+    def __init__(self, keys: Dict[str, bytes], key_version: str,
+                 absolute_ttl: float = SESSION_ABSOLUTE_TTL,
+                 engine: Optional[Engine] = None,
+                 refresh_interval: float = 5):
+        super().__init__(0, absolute_ttl)
+        if not keys.get(key_version):
+            raise ValueError(f"Clé de signature {key_version!r} absente.")
+        self.keys = keys
+        self.key_version = key_version
+        self.engine = engine
+        self.refresh_interval = refresh_interval
+        self._revoked: Dict[str, float] = {}
+        self._refreshed = 0.0
+        self._lock = threading.Lock()
+        if engine is not None:
+            metadata.create_all(engine, tables=[revoked_sessions_table])
+
+    def _signature(self, key: bytes, signed: str) -> str:
+        return _encode(hmac.new(key, signed.encode("ascii"),
+                                hashlib.sha256).digest())
+
+    def _issue(self, record: SessionRecord, token_id: str,
+               expires: float) -> str:
+        """Return the signed session id of a record."""
+        payload = _encode(json.dumps(
+            [record.user_id, record.role, int(record.display_archive),
+             record.created, expires, token_id],
+            separators=(",", ":")).encode("utf-8"))
+        signed = f"{self.key_version}.{payload}"
+        return f"{signed}." \
+               f"{self._signature(self.keys[self.key_version], signed)}"
+
+    def _verify(self, session_id: str) -> Optional[Tuple[SessionRecord,
+                                                          str, float]]:
+        """Return the record, token id and expiry of a valid session id."""
+        try:
+            version, payload, signature = session_id.split(".")
+        except ValueError:
+            return None
+        key = self.keys.get(version)
+        if not key or not hmac.compare_digest(
+                signature, self._signature(key, f"{version}.{payload}")):
+            return None
+        try:
+            user_id, role, display_archive, created, expires, token_id = \
+                json.loads(_decode(payload))
+        except (ValueError, TypeError):
+            return None
+        now = time.time()
+        if expires and now > expires:
+            return None
+        return (SessionRecord(user_id, role, bool(display_archive), created,
+                              now), token_id, expires)
+
+    def is_revoked(self, token_id: str) -> bool:
+        """Return True if a cookie was revoked by a logout."""
+        now = time.time()
+        if self.engine is not None \
+                and now - self._refreshed > self.refresh_interval:
+            with self.engine.connect() as connection:
+                revoked = dict(connection.execute(
+                    select(revoked_sessions_table.c.token_id,
+                           revoked_sessions_table.c.expires).where(
+                        revoked_sessions_table.c.expires >= now)).all())
+            with self._lock:
+                self._revoked = revoked
+                self._refreshed = now
+        with self._lock:
+            return token_id in self._revoked
+
+    def create(self, user_id: int, role: str) -> str:
+        now = time.time()
+        expires = now + self.absolute_ttl if self.absolute_ttl else 0
+        return self._issue(SessionRecord(user_id, role, False, now, now),
+                           secrets.token_urlsafe(12), expires)
+
+    def get(self, session_id: str) -> Optional[SessionRecord]:
+        verified = self._verify(session_id)
+        if verified is None or self.is_revoked(verified[1]):
+            return None
+        return verified[0]
+
+    def set_display_archive(self, session_id: str,
+                            value: bool) -> Optional[str]:
+        verified = self._verify(session_id)
+        if verified is None or self.is_revoked(verified[1]):
+            return None
+        record, token_id, expires = verified
+        record.display_archive = value
+        return self._issue(record, token_id, expires)
+
+    def delete(self, session_id: str) -> None:
+        verified = self._verify(session_id)
+        if verified is None:
+            return
+        _, token_id, expires = verified
+        # Never-expiring cookies stay revoked forever.
+        expires = expires or float("inf")
+        if self.engine is not None:
+            with self.engine.begin() as connection:
+                connection.execute(
+                    insert(revoked_sessions_table).prefix_with("OR IGNORE")
+                    .values(token_id=token_id, expires=expires))
+        with self._lock:
+            self._revoked[token_id] = expires
+
+    def sweep(self) -> int:
+        """Forget the revocations of the expired cookies."""
+        now = time.time()
+        with self._lock:
+            expired = [token_id
+                       for token_id, expires in self._revoked.items()
+                       if expires < now]
+            for token_id in expired:
+                del self._revoked[token_id]
+        if self.engine is None:
+            return len(expired)
+        with self.engine.begin() as connection:
+            return connection.execute(delete(revoked_sessions_table).where(
+                revoked_sessions_table.c.expires < now)).rowcount
+
+
+# Store used by the views, read as `sessions.session_store`: main.py
+# replaces it with a SQLiteSessionStore when the sessions must be shared
+# or kept (see SESSION_BACKEND).
+session_store: SessionStore = MemorySessionStore()
+
+
+def set_session_store(store: SessionStore) -> SessionStore:
+    """Replace the store used by the views, return the previous one."""
+    global session_store
+    previous, session_store = session_store, store
+    return previous
+
@@ -3,8 +3,18 @@ settings.py - Application configuration module.
 
 Defines:
 - Entity mappings for CRUD operations.
-- Database configurations for different environments.
+- Database configurations for different environments, and the SQLite
+  performance profile of each.
 - Application port settings.
+- Login session store, lifetimes and size, cookie signing keys.
+- Password hashing process pool and queue, bcrypt cost.
+- Login attempt throttling and backoff, concurrent password checks.
+- Pre-fork worker recycling limits.
+- HTTP/1.1 persistent connection limits.
+- HTML response compression.
+- Template expression and fragment caches, streamed HTML responses.
+- Entity list page sizes.
+- Static asset caching and the fingerprinted asset build directory.
 - Sentry DSN for error tracking.
 - Logging configuration with console and Sentry handlers.
 
@@ -14,6 +24,8 @@ Provides:
 
 import logging
 import logging.config
+import os
+import secrets
 
 entities = {
     "collaborators": "Collaborator",
@@ -28,12 +40,160 @@ DATABASES = {
     "test": "test_database.db"
 }
 
+# PRAGMAs applied to every new SQLite connection. The write-ahead log lets
+# readers run while a transaction commits; with synchronous=NORMAL commits
+# no longer wait for fsync (a power cut may lose the last commits, but does
+# not corrupt the file). mmap_size is in bytes, a negative cache_size in
+# KiB, busy_timeout in milliseconds.
+SQLITE_PERFORMANCE_PROFILE = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+
+DATABASE_PRAGMAS = {
+    "main": SQLITE_PERFORMANCE_PROFILE,
+    "demo": SQLITE_PERFORMANCE_PROFILE,
+    "test": SQLITE_PERFORMANCE_PROFILE,
+}
+
+# The write-ahead log is checkpointed into the database, and truncated,
+# every WAL_CHECKPOINT_INTERVAL seconds. 0 disables it (SQLite still
+# checkpoints automatically, without truncating the log).
+WAL_CHECKPOINT_INTERVAL = 300
+
 PORT = {
     "main": 8000,
     "demo": 8000,
     "test": 8000
 }
 
+# Login sessions are kept in memory ("memory") or in a table of the
+# database ("sqlite"), which survives restarts and is shared by pre-forked
+# workers (--workers uses it instead of "memory"), or carried by a signed
+# cookie ("signed"), checked by any process or host holding the signing
+# keys without a lookup. A session expires after
+# SESSION_IDLE_TTL seconds without a request, or SESSION_ABSOLUTE_TTL
+# seconds after the login; 0 disables a limit. The memory store keeps at
+# most SESSION_MAX_ENTRIES sessions, least recently used first out.
+# Expired sessions are deleted every SESSION_SWEEP_INTERVAL seconds.
+SESSION_BACKEND = "memory"
+SESSION_IDLE_TTL = 30 * 60
+SESSION_ABSOLUTE_TTL = 12 * 60 * 60
+SESSION_MAX_ENTRIES = 10000
+SESSION_SWEEP_INTERVAL = 60
+
+# Signed cookies are signed with SESSION_SIGNING_KEYS[
+# SESSION_SIGNING_KEY_VERSION]. To rotate the key, add a version, sign with
+# it, and remove the old one once its cookies have expired. Without
+# EPIC_EVENT_SESSION_KEY, a random key is drawn at startup: the cookies
+# are then only valid on this server, until it restarts.
+SESSION_SIGNING_KEYS = {
+    "1": (os.environ.get("EPIC_EVENT_SESSION_KEY", "").encode("utf-8")
+          or secrets.token_bytes(32)),
+}
+SESSION_SIGNING_KEY_VERSION = "1"
+
+# Passwords are hashed and checked by bcrypt in PASSWORD_HASHING_WORKERS
+# processes (0: one per CPU), not in the request threads. At most
+# PASSWORD_HASHING_QUEUE_SIZE more wait for a free process; a login
+# finding the queue full for PASSWORD_HASHING_QUEUE_TIMEOUT seconds gets a
+# "server busy" answer.
+PASSWORD_HASHING_WORKERS = 0
+PASSWORD_HASHING_QUEUE_SIZE = 32
+PASSWORD_HASHING_QUEUE_TIMEOUT = 2
+
+# bcrypt cost (log2 of the rounds) of new password hashes, chosen for this
+# host by `python -m epic_event.password_hashing --write` so that a hash
+# takes about BCRYPT_TARGET_MS milliseconds, and never below
+# BCRYPT_MIN_ROUNDS. Hashes of another cost are redone at the next login.
+BCRYPT_ROUNDS = 12
+BCRYPT_TARGET_MS = 250
+BCRYPT_MIN_ROUNDS = 10
+
+# Login attempts are rate limited per client IP and per submitted username
+# by token buckets: a burst of LOGIN_*_BURST attempts, then LOGIN_*_RATE
+# attempts per second; an IP which logged in as the user in the last
+# LOGIN_TRUSTED_TTL seconds is exempt from the username's bucket. After
+# LOGIN_BACKOFF_FREE_FAILURES failed attempts, each failure blocks the IP,
+# and the IP and username pair, for LOGIN_BACKOFF_BASE seconds, doubled at
+# every new failure up to LOGIN_BACKOFF_MAX; failures are forgotten after a
+# success or LOGIN_BACKOFF_MAX seconds without attempts. At most
+# LOGIN_MAX_CONCURRENT_CHECKS passwords are checked at once. Refused
+# attempts get a 429 answer before any database or bcrypt work. At most
+# LOGIN_THROTTLE_MAX_ENTRIES IPs, usernames and pairs are tracked, least
+# recently used first out.
+LOGIN_IP_BURST = 20
+LOGIN_IP_RATE = 20 / 60
+LOGIN_USER_BURST = 10
+LOGIN_USER_RATE = 10 / 60
+LOGIN_BACKOFF_FREE_FAILURES = 5
+LOGIN_BACKOFF_BASE = 1
+LOGIN_BACKOFF_MAX = 300
+LOGIN_MAX_CONCURRENT_CHECKS = 8
+LOGIN_THROTTLE_MAX_ENTRIES = 10000
+LOGIN_TRUSTED_TTL = 30 * 24 * 60 * 60
+
+# Pre-fork mode (--workers): a worker is replaced by a fresh process after
+# this many requests, or once its resident memory exceeds this many
+# megabytes. 0 disables the limit.
+WORKER_MAX_REQUESTS = 1000
+WORKER_MAX_RSS_MB = 512
+
+# Persistent connections (--keep-alive): an idle connection is closed after
+# KEEP_ALIVE_TIMEOUT seconds, and any connection after serving
+# KEEP_ALIVE_MAX_REQUESTS requests (0 disables the cap).
+KEEP_ALIVE_TIMEOUT = 15
+KEEP_ALIVE_MAX_REQUESTS = 100
+
+# HTML responses of at least COMPRESSION_MIN_SIZE characters are compressed
+# with gzip or deflate when the client accepts it. COMPRESSION_LEVEL goes
+# from 1 (fastest) to 9 (smallest).
+COMPRESSION_ENABLED = True
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_LEVEL = 6
+
+# Number of compiled template expressions kept by safe_eval, least
+# recently used first out. 0 disables the cache.
+TEMPLATE_EXPRESSION_CACHE_SIZE = 1024
+
+# Memory budget, in bytes, of the fragments kept by {% cache %} template
+# tags, least recently used first out. 0 disables the cache.
+TEMPLATE_FRAGMENT_CACHE_BYTES = 8 * 1024 * 1024
+
+# Large pages (entity lists) are sent while they are rendered, in chunks of
+# TEMPLATE_STREAM_CHUNK_SIZE characters: with Transfer-Encoding: chunked in
+# HTTP/1.1, or until the connection closes in HTTP/1.0.
+HTML_STREAMING_ENABLED = True
+TEMPLATE_STREAM_CHUNK_SIZE = 16 * 1024
+
+# Entity lists are shown PAGE_SIZE rows at a time; the per_page query
+# parameter can change it, up to MAX_PAGE_SIZE.
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Static files up to STATIC_CACHE_MAX_FILE_SIZE bytes are kept in memory;
+# larger ones are sent from disk with sendfile. With STATIC_CHECK_MTIME,
+# a file modified on disk is reloaded on its next request.
+STATIC_CACHE_MAX_FILE_SIZE = 256 * 1024
+STATIC_CHECK_MTIME = True
+
+# Cache-Control policy of static files, by extension. Browsers revalidate
+# with If-None-Match / If-Modified-Since once max-age has elapsed.
+STATIC_CACHE_CONTROL = {
+    ".css": "public, max-age=3600",
+    ".js": "public, max-age=3600",
+    "default": "public, max-age=86400",
+}
+
+# Fingerprinted assets written by `python -m epic_event.asset_pipeline`.
+# Their URL changes with their content, so they are cached forever.
+STATIC_BUILD_DIR = os.path.join(os.path.dirname(__file__), "static_build")
+STATIC_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
 SENTRY_DSN = "https://422a046974326b3d65c42157b707bdc2@o4509643092721664.ingest.de.sentry.io/4509643095146576"
 
 LOGGING_CONFIG = {
@@ -0,0 +1,237 @@
+"""
+static_files.py - Cached static asset serving.
+
+This module keeps the files of the `static/` directory in memory, with the
+metadata needed to answer conditional requests, so that the handler no
+longer touches the file system (beyond one `stat`) to serve an asset.
+
+Main Responsibilities:
+- Loads every static file at startup: bytes, MIME type, size, mtime and a
+    strong ETag computed from the content.
+- Reloads an entry when the file's mtime or size changed on disk.
+- Leaves files larger than STATIC_CACHE_MAX_FILE_SIZE on disk, so they can
+    be sent with `os.sendfile` instead of being held in memory.
+- Attaches to each file its precompressed `.gz` variant, when the asset
+    pipeline wrote one.
+- Resolves request paths inside the static root only (no path traversal).
+- Answers `If-None-Match` / `If-Modified-Since` and picks the
+    `Cache-Control` policy of each asset.
+
+Usage:
+    static_files = StaticFiles(STATIC_DIR)
+    asset = static_files.resolve("styles.css")
+    if asset and is_not_modified(asset, request_headers):
+        ...  # 304 Not Modified
+"""
+import email.utils
+import hashlib
+import logging
+import mimetypes
+import os
+import threading
+from typing import Dict, Optional
+
+from epic_event.settings import (STATIC_CACHE_CONTROL,
+                                 STATIC_CACHE_MAX_FILE_SIZE,
+                                 STATIC_CHECK_MTIME)
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
+
+
+class StaticAsset:
+    """
+    A static file and the metadata sent with it.
+
+    Attributes:
+        path: Absolute path of the file.
+        content_type: MIME type sent in Content-Type.
+        size: Size in bytes.
+        mtime_ns: Modification time, used to detect changes on disk.
+        etag: Strong entity tag, quoted.
+        last_modified: Modification time formatted as an HTTP date.
+        cache_control: Value of the Cache-Control header.
+        content: File bytes, or None when the file is served from disk.
+        gzip: Precompressed variant of the file (its `.gz` sibling), if any.
+    """
+    __slots__ = ("path", "content_type", "size", "mtime_ns", "etag",
+                 "last_modified", "cache_control", "content", "gzip")
+
+    def __init__(self, path: str, max_cached_size: int,
+                 cache_control: Optional[str] = None):
+        stat = os.stat(path)
+        content_type, _ = mimetypes.guess_type(path)
+        self.path = path
+        self.content_type = content_type or "application/octet-stream"
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.last_modified = email.utils.formatdate(stat.st_mtime,
+                                                    usegmt=True)
+        self.cache_control = cache_control or cache_control_for(path)
+        self.content = None
+        self.gzip = None
+
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            if self.size <= max_cached_size:
+                self.content = f.read()
+                digest.update(self.content)
+            else:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+        self.etag = f'"{digest.hexdigest()}"'
+
+    def is_stale(self) -> bool:
+        """Return True if the file changed (or vanished) since it was read."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return True
+        return (stat.st_mtime_ns != self.mtime_ns
+                or stat.st_size != self.size)
+
+
+def cache_control_for(path: str) -> str:
+    """
+    Return the Cache-Control policy of a file, chosen by extension.
+
+    Args:
+        path: Path of the file.
+
+    Returns:
+        str: The policy from STATIC_CACHE_CONTROL, or its "default" entry.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    return STATIC_CACHE_CONTROL.get(extension,
+                                    STATIC_CACHE_CONTROL["default"])
+
+
+def is_not_modified(asset: StaticAsset, headers) -> bool:
+    """
+    Tell whether a conditional GET can be answered with 304 Not Modified.
+
+    `If-None-Match` takes precedence over `If-Modified-Since`, as required
+    by RFC 9110.
+
+    Args:
+        asset: The requested asset.
+        headers: Request headers.
+
+    Returns:
+        bool: True if the client's copy is still valid.
+    """
+    if_none_match = headers.get("If-None-Match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        # Weak comparison: a W/ prefix does not prevent a match on GET.
+        return "*" in tags or asset.etag in (
+            tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+    if_modified_since = headers.get("If-Modified-Since")
+    if if_modified_since:
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since is None:
+            return False
+        return int(asset.mtime_ns // 1_000_000_000) <= since.timestamp()
+    return False
+
+
+class StaticFiles:
+    """
+    In-memory cache of the assets of a static directory.
+
+    Attributes:
+        root: Real path of the static directory.
+        max_cached_size: Files above this size are not kept in memory.
+        check_mtime: Whether each access checks the file on disk.
+        cache_control: Cache-Control of every asset, overriding the
+            per-extension policies (used for fingerprinted assets).
+        assets: Cached assets, keyed by path relative to the root.
+    """
+
+    def __init__(self, root: str = STATIC_DIR,
+                 max_cached_size: int = STATIC_CACHE_MAX_FILE_SIZE,
+                 check_mtime: bool = STATIC_CHECK_MTIME,
+                 cache_control: Optional[str] = None):
+        self.root = os.path.realpath(root)
+        self.max_cached_size = max_cached_size
+        self.check_mtime = check_mtime
+        self.cache_control = cache_control
+        self.assets: Dict[str, StaticAsset] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """Read every file of the static directory into the cache."""
+        assets = {}
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = self._real_path(os.path.join(directory, filename))
+                if path is None or self._is_gzip_variant(path):
+                    continue
+                relative_path = os.path.relpath(path, self.root).replace(
+                    os.sep, "/")
+                try:
+                    assets[relative_path] = self._build_asset(path)
+                except OSError as e:
+                    logger.warning("Fichier statique illisible %s : %s",
+                                   path, e)
+        with self._lock:
+            self.assets = assets
+        logger.info("%d fichiers statiques chargés depuis %s",
+                    len(assets), self.root)
+
+    def _real_path(self, path: str) -> Optional[str]:
+        """Resolve symlinks in a path; None if it ends up outside the root."""
+        path = os.path.realpath(path)
+        if os.path.commonpath([self.root, path]) != self.root:
+            return None
+        return path
+
+    @staticmethod
+    def _is_gzip_variant(path: str) -> bool:
+        """Tell whether a file is the `.gz` variant of another one."""
+        return path.endswith(".gz") and os.path.isfile(path[:-3])
+
+    def _build_asset(self, path: str) -> StaticAsset:
+        """Read a file, and its precompressed variant if there is one."""
+        asset = StaticAsset(path, self.max_cached_size, self.cache_control)
+        if os.path.isfile(path + ".gz"):
+            asset.gzip = StaticAsset(path + ".gz", self.max_cached_size,
+                                     asset.cache_control)
+            asset.gzip.content_type = asset.content_type
+        return asset
+
+    def resolve(self, relative_path: str) -> Optional[StaticAsset]:
+        """
+        Return the asset for a path relative to the static root.
+
+        Paths escaping the root (``..``, absolute paths, symlinks pointing
+        outside) are rejected.
+
+        Args:
+            relative_path: Path taken from the URL, already unquoted.
+
+        Returns:
+            StaticAsset | None: The asset, or None if there is no such file.
+        """
+        # Fast path: keys are only ever created for files inside the root.
+        asset = self.assets.get(relative_path)
+        if asset is not None and not (self.check_mtime and asset.is_stale()):
+            return asset
+
+        path = self._real_path(os.path.join(self.root, relative_path))
+        if path is None or not os.path.isfile(path):
+            return None
+        key = os.path.relpath(path, self.root).replace(os.sep, "/")
+        try:
+            asset = self._build_asset(path)
+        except OSError:
+            return None
+        with self._lock:
+            self.assets[key] = asset
+        return asset
@@ -0,0 +1,405 @@
+"""
+template_compiler.py - Compilation of templates to Python functions.
+
+`TemplateRenderer` interprets templates: every render reads the files,
+splits them with a regex, resolves `{% extends %}` and walks the list of
+parts, rescanning it to find each matching `{% endif %}`/`{% endfor %}`.
+This module does that work once per template instead: the parts, with
+inheritance and includes already resolved, are translated to the source
+of a Python function, which is compiled and cached by the renderer.
+
+The generated code follows the renderer's scanning helpers step by step
+(`_split_template`, `_extract_blocks`, `_replace_blocks`, `_scan_if`,
+`_scan_for`), so a compiled template produces exactly the same output as
+the interpreter, quirks included. The function is a generator yielding
+the output piece by piece, so a page can be joined or streamed. Expressions are compiled to code
+objects ahead of time and evaluated with the same error handling as
+`safe_eval`.
+
+Usage:
+    compiler = TemplateCompiler(renderer, runtime)
+    compiled = compiler.compile("events.html")
+    html = "".join(compiled.function(context))
+"""
+import logging
+import os
+from collections.abc import Iterable
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledTemplate:
+    """
+    A template compiled to a Python function.
+
+    Attributes:
+        name: Name of the template.
+        function: Takes the rendering context, returns an iterable of the
+            output strings to join (a generator, or a list for templates
+            left to the interpreter).
+        dependencies: Files read to build the function (the template, its
+            mother template and included templates), mapped to their
+            mtime in nanoseconds, or None if missing.
+        source: Generated Python source, for debugging.
+    """
+    __slots__ = ("name", "function", "dependencies", "source")
+
+    def __init__(self, name: str,
+                 function: Callable[[Dict], Iterable[str]],
+                 dependencies: Dict[str, Optional[int]], source: str):
+        self.name = name
+        self.function = function
+        self.dependencies = dependencies
+        self.source = source
+
+    def is_stale(self) -> bool:
+        """Return True if a dependency changed since compilation."""
+        return any(file_mtime(path) != mtime
+                   for path, mtime in self.dependencies.items())
+
+
+def file_mtime(path: str) -> Optional[int]:
+    """Return the mtime of a file in nanoseconds, or None if missing."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class _CodeBuilder:
+    """Accumulates indented source lines and the constants they use."""
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.indent = 1
+        self.constants: Dict[str, Any] = {}
+        self._pending: List[str] = []
+        self._counter = 0
+
+    def new_name(self, prefix: str) -> str:
+        self._counter += 1
+        return f"{prefix}{self._counter}"
+
+    def constant(self, prefix: str, value: Any) -> str:
+        name = self.new_name(prefix)
+        self.constants[name] = value
+        return name
+
+    def literal(self, text: str) -> None:
+        """Queue constant output; consecutive literals are merged."""
+        self._pending.append(text)
+
+    def line(self, code: str) -> None:
+        self.flush()
+        self.lines.append("    " * self.indent + code)
+
+    def flush(self) -> None:
+        if self._pending:
+            text = "".join(self._pending)
+            self._pending = []
+            self.lines.append("    " * self.indent + f"yield {text!r}")
+
+    def block(self, header: str, body: Callable[[], None]) -> None:
+        """Emit `header:` followed by an indented body (or `pass`)."""
+        self.line(header + ":")
+        self.indent += 1
+        start = len(self.lines)
+        body()
+        self.flush()
+        if len(self.lines) == start:
+            self.lines.append("    " * self.indent + "pass")
+        self.indent -= 1
+
+
+class TemplateCompiler:
+    """
+    Translates the templates of a `TemplateRenderer` to Python functions.
+
+    Attributes:
+        renderer: Renderer whose directories and scanning helpers are used.
+        runtime: Helpers of `render_engine` used to compile and run the
+            code: `compile` (an expression to a code object), `evaluate`
+            (code, expr, context), `error` (expr, exception), `scope`
+            (the class of loop and include frames), `fragment_key` and
+            `fragment_cache` for {% cache %} blocks, and the `expression`,
+            `for_loop` and `cache_tag` regexes.
+    """
+
+    def __init__(self, renderer, runtime: Dict[str, Callable]):
+        self.renderer = renderer
+        self.runtime = runtime
+
+    def compile(self, template_name: str) -> Optional[CompiledTemplate]:
+        """
+        Compile a template, resolving its mother template and includes.
+
+        Args:
+            template_name: File name of the template.
+
+        Returns:
+            CompiledTemplate | None: None if the template does not exist.
+        """
+        renderer = self.renderer
+        path = os.path.join(renderer.template_dir, template_name)
+        dependencies = {path: file_mtime(path)}
+        code = renderer.read_template(template_name)
+        if code is None:
+            return None
+
+        builder = _CodeBuilder()
+        parsed = renderer._split_template(code)
+        blocks_context = renderer._extract_blocks(parsed)
+
+        if "mother_template" in blocks_context:
+            base = blocks_context.pop("mother_template")
+            base_path = os.path.join(renderer.template_dir, base)
+            dependencies[base_path] = file_mtime(base_path)
+            base_code = renderer.read_template(base)
+            if base_code is None:
+                builder.literal(f"<h1>Mother template '{base}' not found</h1>")
+                parsed = []
+            else:
+                parsed = renderer._split_template(base_code)
+                parsed = renderer._replace_blocks(parsed, blocks_context)
+
+        try:
+            self._compile_parts(builder, parsed, "context", dependencies, ())
+            builder.flush()
+            source = "\n".join(
+                ["def render(context):"]
+                + builder.lines
+                # Keeps `render` a generator even if it outputs nothing.
+                + ["    yield from ()", ""])
+            namespace = {
+                "_evaluate": self.runtime["evaluate"],
+                "_error": self.runtime["error"],
+                "_include": renderer._handle_include,
+                "_Iterable": Iterable,
+                "_Scope": self.runtime["scope"],
+                "_fragment_key": self.runtime["fragment_key"],
+                "_fragment_cache": self.runtime["fragment_cache"],
+                **builder.constants,
+            }
+            exec(compile(source, f"<template {template_name}>", "exec"),
+                 namespace)
+            function = namespace["render"]
+        except (SyntaxError, RecursionError) as e:
+            # Python limits the nesting of blocks in a function: templates
+            # nested too deeply are interpreted instead.
+            logger.warning("Template %s non compilable, rendu interprété : "
+                           "%s", template_name, e)
+            source = ""
+            function = partial(renderer._render_blocks, parsed)
+
+        logger.debug("Template %s compilé (%d dépendances)",
+                     template_name, len(dependencies))
+        return CompiledTemplate(template_name, function, dependencies,
+                                source)
+
+    def _expression(self, builder: _CodeBuilder, expr: str,
+                    context: str) -> str:
+        """Return the source evaluating `expr` like `safe_eval` does."""
+        source = builder.constant("_expr", expr)
+        try:
+            code = self.runtime["compile"](expr)
+        except (SyntaxError, ValueError) as e:
+            error = builder.constant("_exc", e)
+            return f"_error({source}, {error})"
+        code_name = builder.constant("_code", code)
+        return f"_evaluate({code_name}, {source}, {context})"
+
+    def _compile_parts(self, builder: _CodeBuilder, parts: List[Any],
+                       context: str, dependencies: Dict[str, Optional[int]],
+                       includes: tuple) -> None:
+        """Emit the code rendering `parts`, as `_render_blocks` does."""
+        renderer = self.renderer
+        i = 0
+        while i < len(parts):
+            part = parts[i]
+            tag = renderer._tag(part)
+            if tag is not None:
+                if tag.startswith("if "):
+                    true_block, false_block, i = renderer._scan_if(parts, i)
+                    self._compile_if(builder, tag[3:], true_block,
+                                     false_block, context, dependencies,
+                                     includes)
+                elif tag.startswith("for "):
+                    loop_block, i = renderer._scan_for(parts, i)
+                    self._compile_for(builder, tag[4:], loop_block, context,
+                                      dependencies, includes)
+                elif tag.startswith("include"):
+                    self._compile_include(builder, tag.split(), context,
+                                          dependencies, includes)
+                elif tag.startswith("cache "):
+                    body, i = renderer._scan_cache(parts, i)
+                    self._compile_cache(builder, tag[6:], body, context,
+                                        dependencies, includes)
+                i += 1
+            elif isinstance(part, str):
+                self._compile_text(builder, part, context)
+                i += 1
+            else:
+                builder.literal(str(part))
+                i += 1
+
+    def _compile_text(self, builder: _CodeBuilder, part: str,
+                      context: str) -> None:
+        """Emit a text part, with its {{ expressions }}."""
+        position = 0
+        for match in self.runtime["expression"].finditer(part):
+            if match.start() > position:
+                builder.literal(part[position:match.start()])
+            builder.line(f"yield str("
+                         f"{self._expression(builder, match.group(1), context)}"
+                         f")")
+            position = match.end()
+        if position < len(part):
+            builder.literal(part[position:])
+
+    def _compile_if(self, builder: _CodeBuilder, condition: str,
+                    true_block: List[Any], false_block: List[Any],
+                    context: str, dependencies: Dict[str, Optional[int]],
+                    includes: tuple) -> None:
+        """Emit an if/else, both branches compiled like `_handle_if`."""
+        builder.block(
+            f"if {self._expression(builder, condition, context)}",
+            lambda: self._compile_parts(builder, true_block, context,
+                                        dependencies, includes))
+        builder.block(
+            "else",
+            lambda: self._compile_parts(builder, false_block, context,
+                                        dependencies, includes))
+
+    def _compile_for(self, builder: _CodeBuilder, condition: str,
+                     loop_block: List[Any], context: str,
+                     dependencies: Dict[str, Optional[int]],
+                     includes: tuple) -> None:
+        """
+        Emit a loop rendering its body in a scope over `context`.
+
+        One scope is opened per loop, not per iteration: only the loop
+        variable is ever set in it, so rebinding that variable gives each
+        iteration the same context a fresh copy would.
+        """
+        match = self.runtime["for_loop"].match(condition)
+        if not match:
+            builder.literal(f"[Error: malformed for loop: '{condition}']")
+            return
+
+        var_name, iterable_expr = match.groups()
+        iterable = builder.new_name("_iterable")
+        item = builder.new_name("_item")
+        loop_context = builder.new_name("_context")
+        builder.line(f"{iterable} = "
+                     f"{self._expression(builder, iterable_expr, context)}")
+
+        def loop():
+            def body():
+                builder.line(f"{loop_context}[{var_name!r}] = {item}")
+                self._compile_parts(builder, loop_block, loop_context,
+                                    dependencies, includes)
+            builder.line(f"{loop_context} = _Scope({context})")
+            builder.block(f"for {item} in {iterable}", body)
+
+        builder.block(
+            f"if not isinstance({iterable}, _Iterable) or "
+            f"isinstance({iterable}, (str, bytes, dict))",
+            lambda: builder.literal(
+                f"[Error: '{iterable_expr}' is not iterable]"))
+        builder.block("else", loop)
+
+    def _compile_cache(self, builder: _CodeBuilder, declaration: str,
+                       body: List[Any], context: str,
+                       dependencies: Dict[str, Optional[int]],
+                       includes: tuple) -> None:
+        """
+        Emit a cached fragment, like `_handle_cache`.
+
+        The body is compiled to a nested generator, run only when the
+        fragment is missing from the cache.
+        """
+        match = self.runtime["cache_tag"].fullmatch(declaration)
+        if not match:
+            builder.literal(f"[Error: malformed cache tag: '{declaration}']")
+            return
+
+        key_expr, ttl = match.groups()
+        source = builder.constant("_expr", key_expr)
+        try:
+            code = self.runtime["compile"](key_expr)
+        except (SyntaxError, ValueError) as e:
+            error = builder.constant("_exc", e)
+            builder.line(f"yield _error({source}, {error})")
+            return
+
+        code_name = builder.constant("_code", code)
+        body_name = builder.constant("_body", "".join(map(str, body)))
+        render = builder.new_name("_render")
+        key = builder.new_name("_key")
+        fragment = builder.new_name("_fragment")
+
+        def render_body():
+            self._compile_parts(builder, body, context, dependencies,
+                                includes)
+            builder.line("yield from ()")
+
+        def cached():
+            builder.line(f"{fragment} = _fragment_cache.get({key})")
+
+            def miss():
+                builder.line(f"{fragment} = ''.join({render}({context}))")
+                builder.line(f"_fragment_cache.set({key}, {fragment}, "
+                             f"{float(ttl)!r})")
+            builder.block(f"if {fragment} is None", miss)
+            builder.line(f"yield {fragment}")
+
+        builder.block(f"def {render}({context})", render_body)
+        builder.line(f"{key} = _fragment_key({code_name}, {source}, "
+                     f"{body_name}, {context})")
+        builder.block(f"if {key} is None",
+                      lambda: builder.line(f"yield from {render}({context})"))
+        builder.block("else", cached)
+
+    def _compile_include(self, builder: _CodeBuilder, tag_parts: List[str],
+                         context: str, dependencies: Dict[str, Optional[int]],
+                         includes: tuple) -> None:
+        """Inline an included template, like `_handle_include`."""
+        if len(tag_parts) < 2:
+            builder.literal("[Error: malformed include tag]")
+            return
+
+        template_name = tag_parts[1].strip("'\"")
+        tag_path = os.path.join(self.renderer.tag_dir, template_name)
+        if tag_path in includes:
+            # A template including itself cannot be inlined: leave this
+            # include to the interpreter, as it would run today.
+            parts_name = builder.constant("_tag_parts", tag_parts)
+            builder.line(f"yield from _include({parts_name}, {context})")
+            return
+
+        sub_context = builder.new_name("_context")
+        builder.line(f"{sub_context} = _Scope({context})")
+        if len(tag_parts) >= 3:
+            var_expr = tag_parts[2]
+            value = builder.new_name("_value")
+            builder.line(f"{value} = "
+                         f"{self._expression(builder, var_expr, context)}")
+            builder.line(
+                f"{sub_context}[{var_expr!r}] = list({value}) "
+                f"if isinstance({value}, _Iterable) and not "
+                f"isinstance({value}, (str, bytes, dict)) else {value}")
+            builder.line(f"{sub_context}['with_sorting'] = False")
+        if len(tag_parts) == 4:
+            builder.line(f"{sub_context}['with_sorting'] = True")
+
+        dependencies[tag_path] = file_mtime(tag_path)
+        if not os.path.exists(tag_path):
+            builder.literal(f"<h1>Template '{template_name}' not found</h1>")
+            return
+        with open(tag_path, "r", encoding="utf-8") as f:
+            tag_code = f.read()
+        self._compile_parts(builder, self.renderer._split_template(tag_code),
+                            sub_context, dependencies,
+                            includes + (tag_path,))
@@ -1,5 +1,6 @@
 import pytest
 
+from epic_event.data_versions import data_version
 from epic_event.models import Client
 
 
@@ -52,3 +53,17 @@ def test_client_persists_if_collaborator_soft_deleted(
     assert remaining_client.archived is False
     commercial.archived = False
     db_session.commit()
+
+
+def test_commit_bumps_data_version_of_modified_table(db_session,
+                                                     seed_data_client):
+    clients, events = data_version("clients", "events")
+
+    seed_data_client.phone = "0611111111"
+    db_session.commit()
+    assert data_version("clients", "events") == (clients + 1, events)
+
+    seed_data_client.phone = "0622222222"
+    db_session.flush()
+    db_session.rollback()
+    assert data_version("clients") == (clients + 1,)
@@ -0,0 +1,175 @@
+import pytest
+from sqlalchemy import create_engine, event, text
+
+from epic_event.models import Client, Contract, Database, Event
+from epic_event.models.base import Base
+from epic_event.models.database import MIGRATIONS
+from epic_event.settings import SQLITE_PERFORMANCE_PROFILE
+
+
+def index_names(engine):
+    with engine.connect() as connection:
+        return {row[0] for row in connection.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'index' "
+            "AND name LIKE 'ix_%'"))}
+
+
+def test_migrations_index_an_existing_database(tmp_path):
+    path = tmp_path / "old.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    expected = index_names(engine)
+    with engine.begin() as connection:
+        for name in expected:
+            connection.exec_driver_sql(f"DROP INDEX {name}")
+    engine.dispose()
+
+    db = Database(str(path))
+    db.initialize_database()
+
+    assert expected
+    assert index_names(db.engine) == expected
+    assert db.migrate() == MIGRATIONS[-1][0]
+    db.engine.dispose()
+
+
+def query_plan(session, run):
+    """Run a query function and return the plan of its last statement."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        run()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    statement, parameters = statements[-1]
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    return " / ".join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize("run, index", [
+    (lambda s: Event.keyset_page(s, "start_date", after=1, limit=2,
+                                 load_plan=None),
+     "ix_events_active_start_date"),
+    (lambda s: Client.keyset_page(s, "company_name", limit=2),
+     "ix_clients_active_company_name"),
+    (lambda s: Contract.keyset_page(s, "created_date", descending=True,
+                                    limit=2),
+     "ix_contracts_active_created_date"),
+    (lambda s: Event.filter_by_fields(s, support_id=1, load_plan=None),
+     "ix_events_support_id_start_date"),
+    (lambda s: Client.filter_by_fields(s, id_commercial=1, load_plan=None),
+     "ix_clients_id_commercial"),
+    (lambda s: Contract.filter_by_fields(s, client_id=1, load_plan=None),
+     "ix_contracts_client_id"),
+])
+def test_hot_queries_use_indexes(db_session, seed_data_event, run, index):
+    plan = query_plan(db_session, lambda: run(db_session))
+
+    assert f"USING INDEX {index}" in plan
+
+
+def test_pragmas_are_applied_to_every_connection(tmp_path):
+    db = Database(str(tmp_path / "tuned.db"), SQLITE_PERFORMANCE_PROFILE)
+    db.initialize_database()
+
+    with db.engine.connect() as connection:
+        def pragma(name):
+            return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1
+        assert pragma("temp_store") == 2
+        assert pragma("busy_timeout") == 5000
+        assert pragma("cache_size") == SQLITE_PERFORMANCE_PROFILE[
+            "cache_size"]
+    db.engine.dispose()
+
+
+def test_default_database_keeps_sqlite_defaults(tmp_path):
+    db = Database(str(tmp_path / "plain.db"))
+
+    with db.engine.connect() as connection:
+        assert connection.exec_driver_sql(
+            "PRAGMA journal_mode").scalar() == "delete"
+    db.engine.dispose()
+
+
+def test_checkpoint_copies_the_log(tmp_path):
+    db = Database(str(tmp_path / "tuned.db"), SQLITE_PERFORMANCE_PROFILE)
+    db.initialize_database()
+    with db.session_scope() as session:
+        session.add(Client(full_name="Client", email="c@client.fr"))
+
+    busy, log, done = db.checkpoint("TRUNCATE")
+
+    assert busy == 0
+    assert done == log
+    db.engine.dispose()
+
+
+def test_periodic_checkpoints_start_once_and_stop(tmp_path):
+    db = Database(str(tmp_path / "tuned.db"), SQLITE_PERFORMANCE_PROFILE)
+
+    db.start_checkpoints(60)
+    stop = db._stop_checkpoints
+    db.start_checkpoints(60)
+
+    assert db._stop_checkpoints is stop
+    db.stop_checkpoints()
+    assert stop.is_set()
+    assert db._stop_checkpoints is None
+
+
+def test_request_sessions_see_rows_archived_by_another_worker(
+        db_path, seed_data_client):
+    worker = Database(db_path)
+    other_worker = Database(db_path)
+    client_id = seed_data_client.id
+    try:
+        with worker.session_scope() as session:
+            assert Client.get(session, client_id) is not None
+
+        with other_worker.session_scope() as session:
+            Client.soft_delete(session, client_id)
+
+        with worker.session_scope() as session:
+            assert Client.get(session, client_id) is None
+    finally:
+        with other_worker.session_scope() as session:
+            session.get(Client, client_id).archived = False
+            session.commit()
+        worker.engine.dispose()
+        other_worker.engine.dispose()
+
+
+def test_long_lived_session_sees_rows_archived_by_another(
+        db_path, seed_data_client):
+    db = Database(db_path)
+    other = Database(db_path)
+    client_id = seed_data_client.id
+    session = db.get_session()
+    try:
+        client = Client.get(session, client_id)
+        assert client is not None
+
+        with other.session_scope() as other_session:
+            Client.soft_delete(other_session, client_id)
+
+        assert Client.get(session, client_id) is None
+        assert Client.get(session, client_id,
+                          include_archived=True) is client
+    finally:
+        session.close()
+        with other.session_scope() as other_session:
+            other_session.get(Client, client_id).archived = False
+            other_session.commit()
+        db.engine.dispose()
+        other.engine.dispose()
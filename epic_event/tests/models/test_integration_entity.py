@@ -1,6 +1,8 @@
 import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 
-from epic_event.models import Client
+from epic_event.models import Client, Contract, Database, Event
 
 
 def test_entity_resolve_simple_field(seed_data_client):
@@ -39,6 +41,34 @@ def test_entity_filter_by_nested_field(db_session, seed_data_collaborator,
     assert results[0].commercial.email == commercial.email
 
 
+def test_entity_filter_by_lookups(db_session, seed_data_event):
+    with_support = Event.filter_by_fields(db_session, support__isnull=False)
+    without_support = Event.filter_by_fields(db_session, support__isnull=True)
+    assert with_support
+    assert all(event.support is not None for event in with_support)
+    assert all(event.support is None for event in without_support)
+    assert len(with_support) + len(without_support) == db_session.query(
+        Event).filter(Event.archived.is_(False)).count()
+
+    contracts = Contract.filter_by_fields(db_session, signed=False,
+                                          event__isnull=True)
+    assert contracts
+    assert all(not c.signed and c.event is None for c in contracts)
+
+    names = Client.filter_by_fields(db_session, full_name__icontains="LIENT")
+    assert "Client Test" in [client.full_name for client in names]
+
+
+def test_entity_filter_by_collection_is_distinct(db_session,
+                                                 seed_data_contract):
+    clients = Client.filter_by_fields(db_session, contracts__isnull=False,
+                                      contracts__id__gt=0)
+    ids = [client.id for client in clients]
+
+    assert ids
+    assert len(ids) == len(set(ids))
+
+
 def test_entity_order_by_field_ascending(db_session, seed_data_client):
     # Ajout d'un client supplémentaire pour tester le tri
     client2 = Client(
@@ -61,6 +91,136 @@ def test_entity_order_by_field_ascending(db_session, seed_data_client):
     assert names == sorted(names)
 
 
+def test_entity_order_by_nested_field(db_session, seed_data_event):
+    events = Event.order_by_fields(db_session, "contract.client.company_name",
+                                   descending=True)
+    keys = [(e.contract.client.company_name, -e.id) for e in events]
+
+    assert keys == sorted(keys, reverse=True)
+    assert len(events) == db_session.query(Event).filter(
+        Event.archived.is_(False)).count()
+
+
+def test_entity_order_by_keeps_rows_without_relation(db_session,
+                                                     seed_data_contract):
+    contracts = Contract.order_by_fields(db_session, "event.title")
+    without_event = [c for c in contracts if c.event is None]
+
+    assert without_event
+    assert contracts[:len(without_event)] == without_event
+
+
+def test_entity_order_by_rejects_unknown_field(db_session):
+    with pytest.raises(ValueError):
+        Client.order_by_fields(db_session, "password")
+
+
+def test_entity_keyset_pages_follow_ordering(db_session, seed_data_contract):
+    expected = [c.id for c in Contract.order_by_fields(
+        db_session, "event.title", descending=True)]
+
+    ids, after = [], None
+    while True:
+        page = Contract.keyset_page(db_session, "event.title", descending=True,
+                                    after=after, limit=2)
+        ids += [c.id for c in page.items]
+        if not page.has_next:
+            break
+        after = page.next_cursor
+
+    assert ids == expected
+
+
+def test_entity_keyset_page_before_cursor(db_session, seed_data_client):
+    first = Client.keyset_page(db_session, "full_name", limit=1)
+    second = Client.keyset_page(db_session, "full_name",
+                                after=first.next_cursor, limit=1)
+    previous = Client.keyset_page(db_session, "full_name",
+                                  before=second.previous_cursor, limit=1)
+
+    assert not first.has_previous
+    assert second.has_previous
+    assert [c.id for c in previous.items] == [c.id for c in first.items]
+    assert not previous.has_previous
+
+
+def test_entity_keyset_page_unknown_cursor_returns_first_page(
+        db_session, seed_data_client):
+    page = Client.keyset_page(db_session, "id", after=10 ** 9, limit=1)
+
+    assert page.items[0].id == Client.order_by_fields(db_session, "id")[0].id
+    assert not page.has_previous
+
+
+def test_entity_keyset_page_with_filters(db_session, seed_data_event):
+    page = Event.keyset_page(db_session, "title", limit=100,
+                             filters={"support__isnull": False})
+
+    assert page.items
+    assert all(event.support is not None for event in page.items)
+
+
+@pytest.mark.parametrize("model, load_plan, paths", [
+    (Event, "list", ("contract.client.company_name", "support.full_name")),
+    (Contract, "list", ("client.commercial.full_name", "event.title")),
+    (Client, "detail", ("commercial.full_name",)),
+])
+def test_entity_load_plan_avoids_lazy_loads(db_session, seed_data_event,
+                                            model, load_plan, paths):
+    session = Session(bind=db_session.get_bind())
+    queries = []
+
+    def record(*args):
+        queries.append(args[2])
+
+    event.listen(session.get_bind(), "before_cursor_execute", record)
+    try:
+        items = model.order_by_fields(session, "id", load_plan=load_plan)
+        loading = len(queries)
+        for item in items:
+            for path in paths:
+                model._resolve(item, path)
+    finally:
+        event.remove(session.get_bind(), "before_cursor_execute", record)
+        session.close()
+
+    assert items
+    assert len(queries) == loading
+
+
+def test_entity_get_uses_identity_map(db_path, seed_data_client):
+    db = Database(db_path)
+    queries = []
+
+    def record(*args):
+        queries.append(args[2])
+
+    with db.session_scope() as session:
+        loaded = session.query(Client).filter_by(
+            id=seed_data_client.id).one()
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            client = Client.get(session, seed_data_client.id)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+
+    db.engine.dispose()
+    assert client is loaded
+    assert queries == []
+
+
+def test_entity_get_archived(db_session, seed_data_client):
+    seed_data_client.archived = True
+    try:
+        assert Client.get(db_session, seed_data_client.id) is None
+        assert Client.get(db_session, seed_data_client.id,
+                          include_archived=True) is seed_data_client
+    finally:
+        seed_data_client.archived = False
+
+    assert Client.get(db_session, 10 ** 9) is None
+
+
 def test_entity_update_persists_changes(db_session, seed_data_client):
     client = seed_data_client
 
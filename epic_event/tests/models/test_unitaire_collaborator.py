@@ -1,8 +1,10 @@
 from unittest.mock import patch
 
+import bcrypt
 import pytest
 
-from epic_event.models import Collaborator
+from epic_event.models import Collaborator, collaborator
+from epic_event.password_hashing import PasswordHashingBusy
 
 
 def test_validate_full_name_ok(db_session):
@@ -102,3 +104,44 @@ def test_set_password_and_check():
     assert collab.check_password("mypassword") is True
     assert collab.check_password("wrongpass") is False
 
+
+
+def test_set_password_uses_configured_cost(monkeypatch):
+    monkeypatch.setattr(collaborator, "BCRYPT_ROUNDS", 4)
+    collab = Collaborator(full_name="John Doe")
+
+    collab.set_password("secret")
+
+    assert collab.password.startswith(b"$2b$04$")
+    assert not collab.needs_rehash()
+
+
+def test_check_password_rehashes_other_cost(monkeypatch):
+    collab = Collaborator(full_name="John Doe")
+    collab.password = bcrypt.hashpw(b"secret", bcrypt.gensalt(5))
+    monkeypatch.setattr(collaborator, "BCRYPT_ROUNDS", 4)
+
+    assert collab.needs_rehash()
+    assert collab.check_password("secret") is True
+    assert collab.password.startswith(b"$2b$04$")
+    assert collab.check_password("secret") is True
+
+
+def test_check_password_does_not_rehash_on_failure(monkeypatch):
+    collab = Collaborator(full_name="John Doe")
+    collab.password = old = bcrypt.hashpw(b"secret", bcrypt.gensalt(5))
+    monkeypatch.setattr(collaborator, "BCRYPT_ROUNDS", 4)
+
+    assert collab.check_password("wrong") is False
+    assert collab.password == old
+
+
+def test_check_password_postpones_rehash_when_busy(monkeypatch):
+    collab = Collaborator(full_name="John Doe")
+    collab.password = old = bcrypt.hashpw(b"secret", bcrypt.gensalt(5))
+    monkeypatch.setattr(collaborator, "BCRYPT_ROUNDS", 4)
+
+    with patch.object(Collaborator, "set_password",
+                      side_effect=PasswordHashingBusy("occupé")):
+        assert collab.check_password("secret") is True
+    assert collab.password == old
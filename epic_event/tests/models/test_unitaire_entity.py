@@ -1,6 +1,9 @@
 import pytest
 
-from epic_event.models import Client
+from datetime import date
+
+from epic_event.models import Client, Contract, Event
+from epic_event.models.entity import split_lookup
 
 
 def test_resolve_direct_field(seed_data_client):
@@ -41,3 +44,38 @@ def test_is_valid_path_invalid():
     Teste un chemin invalide : Client n'a pas directement 'invalid'.
     """
     assert Client._is_valid_path("contracts__invalid__id") is False
+
+
+def test_split_lookup():
+    assert split_lookup("support__isnull") == ("support", "isnull")
+    assert split_lookup("commercial__full_name") == ("commercial__full_name",
+                                                     "exact")
+    assert split_lookup("id") == ("id", "exact")
+
+
+def test_parse_filters_converts_to_column_types():
+    filters = Client.parse_filters({
+        "commercial__isnull": "1",
+        "id__in": "1,2",
+        "created_date__range": "2024-01-01,2024-12-31",
+        "company_name__icontains": "corp",
+    })
+
+    assert filters == {
+        "commercial__isnull": True,
+        "id__in": [1, 2],
+        "created_date__range": [date(2024, 1, 1), date(2024, 12, 31)],
+        "company_name__icontains": "corp",
+    }
+    assert Contract.parse_filters({"signed": "0"}) == {"signed": False}
+
+
+@pytest.mark.parametrize("raw_filters", [
+    {"notes": "x"},
+    {"participants": "beaucoup"},
+    {"support": "1"},
+    {"id__range": "1"},
+])
+def test_parse_filters_rejects_invalid_filters(raw_filters):
+    with pytest.raises(ValueError):
+        Event.parse_filters(raw_filters)
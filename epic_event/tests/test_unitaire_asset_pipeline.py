@@ -0,0 +1,70 @@
+import gzip
+import json
+
+import pytest
+
+from epic_event import asset_pipeline
+from epic_event.asset_pipeline import build_static, static_url
+from epic_event.render_engine import TemplateRenderer
+from epic_event.static_files import StaticFiles
+
+
+@pytest.fixture
+def built_assets(tmp_path):
+    source = tmp_path / "static"
+    (source / "images").mkdir(parents=True)
+    (source / "styles.css").write_text("body { color: red; }\n" * 50)
+    (source / "images" / "logo.webp").write_bytes(bytes(range(256)))
+    build = tmp_path / "build"
+    manifest = build_static(str(source), str(build))
+    return build, manifest
+
+
+def test_build_static_writes_fingerprinted_files(built_assets):
+    build, manifest = built_assets
+
+    css = manifest["styles.css"]
+    assert css.startswith("styles.") and css.endswith(".css")
+    assert manifest["images/logo.webp"].startswith("images/logo.")
+    assert json.loads((build / "manifest.json").read_text()) == manifest
+    assert (build / css).read_text() == "body { color: red; }\n" * 50
+
+
+def test_build_static_keeps_useful_gzip_variants_only(built_assets):
+    build, manifest = built_assets
+
+    css = build / manifest["styles.css"]
+    assert gzip.decompress((build / (manifest["styles.css"] + ".gz"))
+                           .read_bytes()) == css.read_bytes()
+    assert not (build / (manifest["images/logo.webp"] + ".gz")).exists()
+
+
+def test_static_files_attach_gzip_variant(built_assets):
+    build, manifest = built_assets
+
+    static_files = StaticFiles(str(build), cache_control="immutable")
+    asset = static_files.resolve(manifest["styles.css"])
+
+    assert asset.gzip is not None
+    assert asset.gzip.content_type == "text/css"
+    assert asset.cache_control == asset.gzip.cache_control == "immutable"
+    assert manifest["styles.css"] + ".gz" not in static_files.assets
+
+
+def test_static_url(monkeypatch):
+    monkeypatch.setattr(asset_pipeline, "manifest",
+                        {"styles.css": "styles.0123456789ab.css"})
+
+    assert static_url("styles.css") == "/static/styles.0123456789ab.css"
+    assert static_url("unknown.js") == "/static/unknown.js"
+
+
+def test_static_url_is_available_in_templates(tmp_path, monkeypatch):
+    monkeypatch.setattr(asset_pipeline, "manifest",
+                        {"styles.css": "styles.0123456789ab.css"})
+    (tmp_path / "page.html").write_text(
+        "<link href=\"{{ static_url('styles.css') }}\">")
+
+    html = TemplateRenderer(str(tmp_path)).render_template("page.html", {})
+
+    assert html == '<link href="/static/styles.0123456789ab.css">'
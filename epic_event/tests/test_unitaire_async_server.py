@@ -0,0 +1,112 @@
+import asyncio
+import io
+from http.client import parse_headers
+
+import pytest
+
+from epic_event.async_server import AsyncHTTPServer, BufferedHandler
+from epic_event.password_hashing import PasswordHashingService
+
+
+def make_handler(path="/", method="GET", version="HTTP/1.1", headers=b""):
+    return BufferedHandler(method, path, version,
+                           parse_headers(io.BytesIO(headers + b"\r\n")),
+                           b"", ("127.0.0.1", 0))
+
+
+def split_response(response):
+    head, _, body = response.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    return lines[0], headers, body
+
+
+def test_buffered_handler_frames_response():
+    response, close = make_handler("/").run()
+    status, headers, body = split_response(response)
+
+    assert status == "HTTP/1.1 200 OK"
+    assert int(headers["Content-Length"]) == len(body)
+    assert headers["Connection"] == "keep-alive"
+    assert close is False
+
+
+def test_buffered_handler_closes_http10_connection():
+    response, close = make_handler("/", version="HTTP/1.0").run()
+    _, headers, _ = split_response(response)
+
+    assert headers["Connection"] == "close"
+    assert close is True
+
+
+def test_buffered_handler_unknown_method():
+    response, close = make_handler("/", method="PATCH").run()
+    status, _, _ = split_response(response)
+
+    assert status.startswith("HTTP/1.1 501")
+    assert close is False
+
+
+async def _two_requests_on_one_connection():
+    server = AsyncHTTPServer(("127.0.0.1", 0), cpu_workers=1)
+    await server.start()
+    try:
+        host, port = server.server_address
+        reader, writer = await asyncio.open_connection(host, port)
+        statuses = []
+        for _ in range(2):
+            writer.write(b"GET / HTTP/1.1\r\nHost: test\r\n\r\n")
+            head = await reader.readuntil(b"\r\n\r\n")
+            _, headers, _ = split_response(head)
+            await reader.readexactly(int(headers["Content-Length"]))
+            statuses.append(head.split(b"\r\n", 1)[0])
+        writer.close()
+        return statuses
+    finally:
+        server.close()
+
+
+def test_async_server_keeps_connection_alive():
+    statuses = asyncio.run(_two_requests_on_one_connection())
+
+    assert statuses == [b"HTTP/1.1 200 OK", b"HTTP/1.1 200 OK"]
+
+
+def test_buffered_handler_answers_500_when_nothing_is_sent(monkeypatch):
+    monkeypatch.setattr(BufferedHandler, "handle_home", lambda self: None)
+
+    response, close = make_handler("/").run()
+
+    assert response.startswith(b"HTTP/1.1 500 ")
+    assert close is True
+
+
+async def _chunked_request():
+    server = AsyncHTTPServer(("127.0.0.1", 0), cpu_workers=1)
+    await server.start()
+    try:
+        host, port = server.server_address
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b"POST /login HTTP/1.1\r\nHost: test\r\n"
+                     b"Transfer-Encoding: chunked\r\n\r\n"
+                     b"5\r\nfull_\r\n0\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+        return response
+    finally:
+        server.close()
+
+
+def test_async_server_refuses_chunked_request_body():
+    response = asyncio.run(_chunked_request())
+
+    assert response.startswith(b"HTTP/1.1 501 ")
+    assert response.count(b"HTTP/1.1") == 1
+
+
+def test_async_server_uses_pool_forked_by_caller():
+    service = PasswordHashingService(workers=1)
+    server = AsyncHTTPServer(("127.0.0.1", 0), cpu_executor=service)
+
+    assert server.cpu_executor is service
+    server.close()
@@ -0,0 +1,45 @@
+import zlib
+
+import pytest
+
+from epic_event.compression import (iter_compressed, iter_encoded,
+                                    negotiate_encoding)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("", None),
+    ("identity", None),
+    ("gzip, deflate, br", "gzip"),
+    ("deflate", "deflate"),
+    ("gzip;q=0.5, deflate", "deflate"),
+    ("gzip;q=0, deflate;q=0", None),
+    ("*", "gzip"),
+    ("*;q=0.5, gzip;q=0", "deflate"),
+    ("GZIP;Q=0.8", "gzip"),
+    ("gzip;q=abc", None),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def test_iter_encoded_slices_content():
+    content = "é" * 10
+
+    chunks = list(iter_encoded(content, chunk_size=3))
+
+    assert len(chunks) == 4
+    assert b"".join(chunks) == content.encode("utf-8")
+
+
+@pytest.mark.parametrize("encoding, wbits", [
+    ("gzip", 16 + zlib.MAX_WBITS),
+    ("deflate", zlib.MAX_WBITS),
+])
+def test_iter_compressed_round_trip(encoding, wbits):
+    content = "<tr><td>Contrat signé</td></tr>" * 1000
+
+    chunks = list(iter_compressed(iter_encoded(content, chunk_size=512),
+                                  encoding))
+
+    assert zlib.decompress(b"".join(chunks), wbits) == \
+        content.encode("utf-8")
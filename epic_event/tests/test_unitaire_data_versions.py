@@ -0,0 +1,55 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine
+
+from epic_event.data_versions import (bump_data_version, data_version,
+                                      refresh_data_versions,
+                                      share_data_versions)
+
+
+@pytest.fixture
+def shared_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'versions.db'}")
+    share_data_versions(engine)
+    yield engine
+    share_data_versions(None)
+    engine.dispose()
+
+
+def test_shared_versions_are_stored_in_database(shared_engine):
+    (clients,) = data_version("clients")
+
+    bump_data_version("clients", "events")
+
+    assert data_version("clients") == (clients + 1,)
+    with shared_engine.connect() as connection:
+        stored = dict(connection.exec_driver_sql(
+            "SELECT name, version FROM data_versions").all())
+    assert stored["clients"] == clients + 1
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_shared_versions_see_commits_of_other_workers(shared_engine):
+    (clients,) = data_version("clients")
+
+    pid = os.fork()
+    if pid == 0:
+        shared_engine.dispose(close=False)
+        bump_data_version("clients")
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+    assert data_version("clients") == (clients,)
+    refresh_data_versions()
+    assert data_version("clients") == (clients + 1,)
+
+
+def test_unshared_versions_continue_from_last_values(shared_engine):
+    bump_data_version("clients")
+    (clients,) = data_version("clients")
+
+    share_data_versions(None)
+    bump_data_version("clients")
+
+    assert data_version("clients") == (clients + 1,)
@@ -0,0 +1,109 @@
+import time
+from unittest.mock import Mock
+
+import bcrypt
+import pytest
+
+from epic_event import password_hashing, views
+from epic_event.models import Collaborator, collaborator
+from epic_event.password_hashing import (PasswordHashingBusy,
+                                         PasswordHashingService, hash_cost)
+
+
+@pytest.fixture(scope="module")
+def service():
+    service = PasswordHashingService(workers=1, queue_size=0,
+                                     queue_timeout=0.2)
+    yield service
+    service.shutdown()
+
+
+def test_service_runs_bcrypt_in_pool(service):
+    salt = bcrypt.gensalt(4)
+
+    hashed = service.submit(bcrypt.hashpw, b"secret", salt).result()
+
+    assert service.submit(bcrypt.checkpw, b"secret", hashed).result()
+    assert service.stats()["submitted"] >= 2
+
+
+def test_service_refuses_work_when_queue_is_full(service):
+    running = service.submit(time.sleep, 1)
+
+    with pytest.raises(PasswordHashingBusy):
+        service.submit(time.sleep, 0)
+
+    running.result()
+    service.submit(int).result()
+    assert service.rejected == 1
+
+
+def test_collaborator_uses_password_executor(service, monkeypatch):
+    monkeypatch.setattr(collaborator, "password_executor", service)
+    user = Collaborator(full_name="Alice", email="a@epic.fr", role="gestion")
+
+    user.set_password("secret")
+
+    assert user.check_password("secret")
+    assert not user.check_password("wrong")
+
+
+def test_login_reports_busy_server(monkeypatch):
+    busy = Mock()
+    busy.submit.side_effect = PasswordHashingBusy("Le serveur est occupé.")
+    monkeypatch.setattr(collaborator, "password_executor", busy)
+    user = Collaborator(full_name="Alice", password=b"x")
+    monkeypatch.setattr(Collaborator, "filter_by_fields",
+                        lambda db, **kwargs: [user])
+
+    result = views.login(None, {"full_name": ["Alice"],
+                                "password": ["secret"]})
+
+    assert result["success"] is False
+    assert result["busy"] is True
+    assert "Le serveur est occupé." in result["html"]
+
+
+def test_hash_cost_reads_bcrypt_cost():
+    assert hash_cost(bcrypt.hashpw(b"secret", bcrypt.gensalt(5))) == 5
+    assert hash_cost(b"x") is None
+
+
+@pytest.mark.parametrize("target_ms, expected", [
+    (250, 11), (100, 10), (10, 10), (1000, 13)])
+def test_calibrate_picks_highest_cost_within_target(monkeypatch, target_ms,
+                                                    expected):
+    # 70 ms at cost 10, doubling with each cost unit.
+    monkeypatch.setattr(password_hashing, "time_hash",
+                        lambda rounds, repeat: 70 * 2 ** (rounds - 10))
+
+    rounds, timings = password_hashing.calibrate(target_ms, min_rounds=10)
+
+    assert rounds == expected
+    assert timings[0] == (10, 70)
+
+
+def test_write_rounds_updates_settings(tmp_path):
+    path = tmp_path / "settings.py"
+    path.write_text("A = 1\nBCRYPT_ROUNDS = 12\nB = 2\n", encoding="utf-8")
+
+    password_hashing.write_rounds(11, str(path))
+
+    assert path.read_text(encoding="utf-8") == \
+        "A = 1\nBCRYPT_ROUNDS = 11\nB = 2\n"
+    path.write_text("A = 1\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        password_hashing.write_rounds(11, str(path))
+
+
+def test_login_persists_rehashed_password(db_session, monkeypatch):
+    monkeypatch.setattr(collaborator, "BCRYPT_ROUNDS", 4)
+
+    result = views.login(db_session, {"full_name": ["Admin"],
+                                      "password": ["mypassword"]})
+
+    db_session.expire_all()
+    admin = Collaborator.filter_by_fields(db_session, full_name="Admin")[0]
+    assert result["success"] is True
+    assert hash_cost(admin.password) == 4
+    assert admin.check_password("mypassword")
@@ -0,0 +1,87 @@
+import http.client
+import os
+import threading
+
+import pytest
+
+from epic_event import prefork
+from epic_event.prefork import (PreforkSupervisor, PreforkWorkerServer,
+                                create_listen_socket, current_rss_mb,
+                                shutdown_requested)
+from epic_event.router import MyHandler
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"),
+                                reason="pre-fork mode requires POSIX")
+
+
+@pytest.fixture
+def listen_socket():
+    sock = create_listen_socket(("127.0.0.1", 0))
+    yield sock
+    sock.close()
+
+
+def test_current_rss_mb_is_positive():
+    assert current_rss_mb() > 0
+
+
+def test_worker_recycled_after_max_requests(listen_socket):
+    server = PreforkWorkerServer(listen_socket, MyHandler, max_requests=2)
+
+    assert server.should_recycle() is False
+    assert server.count_request() is False
+    assert server.count_request() is True
+
+    assert server.should_recycle() is True
+
+
+class KeepAliveHandler(MyHandler):
+    protocol_version = "HTTP/1.1"
+    timeout = 5
+    keep_alive_max_requests = 0
+
+
+def test_worker_counts_requests_of_persistent_connections(listen_socket):
+    server = PreforkWorkerServer(listen_socket, KeepAliveHandler,
+                                 max_requests=2)
+    thread = threading.Thread(target=server.serve_until_recycled)
+    thread.start()
+    connection = http.client.HTTPConnection(
+        *listen_socket.getsockname()[:2], timeout=5)
+    responses = []
+    for _ in range(2):
+        connection.request("GET", "/")
+        response = connection.getresponse()
+        response.read()
+        responses.append(response)
+    connection.close()
+    thread.join(5)
+
+    assert [r.will_close for r in responses] == [False, True]
+    assert server.handled_requests == 2
+    assert not thread.is_alive()
+
+
+def test_worker_recycled_above_rss_threshold(listen_socket, monkeypatch):
+    server = PreforkWorkerServer(listen_socket, MyHandler, max_rss_mb=100)
+    monkeypatch.setattr(prefork, "current_rss_mb", lambda: 150.0)
+
+    assert server.should_recycle() is True
+
+
+def test_worker_without_limits_is_not_recycled(listen_socket):
+    server = PreforkWorkerServer(listen_socket, MyHandler)
+    server.handled_requests = 10_000
+
+    assert server.should_recycle() is False
+
+
+def test_supervisor_stop_terminates_workers(listen_socket):
+    supervisor = PreforkSupervisor(listen_socket, 1,
+                                   lambda sock: shutdown_requested.wait(5))
+    pid = supervisor.spawn_worker()
+    assert pid in supervisor.children
+
+    supervisor.stop()
+
+    assert supervisor.children == {}
@@ -1,6 +1,14 @@
+import sys
+import time
+
 import pytest
 
-from epic_event.render_engine import TemplateRenderer, safe_eval
+from epic_event.data_versions import bump_data_version, data_version
+from epic_event.render_engine import (ExpressionCache, FragmentCache, Scope,
+                                      TemplateRenderer, TemplateStream,
+                                      expression_cache, fragment_cache,
+                                      make_page_links, make_query_string,
+                                      safe_eval)
 
 
 def test_safe_eval_valid_expression():
@@ -14,6 +22,58 @@ def test_safe_eval_invalid_expression():
     assert "Error evaluating" in result
 
 
+def test_safe_eval_reuses_compiled_expression():
+    expression_cache.clear()
+    assert safe_eval("a * 2", {"a": 1}) == 2
+    assert safe_eval("a * 2", {"a": 5}) == 10
+    assert expression_cache.stats()["hits"] == 1
+    assert expression_cache.stats()["misses"] == 1
+
+
+def test_safe_eval_syntax_error_not_cached():
+    expression_cache.clear()
+    assert "Error evaluating" in safe_eval("a +", {"a": 1})
+    assert expression_cache.size == 0
+
+
+def test_expression_cache_evicts_least_recently_used():
+    cache = ExpressionCache(maxsize=2)
+    first = cache.get("a")
+    cache.get("b")
+    assert cache.get("a") is first
+    cache.get("c")
+
+    assert cache.size == 2
+    assert cache.get("a") is first
+    assert cache.misses == 3
+    assert cache.hit_rate == pytest.approx(2 / 5)
+
+    cache.resize(1)
+    assert cache.size == 1
+
+
+def test_scope_reads_parent_without_changing_it():
+    root = {"user": "ada", "items": [1, 2]}
+    scope = Scope(root, {"item": 1})
+
+    assert safe_eval("(user, item)", scope) == ("ada", 1)
+    assert "items" in scope and "missing" not in scope
+    assert scope.get("missing", "default") == "default"
+    scope["user"] = "bob"
+    assert root == {"user": "ada", "items": [1, 2]}
+
+
+def test_nested_loops_use_scopes_over_the_context():
+    renderer = TemplateRenderer()
+    parts = renderer._split_template(
+        "{% for row in rows %}{% for cell in row %}"
+        "{{ prefix }}{{ cell }}{% endfor %};{% endfor %}")
+    context = {"rows": [[1, 2], [3]], "prefix": "#"}
+
+    assert "".join(renderer._render_blocks(parts, context)) == "#1#2;#3;"
+    assert context == {"rows": [[1, 2], [3]], "prefix": "#"}
+
+
 def test_split_template():
     renderer = TemplateRenderer()
     code = "Hello {{ name }} {% if condition %}Yes{% endif %}"
@@ -42,3 +102,107 @@ def test_handle_for_non_iterable():
     context = {"y": 123}
     output, _ = renderer._handle_for("x in y", parts, context, 0)
     assert "not iterable" in output[0]
+
+
+def test_template_stream_flushes_head_then_groups_chunks():
+    pieces = ["<html><head>", "</head>", "a" * 10, "", "b" * 10, "é"]
+    chunks = list(TemplateStream(iter(pieces), chunk_size=16))
+    assert chunks == [b"<html><head></head>", b"a" * 10 + b"b" * 10,
+                      "é".encode("utf-8")]
+
+
+def test_stream_template_matches_render_template():
+    renderer = TemplateRenderer()
+    context = {"user": None, "error": "Oups"}
+    stream = renderer.stream_template("index.html", context, chunk_size=64)
+    assert b"".join(stream).decode("utf-8") \
+        == renderer.render_template("index.html", context)
+
+
+def test_fragment_cache_evicts_beyond_byte_budget():
+    cache = FragmentCache(max_bytes=3 * sys.getsizeof("x" * 10))
+    for key in "abcd":
+        cache.set(key, key * 10, ttl=0)
+
+    assert cache.get("a") is None
+    assert cache.get("d") == "dddddddddd"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["fragments"] == 3
+
+
+def test_fragment_cache_expires_entries(monkeypatch):
+    cache = FragmentCache(max_bytes=1024)
+    cache.set("key", "fragment", ttl=10)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+
+    assert cache.get("key") is None
+    assert cache.expirations == 1 and cache.size_bytes == 0
+
+
+def test_cache_tag_renders_fragment_once_per_data_version():
+    renderer = TemplateRenderer()
+    parts = renderer._split_template(
+        "{% cache (item, data_version('items')) 60 %}{{ item }}"
+        "{{ suffix }}{% endcache %}")
+    fragment_cache.clear()
+
+    def render(suffix):
+        return "".join(renderer._render_blocks(parts, {
+            "item": 1, "suffix": suffix, "data_version": data_version}))
+
+    assert render("a") == "1a"
+    assert render("b") == "1a"
+    bump_data_version("items")
+    assert render("b") == "1b"
+    assert fragment_cache.stats()["hits"] == 1
+
+
+def test_cache_tag_invalid_key_renders_without_cache():
+    renderer = TemplateRenderer()
+    parts = ["{% cache missing 60 %}", "{{ value }}", "{% endcache %}",
+             "{% cache value %}", "{% endcache %}"]
+    fragment_cache.clear()
+
+    output = renderer._render_blocks(parts, {"value": "v"})
+
+    assert output == ["v", "[Error: malformed cache tag: 'value']"]
+    assert fragment_cache.stats()["fragments"] == 0
+
+
+class FakePage:
+    has_previous = True
+    has_next = False
+    previous_cursor = 7
+    next_cursor = None
+
+
+def test_make_page_links_keeps_sort_and_page_size():
+    links = make_page_links({"sort": ["title"], "order": ["desc"],
+                             "per_page": ["20"], "after": ["3"]}, FakePage(),
+                            "title", True, 20)
+
+    assert links == {"previous": "?sort=title&order=desc&per_page=20&before=7"}
+
+
+def test_make_page_links_ignores_raw_order_and_page_size():
+    hostile = '"><script>alert(1)</script>'
+    links = make_page_links({"sort": [hostile], "order": [hostile],
+                             "per_page": ['x" onmouseover=alert(1) a="'],
+                             "name": [hostile]}, FakePage(), "id", False, 10)
+
+    assert links["previous"].startswith("?sort=id&order=asc&per_page=10&")
+    assert not set('"<> ') & set(links["previous"])
+
+
+def test_sort_and_page_links_keep_filters():
+    query_params = {"sort": ["title"], "order": ["asc"], "after": ["3"],
+                    "support__isnull": ["1"]}
+
+    sort_links = make_query_string(query_params)
+    page_links = make_page_links(query_params, FakePage(), "title", False,
+                                 10)
+
+    assert sort_links["title"] == "?sort=title&order=desc&support__isnull=1"
+    assert page_links["previous"] == \
+        "?sort=title&order=asc&per_page=10&support__isnull=1&before=7"
@@ -1,9 +1,22 @@
+import gzip
+import http.client
 import io
+import re
+import socket
+import threading
+from http.server import ThreadingHTTPServer
 from unittest.mock import Mock
 
 import pytest
 
+from epic_event import sessions
+from epic_event.asset_pipeline import build_static
+from epic_event.models import Database
+from epic_event.render_engine import TemplateStream
 from epic_event.router import MyHandler
+from epic_event.sessions import MemorySessionStore, SignedCookieSessionStore
+from epic_event.static_files import StaticFiles
+from epic_event.throttling import LoginThrottle
 
 
 def fake_socket():
@@ -43,4 +56,348 @@ def test_send_html_sets_content_type():
     handler._send_html("<h1>Hello</h1>")
 
     handler.send_response.assert_called_once_with(200)
-    handler.send_header.assert_any_call("Content-type", "text/html; charset=utf-8")
\ No newline at end of file
+    handler.send_header.assert_any_call("Content-type", "text/html; charset=utf-8")
+
+
+def test_request_session_uses_shared_session_by_default():
+    handler = make_handler()
+
+    with handler.request_session() as session:
+        assert session is MyHandler.session
+
+
+def test_request_session_opens_one_session_per_request(monkeypatch):
+    monkeypatch.setattr(MyHandler, "database", Database(":memory:"))
+    monkeypatch.setattr(MyHandler, "request_scoped_sessions", True)
+    handler = make_handler()
+
+    with handler.request_session() as first:
+        assert handler.session is first
+        assert first is not MyHandler.session
+
+    with handler.request_session() as second:
+        assert second is not first
+
+    assert handler.session is MyHandler.session
+
+
+def test_send_html_sets_exact_content_length():
+    handler = make_handler()
+    handler.request_version = "HTTP/1.0"
+
+    handler._send_html("<h1>Hélène</h1>")
+
+    head, _, body = handler.wfile.getvalue().partition(b"\r\n\r\n")
+    assert f"Content-Length: {len(body)}".encode() in head
+    assert body == "<h1>Hélène</h1>".encode("utf-8")
+
+
+def test_send_html_compresses_large_pages():
+    handler = make_handler(headers={"Accept-Encoding": "gzip, deflate"})
+    handler.request_version = "HTTP/1.0"
+    content = "<p>Événement</p>" * 200
+
+    handler._send_html(content)
+
+    head, _, body = handler.wfile.getvalue().partition(b"\r\n\r\n")
+    assert b"Content-Encoding: gzip" in head
+    assert b"Vary: Accept-Encoding" in head
+    assert f"Content-Length: {len(body)}".encode() in head
+    assert gzip.decompress(body) == content.encode("utf-8")
+
+
+def test_send_html_does_not_compress_small_pages():
+    handler = make_handler(headers={"Accept-Encoding": "gzip"})
+    handler.request_version = "HTTP/1.0"
+
+    handler._send_html("<h1>Hello</h1>")
+
+    head, _, body = handler.wfile.getvalue().partition(b"\r\n\r\n")
+    assert b"Content-Encoding" not in head
+    assert body == b"<h1>Hello</h1>"
+
+
+def test_send_html_streams_template_with_chunked_encoding():
+    handler = make_handler()
+    handler.protocol_version = "HTTP/1.1"
+    handler.request_version = "HTTP/1.1"
+    stream = TemplateStream(iter(["<head></head>", "<p>a</p>", "<p>b</p>"]),
+                            chunk_size=1000)
+
+    handler._send_html(stream)
+
+    head, _, body = handler.wfile.getvalue().partition(b"\r\n\r\n")
+    assert b"Transfer-Encoding: chunked" in head
+    assert b"Content-Length" not in head
+    assert body == b"D\r\n<head></head>\r\n10\r\n<p>a</p><p>b</p>\r\n" \
+                   b"0\r\n\r\n"
+
+
+def test_send_html_streams_template_until_close_in_http_1_0():
+    handler = make_handler(headers={"Accept-Encoding": "gzip"})
+    handler.request_version = "HTTP/1.0"
+    content = "<p>Événement</p>" * 200
+
+    handler._send_html(TemplateStream(iter([content]), chunk_size=100))
+
+    head, _, body = handler.wfile.getvalue().partition(b"\r\n\r\n")
+    assert b"Connection: close" in head
+    assert b"Content-Encoding: gzip" in head
+    assert gzip.decompress(body) == content.encode("utf-8")
+    assert handler.close_connection
+
+
+def test_send_html_renders_stream_when_streaming_disabled(monkeypatch):
+    monkeypatch.setattr(MyHandler, "stream_html", False)
+    handler = make_handler()
+    handler.request_version = "HTTP/1.0"
+
+    handler._send_html(TemplateStream(iter(["<h1>", "Hello</h1>"])))
+
+    head, _, body = handler.wfile.getvalue().partition(b"\r\n\r\n")
+    assert b"Content-Length: 14" in head
+    assert body == b"<h1>Hello</h1>"
+
+
+def test_serve_static_file_answers_conditional_request():
+    handler = make_handler("/static/styles.css")
+    handler.request_version = "HTTP/1.0"
+    handler.serve_static_file()
+    head, _, body = handler.wfile.getvalue().partition(b"\r\n\r\n")
+    etag = MyHandler.static_files.resolve("styles.css").etag
+
+    assert head.startswith(b"HTTP/1.0 200")
+    assert f"ETag: {etag}".encode() in head
+    assert f"Content-Length: {len(body)}".encode() in head
+
+    handler = make_handler("/static/styles.css",
+                           headers={"If-None-Match": etag})
+    handler.request_version = "HTTP/1.0"
+    handler.serve_static_file()
+
+    assert handler.wfile.getvalue().startswith(b"HTTP/1.0 304")
+    assert handler.wfile.getvalue().endswith(b"\r\n\r\n")
+
+
+def test_serve_static_file_sends_precompressed_variant(tmp_path,
+                                                      monkeypatch):
+    source = tmp_path / "static"
+    source.mkdir()
+    (source / "app.css").write_text("p { margin: 0; }\n" * 100)
+    manifest = build_static(str(source), str(tmp_path / "build"))
+    monkeypatch.setattr(MyHandler, "fingerprinted_files", StaticFiles(
+        str(tmp_path / "build"), cache_control="immutable"))
+
+    handler = make_handler(f"/static/{manifest['app.css']}",
+                           headers={"Accept-Encoding": "gzip"})
+    handler.request_version = "HTTP/1.0"
+    handler.serve_static_file()
+
+    head, _, body = handler.wfile.getvalue().partition(b"\r\n\r\n")
+    assert b"Content-Encoding: gzip" in head
+    assert b"Cache-Control: immutable" in head
+    assert gzip.decompress(body) == (source / "app.css").read_bytes()
+
+
+def test_dispatch_route_method_not_allowed():
+    handler = make_handler("/logout", method="POST")
+    handler.request_version = "HTTP/1.0"
+    handler.command = "POST"
+
+    handler.dispatch_route("POST")
+
+    head = handler.wfile.getvalue().partition(b"\r\n\r\n")[0]
+    assert head.startswith(b"HTTP/1.0 405")
+    assert b"Allow: GET" in head
+
+
+def test_dispatch_route_malformed_pk_is_not_found():
+    handler = make_handler("/events/abc")
+    handler.request_version = "HTTP/1.0"
+    handler.command = "GET"
+
+    handler.dispatch_route("GET")
+
+    assert handler.wfile.getvalue().startswith(b"HTTP/1.0 404")
+
+
+def test_redirect_sets_empty_content_length():
+    handler = make_handler()
+    handler.send_response = Mock()
+    handler.send_header = Mock()
+    handler.end_headers = Mock()
+
+    handler._redirect("/test")
+
+    handler.send_header.assert_any_call("Content-Length", "0")
+
+
+def test_login_answers_503_when_server_is_busy(monkeypatch):
+    monkeypatch.setattr("epic_event.router.login", lambda db, data: {
+        "success": False, "busy": True, "html": "occupé"})
+    handler = make_handler("/login", method="POST")
+    handler.send_response = Mock()
+    handler.send_header = Mock()
+    handler.end_headers = Mock()
+
+    handler.handle_login()
+
+    handler.send_response.assert_called_once_with(503)
+    handler.send_header.assert_any_call("Retry-After", "1")
+
+
+def post_login(body=b"full_name=Admin&password=wrong"):
+    handler = make_handler("/login", method="POST",
+                           headers={"Content-Length": str(len(body))})
+    handler.rfile = io.BytesIO(body)
+    handler.send_response = Mock()
+    handler.send_header = Mock()
+    handler.end_headers = Mock()
+    handler.handle_login()
+    return handler
+
+
+def test_login_refuses_throttled_attempts_before_checking(monkeypatch):
+    calls = []
+    monkeypatch.setattr("epic_event.router.login", lambda db, data: (
+        calls.append(data) or {"success": False, "html": "invalide"}))
+    monkeypatch.setattr(MyHandler, "login_throttle", LoginThrottle(
+        user_burst=2, user_rate=0.01))
+
+    post_login()
+    post_login()
+    handler = post_login()
+
+    assert len(calls) == 2
+    handler.send_response.assert_called_once_with(429)
+    handler.send_header.assert_any_call("Retry-After", "100")
+    assert "Trop de tentatives" in handler.wfile.getvalue().decode("utf-8")
+    assert MyHandler.login_throttle.stats()["user"] == 1
+
+
+def test_login_failures_start_backoff(monkeypatch):
+    monkeypatch.setattr("epic_event.router.login", lambda db, data: {
+        "success": False, "html": "invalide"})
+    monkeypatch.setattr(MyHandler, "login_throttle", LoginThrottle(
+        free_failures=1, backoff_base=30))
+
+    post_login()
+    post_login()
+
+    post_login().send_response.assert_called_once_with(429)
+    assert MyHandler.login_throttle.stats()["backoff"] == 1
+
+
+def test_login_refused_for_concurrency_keeps_user_tokens(monkeypatch):
+    calls = []
+    monkeypatch.setattr("epic_event.router.login", lambda db, data: (
+        calls.append(data) or {"success": False, "html": "invalide"}))
+    monkeypatch.setattr(MyHandler, "login_throttle", LoginThrottle(
+        user_burst=1, user_rate=0.01, max_concurrent=1))
+
+    with MyHandler.login_throttle.verification():
+        post_login().send_response.assert_called_once_with(429)
+    post_login().send_response.assert_called_once_with(200)
+
+    assert len(calls) == 1
+    assert MyHandler.login_throttle.stats()["concurrency"] == 1
+
+
+def toggle_archive_display(store, session_id):
+    previous = sessions.set_session_store(store)
+    body = b"show_archived=on"
+    handler = make_handler("/toggle_archive_display", method="POST",
+                           headers={"Cookie": f"session_id={session_id}",
+                                    "Content-Length": str(len(body))})
+    handler.rfile = io.BytesIO(body)
+    handler.send_response = Mock()
+    handler.send_header = Mock()
+    handler.end_headers = Mock()
+    try:
+        handler.handle_toggle_archive_display()
+    finally:
+        sessions.set_session_store(previous)
+    return handler
+
+
+def test_toggle_archive_display_updates_session():
+    store = MemorySessionStore()
+    session_id = store.create(1, "admin")
+
+    handler = toggle_archive_display(store, session_id)
+
+    assert store.get(session_id).display_archive is True
+    assert not any(call.args[0] == "Set-Cookie"
+                   for call in handler.send_header.call_args_list)
+
+
+def test_toggle_archive_display_sends_signed_cookie_again():
+    store = SignedCookieSessionStore({"1": b"secret"}, "1")
+    session_id = store.create(1, "admin")
+
+    handler = toggle_archive_display(store, session_id)
+
+    cookie = next(call.args[1] for call in handler.send_header.call_args_list
+                  if call.args[0] == "Set-Cookie")
+    new_session_id = sessions.get_session_id({"Cookie": cookie})
+    assert store.get(new_session_id).display_archive is True
+
+
+def test_toggle_archive_display_ignores_missing_session():
+    handler = toggle_archive_display(MemorySessionStore(), "0123-abcd")
+
+    handler.send_response.assert_called_once_with(303)
+
+
+class KeepAliveHandler(MyHandler):
+    protocol_version = "HTTP/1.1"
+    timeout = 5
+    keep_alive_max_requests = 3
+
+
+@pytest.fixture
+def keep_alive_server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_keep_alive_reuses_connection_until_cap(keep_alive_server):
+    connection = http.client.HTTPConnection("127.0.0.1", keep_alive_server,
+                                            timeout=5)
+    responses = []
+    for method, path, body in [("GET", "/", None),
+                               ("POST", "/unknown/1/2/3", "ignored=1"),
+                               ("GET", "/", None)]:
+        connection.request(method, path, body=body)
+        response = connection.getresponse()
+        content = response.read()
+        assert int(response.getheader("Content-Length")) == len(content)
+        responses.append(response)
+    connection.close()
+
+    assert [r.status for r in responses] == [200, 404, 200]
+    assert [r.will_close for r in responses] == [False, False, True]
+
+
+@pytest.mark.parametrize("request_line, body", [
+    ("GET /unknown/create", b""),
+    ("POST /unknown/create", b"name=x"),
+    ("POST /unknown/1/update", b"name=x")])
+def test_keep_alive_unknown_entity_sends_one_response(keep_alive_server,
+                                                      request_line, body):
+    with socket.create_connection(("127.0.0.1", keep_alive_server),
+                                  timeout=5) as client:
+        client.sendall(
+            f"{request_line} HTTP/1.1\r\nHost: x\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+            + b"GET / HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+        data = b""
+        while chunk := client.recv(65536):
+            data += chunk
+
+    status_lines = re.findall(rb"HTTP/1\.1 \d{3}", data)
+    assert status_lines == [b"HTTP/1.1 404", b"HTTP/1.1 200"]
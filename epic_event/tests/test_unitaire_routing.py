@@ -0,0 +1,73 @@
+import pytest
+
+from epic_event.router import MyHandler, route_table
+from epic_event.routing import RouteTable, split_path
+
+
+@pytest.fixture
+def table():
+    table = RouteTable()
+    table.add("GET", "/", "home")
+    table.add("GET", "/<entity>", "list")
+    table.add("GET", "/<entity>/create", "create")
+    table.add("POST", "/<entity>/create", "create_post")
+    table.add("GET", "/<entity>/<int:pk>", "detail")
+    table.add("GET", "/<entity>/<int:pk>/update", "update")
+    table.add("GET", "/collaborators/<int:pk>/password", "password")
+    table.add("GET", "/static/<path:filename>", "static")
+    return table
+
+
+@pytest.mark.parametrize("path, handler, params", [
+    ("/", "home", {}),
+    ("/events", "list", {"entity": "events"}),
+    ("/events/", "list", {"entity": "events"}),
+    ("/events/create", "create", {"entity": "events"}),
+    ("/events/12", "detail", {"entity": "events", "pk": 12}),
+    ("/events/12/", "detail", {"entity": "events", "pk": 12}),
+    ("/events/12/update/", "update", {"entity": "events", "pk": 12}),
+    ("/collaborators/3/password", "password", {"pk": 3}),
+    ("/collaborators/3/update", "update",
+     {"entity": "collaborators", "pk": 3}),
+    ("/static/images/logo.webp", "static", {"filename": "images/logo.webp"}),
+])
+def test_match(table, path, handler, params):
+    route, matched_params, _ = table.match("GET", path)
+
+    assert route.handler == handler
+    assert matched_params == params
+
+
+@pytest.mark.parametrize("path", ["/events/abc", "/events/1/unknown",
+                                  "/events/²", "/events//1", "/a/b/c/d"])
+def test_match_unknown_path(table, path):
+    assert table.match("GET", path) == (None, {}, ())
+
+
+def test_match_method_not_allowed(table):
+    route, _, allowed = table.match("POST", "/events/12")
+
+    assert route is None
+    assert allowed == ("GET",)
+    assert table.match("POST", "/events/create").route.handler == \
+        "create_post"
+
+
+def test_add_rejects_invalid_patterns(table):
+    with pytest.raises(ValueError):
+        table.add("GET", "/<entity>/", "duplicate")
+    with pytest.raises(ValueError):
+        table.add("GET", "/<float:x>", "converter")
+    with pytest.raises(ValueError):
+        table.add("GET", "/files/<path:name>/edit", "path_not_last")
+
+
+def test_routes_lists_declared_routes(table):
+    assert [route.handler for route in table.routes()][:3] == \
+        ["home", "list", "create"]
+    assert split_path("/events/1/") == ["events", "1"]
+
+
+def test_application_routes_exist():
+    for route in route_table.routes():
+        assert callable(getattr(MyHandler, route.handler))
@@ -0,0 +1,315 @@
+import os
+import time
+
+import pytest
+from sqlalchemy import create_engine
+
+from epic_event import sessions
+from epic_event.models import Collaborator
+from epic_event.permission import login_required
+from epic_event.sessions import (MemorySessionStore, SessionRecord,
+                                 SignedCookieSessionStore, SQLiteSessionStore,
+                                 get_session_id)
+
+KEYS = {"1": b"first secret", "2": b"second secret"}
+
+
+def later(monkeypatch, seconds):
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + seconds)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield MemorySessionStore(idle_ttl=60, absolute_ttl=600)
+    else:
+        engine = create_engine(f"sqlite:///{tmp_path / 'sessions.db'}")
+        yield SQLiteSessionStore(engine, idle_ttl=60, absolute_ttl=600,
+                                 touch_interval=0)
+        engine.dispose()
+
+
+def test_get_session_id_reads_cookie():
+    assert get_session_id({"Cookie": "a=1; session_id=12ab-cd"}) == "12ab-cd"
+    assert get_session_id({"Cookie": "session_id=1.eyJ_a-b.c9"}) == \
+        "1.eyJ_a-b.c9"
+    assert get_session_id({"Cookie": "a=1"}) is None
+    assert get_session_id({}) is None
+
+
+def test_record_is_compact():
+    record = SessionRecord(1, "admin", False, 0.0, 0.0)
+
+    assert not hasattr(record, "__dict__")
+
+
+def test_store_creates_reads_and_deletes(store):
+    session_id = store.create(7, "support")
+
+    record = store.get(session_id)
+    assert (record.user_id, record.role, record.display_archive) == \
+        (7, "support", False)
+    assert len(store) == 1
+
+    store.delete(session_id)
+    assert store.get(session_id) is None
+    assert store.get("unknown") is None
+
+
+def test_store_keeps_display_archive(store):
+    session_id = store.create(7, "support")
+
+    assert store.set_display_archive(session_id, True) == session_id
+    assert store.get(session_id).display_archive is True
+    assert store.set_display_archive("unknown", True) is None
+
+
+def test_store_expires_idle_sessions(store, monkeypatch):
+    session_id = store.create(7, "support")
+
+    later(monkeypatch, 61)
+
+    assert store.get(session_id) is None
+
+
+def test_store_expires_sessions_after_absolute_ttl(store, monkeypatch):
+    session_id = store.create(7, "support")
+    now = time.time()
+    for elapsed in range(50, 600, 50):
+        monkeypatch.setattr(time, "time", lambda: now + elapsed)
+        assert store.get(session_id) is not None
+
+    monkeypatch.setattr(time, "time", lambda: now + 601)
+
+    assert store.get(session_id) is None
+
+
+def test_store_sweeps_expired_sessions(store, monkeypatch):
+    store.create(7, "support")
+    kept = store.create(8, "gestion")
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 40)
+    store.get(kept)
+    monkeypatch.setattr(time, "time", lambda: now + 70)
+
+    assert store.sweep() == 1
+    assert len(store) == 1
+    assert store.get(kept) is not None
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemorySessionStore(max_entries=2)
+    first = store.create(1, "admin")
+    second = store.create(2, "admin")
+    store.get(first)
+
+    store.create(3, "admin")
+
+    assert store.get(second) is None
+    assert store.get(first) is not None
+    assert store.evictions == 1
+
+
+def test_sqlite_store_is_shared_and_survives_restarts(tmp_path):
+    url = f"sqlite:///{tmp_path / 'sessions.db'}"
+    engine = create_engine(url)
+    session_id = SQLiteSessionStore(engine).create(7, "support")
+    engine.dispose()
+
+    other = create_engine(url)
+    record = SQLiteSessionStore(other).get(session_id)
+    other.dispose()
+
+    assert record.user_id == 7
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+@pytest.mark.parametrize("make_store", [
+    SQLiteSessionStore,
+    lambda engine: SignedCookieSessionStore(KEYS, "1", engine=engine)])
+def test_session_created_by_one_worker_is_read_by_another(tmp_path,
+                                                          make_store):
+    url = f"sqlite:///{tmp_path / 'sessions.db'}"
+    make_store(create_engine(url)).get("0123-abcd")
+    read_end, write_end = os.pipe()
+
+    pid = os.fork()
+    if pid == 0:
+        session_id = make_store(create_engine(url)).create(7, "support")
+        os.write(write_end, session_id.encode())
+        os._exit(0)
+    os.waitpid(pid, 0)
+    os.close(write_end)
+    session_id = os.read(read_end, 4096).decode()
+    os.close(read_end)
+
+    engine = create_engine(url)
+    assert make_store(engine).get(session_id).user_id == 7
+    engine.dispose()
+
+
+def test_sqlite_store_saves_last_seen_once_per_interval(tmp_path,
+                                                        monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'sessions.db'}")
+    store = SQLiteSessionStore(engine, touch_interval=60)
+    session_id = store.create(7, "support")
+    created = store.get(session_id).last_seen
+
+    later(monkeypatch, 30)
+    assert store.get(session_id).last_seen == created
+    later(monkeypatch, 90)
+    assert store.get(session_id).last_seen > created
+    engine.dispose()
+
+
+def test_sweeper_starts_once_and_stops():
+    store = MemorySessionStore()
+
+    store.start_sweeper(60)
+    stop = store._stop_sweeper
+    store.start_sweeper(60)
+
+    assert store._stop_sweeper is stop
+    store.stop_sweeper()
+    assert stop.is_set()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def signed_store(request, tmp_path):
+    if request.param == "memory":
+        yield SignedCookieSessionStore(KEYS, "1", absolute_ttl=600)
+    else:
+        engine = create_engine(f"sqlite:///{tmp_path / 'sessions.db'}")
+        yield SignedCookieSessionStore(KEYS, "1", absolute_ttl=600,
+                                       engine=engine)
+        engine.dispose()
+
+
+def test_signed_cookie_carries_the_session(signed_store):
+    session_id = signed_store.create(7, "support")
+
+    record = SignedCookieSessionStore(KEYS, "1").get(session_id)
+
+    assert (record.user_id, record.role, record.display_archive) == \
+        (7, "support", False)
+
+
+def test_signed_cookie_rejects_tampering(signed_store):
+    version, payload, signature = signed_store.create(7, "support").split(".")
+    forged = signed_store._issue(SessionRecord(1, "admin", False, 0, 0),
+                                 "x", 0).split(".")[1]
+
+    assert signed_store.get(f"{version}.{forged}.{signature}") is None
+    assert signed_store.get(f"{version}.{payload}.{signature[:-2]}AA") \
+        is None
+    assert signed_store.get(f"9.{payload}.{signature}") is None
+    assert signed_store.get("0123-abcd") is None
+
+
+def test_signed_cookie_expires(signed_store, monkeypatch):
+    session_id = signed_store.create(7, "support")
+
+    later(monkeypatch, 601)
+
+    assert signed_store.get(session_id) is None
+
+
+def test_signed_cookie_is_sent_again_with_display_flag(signed_store):
+    session_id = signed_store.create(7, "support")
+
+    new_session_id = signed_store.set_display_archive(session_id, True)
+
+    assert new_session_id != session_id
+    assert signed_store.get(new_session_id).display_archive is True
+    assert signed_store.get(session_id).display_archive is False
+
+
+def test_signed_cookie_survives_key_rotation():
+    session_id = SignedCookieSessionStore(KEYS, "1").create(7, "support")
+    rotated = SignedCookieSessionStore(KEYS, "2")
+
+    new_session_id = rotated.create(8, "gestion")
+
+    assert rotated.get(session_id).user_id == 7
+    assert new_session_id.startswith("2.")
+    assert SignedCookieSessionStore({"2": KEYS["2"]}, "2").get(
+        session_id) is None
+
+
+def test_signed_cookie_refuses_missing_key():
+    with pytest.raises(ValueError):
+        SignedCookieSessionStore(KEYS, "3")
+
+
+def test_logout_revokes_signed_cookie(signed_store, monkeypatch):
+    session_id = signed_store.create(7, "support")
+    updated = signed_store.set_display_archive(session_id, True)
+
+    signed_store.delete(session_id)
+
+    assert signed_store.get(session_id) is None
+    assert signed_store.get(updated) is None
+    assert signed_store.sweep() == 0
+    later(monkeypatch, 601)
+    assert signed_store.sweep() == 1
+
+
+def test_signed_cookie_revocation_is_shared_through_database(tmp_path,
+                                                            monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'sessions.db'}")
+    worker = SignedCookieSessionStore(KEYS, "1", engine=engine)
+    other_worker = SignedCookieSessionStore(KEYS, "1", engine=engine,
+                                            refresh_interval=5)
+    session_id = worker.create(7, "support")
+    assert other_worker.get(session_id) is not None
+
+    worker.delete(session_id)
+
+    assert other_worker.get(session_id) is not None
+    later(monkeypatch, 6)
+    assert other_worker.get(session_id) is None
+    engine.dispose()
+
+
+@login_required
+def protected_view(**kwargs):
+    return kwargs
+
+
+@pytest.fixture
+def memory_store():
+    store = MemorySessionStore()
+    previous = sessions.set_session_store(store)
+    yield store
+    sessions.set_session_store(previous)
+
+
+def test_login_required_loads_user_of_session(db_session, memory_store):
+    user = Collaborator.filter_by_fields(db_session, role="gestion")[0]
+    session_id = memory_store.create(user.id, user.role)
+    memory_store.set_display_archive(session_id, True)
+
+    kwargs = protected_view(session=db_session, headers={
+        "Cookie": f"session_id={session_id}"})
+
+    assert kwargs["user"] is user
+    assert kwargs["session_id"] == session_id
+    assert kwargs["display_archive"] is True
+
+
+def test_login_required_refuses_unknown_session(db_session, memory_store):
+    page = protected_view(session=db_session, headers={
+        "Cookie": "session_id=0123-abcd"})
+
+    assert "veuillez vous identifier" in page
+
+
+def test_login_required_ends_session_of_missing_user(db_session,
+                                                     memory_store):
+    session_id = memory_store.create(999999, "admin")
+
+    protected_view(session=db_session, headers={
+        "Cookie": f"session_id={session_id}"})
+
+    assert memory_store.get(session_id) is None
@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from epic_event.static_files import StaticFiles, is_not_modified
+
+
+@pytest.fixture
+def static_root(tmp_path):
+    root = tmp_path / "static"
+    (root / "images").mkdir(parents=True)
+    (root / "styles.css").write_text("body { color: red; }")
+    (root / "images" / "big.bin").write_bytes(b"x" * 2048)
+    (tmp_path / "secret.txt").write_text("secret")
+    return root
+
+
+def test_load_caches_small_files_only(static_root):
+    static_files = StaticFiles(str(static_root), max_cached_size=1024)
+
+    css = static_files.assets["styles.css"]
+    big = static_files.assets["images/big.bin"]
+    assert css.content == b"body { color: red; }"
+    assert css.content_type == "text/css"
+    assert css.cache_control == "public, max-age=3600"
+    assert big.content is None
+    assert big.size == 2048
+
+
+@pytest.mark.parametrize("path", ["../secret.txt", "images/../../secret.txt",
+                                  "/etc/passwd", "missing.css", "images"])
+def test_resolve_rejects_paths_outside_root(static_root, path):
+    static_files = StaticFiles(str(static_root))
+
+    assert static_files.resolve(path) is None
+
+
+def test_resolve_reloads_modified_file(static_root):
+    static_files = StaticFiles(str(static_root))
+    etag = static_files.resolve("styles.css").etag
+
+    css = static_root / "styles.css"
+    css.write_text("body { color: blue; margin: 0; }")
+    os.utime(css, ns=(0, 10 ** 18))
+
+    asset = static_files.resolve("styles.css")
+    assert asset.content == b"body { color: blue; margin: 0; }"
+    assert asset.etag != etag
+
+
+def test_is_not_modified(static_root):
+    asset = StaticFiles(str(static_root)).resolve("styles.css")
+
+    assert is_not_modified(asset, {"If-None-Match": asset.etag})
+    assert is_not_modified(asset, {"If-None-Match": f'"a", W/{asset.etag}'})
+    assert not is_not_modified(asset, {"If-None-Match": '"other"'})
+    assert is_not_modified(asset, {"If-Modified-Since": asset.last_modified})
+    assert not is_not_modified(
+        asset, {"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"})
+    assert not is_not_modified(asset, {"If-Modified-Since": "garbage"})
+    # If-None-Match takes precedence over If-Modified-Since.
+    assert not is_not_modified(asset, {
+        "If-None-Match": '"other"',
+        "If-Modified-Since": asset.last_modified})
+    assert not is_not_modified(asset, {})
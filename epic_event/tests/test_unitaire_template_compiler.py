@@ -0,0 +1,103 @@
+import os
+
+import pytest
+
+from epic_event.render_engine import TemplateRenderer, fragment_cache
+
+
+@pytest.fixture
+def renderer(tmp_path):
+    templates = tmp_path / "templates"
+    tags = templates / "templates_tag"
+    tags.mkdir(parents=True)
+    (templates / "base.html").write_text(
+        "<title>{{ title }}</title>{% block content %}{% endblock %}")
+    (templates / "page.html").write_text(
+        "{% extends 'base.html' %}{% block content %}"
+        "{% if items %}{% include 'rows.html' items %}"
+        "{% else %}empty{% endif %}{% endblock %}")
+    (tags / "rows.html").write_text(
+        "{% for item in items %}<li>{{ item * 2 }}</li>{% endfor %}"
+        "{{ missing }}")
+    return TemplateRenderer(template_dir=str(templates), tag_dir=str(tags))
+
+
+@pytest.mark.parametrize("context", [
+    {"title": "T", "items": [1, 2, 3]},
+    {"title": "T", "items": []},
+    {"items": 5},
+])
+def test_compiled_output_matches_interpreter(renderer, context):
+    assert (renderer.render_template("page.html", dict(context))
+            == renderer.render_template_interpreted("page.html",
+                                                    dict(context)))
+
+
+def test_compiled_nested_loops_match_interpreter(renderer, tmp_path):
+    (tmp_path / "templates" / "grid.html").write_text(
+        "{% for row in rows %}{% include 'rows.html' row %}"
+        "{% for item in row %}[{{ item }}{{ items }}]{% endfor %}"
+        "{% endfor %}{{ items }}")
+    context = {"rows": [[1], [2, 3]], "items": "root"}
+
+    assert renderer.render_template("grid.html", dict(context)) \
+        == renderer.render_template_interpreted("grid.html", dict(context))
+
+
+def test_compiled_cache_tag_shares_fragments_with_interpreter(renderer,
+                                                             tmp_path):
+    (tmp_path / "templates" / "cached.html").write_text(
+        "{% for item in items %}{% cache ('row', item) 0 %}"
+        "<li>{{ item }}{{ suffix }}</li>{% endcache %}{% endfor %}")
+    fragment_cache.clear()
+
+    compiled = renderer.render_template(
+        "cached.html", {"items": [1, 2], "suffix": "a"})
+    interpreted = renderer.render_template_interpreted(
+        "cached.html", {"items": [2, 3], "suffix": "b"})
+
+    assert compiled == "<li>1a</li><li>2a</li>"
+    assert interpreted == "<li>2a</li><li>3b</li>"
+    assert fragment_cache.stats()["hits"] == 1
+
+
+def test_compiled_template_is_cached(renderer):
+    renderer.render_template("page.html", {"items": [1]})
+    compiled = renderer.get_compiled("page.html")
+
+    assert renderer.get_compiled("page.html") is compiled
+    assert len(compiled.dependencies) == 3
+
+
+def test_compiled_template_recompiled_when_include_changes(renderer):
+    assert "<li>2</li>" in renderer.render_template("page.html",
+                                                    {"items": [1]})
+    compiled = renderer.get_compiled("page.html")
+
+    rows = os.path.join(renderer.tag_dir, "rows.html")
+    with open(rows, "w", encoding="utf-8") as f:
+        f.write("{% for item in items %}<p>{{ item }}</p>{% endfor %}")
+    stat = os.stat(rows)
+    os.utime(rows, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert renderer.render_template("page.html", {"items": [1]}) \
+        == "<title>[Error evaluating 'title': name 'title' is not " \
+           "defined]</title><p>1</p>"
+    assert renderer.get_compiled("page.html") is not compiled
+
+
+def test_missing_template(renderer):
+    assert renderer.render_template("nope.html", {}) \
+        == "<h1>Template 'nope.html' not found</h1>"
+    assert renderer.get_compiled("nope.html") is None
+
+
+def test_application_templates_match_interpreter():
+    renderer = TemplateRenderer()
+    context = {"user": None, "events": [], "clients": [], "contracts": [],
+               "collaborators": [], "with_sorting": False}
+    for name in sorted(os.listdir(renderer.template_dir)):
+        if name.endswith(".html"):
+            assert (renderer.render_template(name, dict(context))
+                    == renderer.render_template_interpreted(
+                        name, dict(context))), name
@@ -0,0 +1,149 @@
+import time
+
+import pytest
+
+from epic_event.throttling import LoginThrottle, LoginThrottled
+
+
+def later(monkeypatch, seconds):
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + seconds)
+
+
+def make_throttle(**kwargs):
+    options = {"ip_burst": 100, "ip_rate": 1, "user_burst": 100,
+               "user_rate": 1, "free_failures": 2, "backoff_base": 1,
+               "backoff_max": 60}
+    options.update(kwargs)
+    return LoginThrottle(**options)
+
+
+def test_ip_bucket_allows_burst_then_rate(monkeypatch):
+    throttle = make_throttle(ip_burst=3, ip_rate=0.5)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    for name in ("a", "b", "c"):
+        throttle.check("10.0.0.1", name)
+
+    with pytest.raises(LoginThrottled) as refused:
+        throttle.check("10.0.0.1", "d")
+
+    assert refused.value.retry_after == 2
+    throttle.check("10.0.0.2", "d")
+    monkeypatch.setattr(time, "time", lambda: now + 2)
+    throttle.check("10.0.0.1", "d")
+    assert throttle.stats()["ip"] == 1
+
+
+def test_user_bucket_ignores_case_and_client_ip(monkeypatch):
+    throttle = make_throttle(user_burst=2, user_rate=0.1)
+    throttle.check("10.0.0.1", "Admin")
+    throttle.check("10.0.0.2", "admin ")
+
+    with pytest.raises(LoginThrottled) as refused:
+        throttle.check("10.0.0.3", "ADMIN")
+
+    assert "Trop de tentatives de connexion" in str(refused.value)
+    assert throttle.stats()["user"] == 1
+    throttle.check("10.0.0.3", "Alice")
+
+
+def test_failures_start_doubling_backoff(monkeypatch):
+    throttle = make_throttle()
+    for _ in range(2):
+        throttle.record("10.0.0.1", "Admin", False)
+    throttle.check("10.0.0.1", "Admin")
+
+    throttle.record("10.0.0.1", "Admin", False)
+    with pytest.raises(LoginThrottled) as refused:
+        throttle.check("10.0.0.1", "Admin")
+    assert refused.value.retry_after == 1
+
+    later(monkeypatch, 1.5)
+    throttle.record("10.0.0.1", "Admin", False)
+    with pytest.raises(LoginThrottled) as refused:
+        throttle.check("10.0.0.1", "Bob")
+    assert refused.value.retry_after == 2
+    assert throttle.stats()["backoff"] == 2
+
+
+def test_failures_from_other_ips_do_not_lock_the_user_out():
+    throttle = make_throttle()
+    for attempt in range(20):
+        throttle.record(f"10.0.0.{attempt}", "Admin", False)
+        throttle.record(f"10.0.0.{attempt}", "Admin", False)
+        throttle.record(f"10.0.0.{attempt}", "Admin", False)
+
+    throttle.check("10.0.1.1", "Admin")
+
+    with pytest.raises(LoginThrottled):
+        throttle.check("10.0.0.1", "Alice")
+
+
+def test_trusted_ip_is_exempt_from_drained_user_bucket():
+    throttle = make_throttle(user_burst=2, user_rate=0.001)
+    throttle.check("10.0.0.1", "Admin")
+    throttle.record("10.0.0.1", "Admin", True)
+    throttle.check("10.0.0.2", "Admin")
+
+    with pytest.raises(LoginThrottled):
+        throttle.check("10.0.0.3", "Admin")
+
+    throttle.check("10.0.0.1", "Admin")
+
+
+def test_backoff_is_capped(monkeypatch):
+    throttle = make_throttle(backoff_max=10)
+    for _ in range(50):
+        throttle.record("10.0.0.1", "Admin", False)
+
+    with pytest.raises(LoginThrottled) as refused:
+        throttle.check("10.0.0.1", "Admin")
+
+    assert refused.value.retry_after == 10
+
+
+def test_success_clears_failures():
+    throttle = make_throttle()
+    for _ in range(2):
+        throttle.record("10.0.0.1", "Admin", False)
+
+    throttle.record("10.0.0.1", "Admin", True)
+    throttle.record("10.0.0.1", "Admin", False)
+
+    throttle.check("10.0.0.1", "Admin")
+
+
+def test_failures_are_forgotten_after_backoff_max(monkeypatch):
+    throttle = make_throttle(backoff_max=60)
+    for _ in range(3):
+        throttle.record("10.0.0.1", "Admin", False)
+
+    later(monkeypatch, 61)
+    throttle.check("10.0.0.1", "Admin")
+    throttle.record("10.0.0.1", "Admin", False)
+
+    throttle.check("10.0.0.1", "Admin")
+
+
+def test_verification_caps_concurrent_checks():
+    throttle = make_throttle(max_concurrent=1)
+
+    with throttle.verification():
+        with pytest.raises(LoginThrottled):
+            with throttle.verification():
+                pass
+
+    with throttle.verification():
+        pass
+    assert throttle.stats()["concurrency"] == 1
+
+
+def test_tracked_entries_are_bounded():
+    throttle = make_throttle(max_entries=3)
+
+    for index in range(10):
+        throttle.check(f"10.0.0.{index}", "")
+
+    assert throttle.stats()["tracked"] == 3
+    assert throttle.stats()["allowed"] == 10
@@ -0,0 +1,262 @@
+"""
+throttling.py - Limits on login attempts.
+
+Each failed login costs a full bcrypt check, so a script posting
+passwords to /login can take the CPU from every other user.
+`LoginThrottle` refuses such attempts before they reach the database or
+bcrypt:
+    - a token bucket per client IP and one per submitted username bound
+      the rate of attempts, after an allowed burst;
+    - after LOGIN_BACKOFF_FREE_FAILURES failures, the IP, and the IP and
+      username pair, are blocked for a delay doubling at each new failure;
+    - at most LOGIN_MAX_CONCURRENT_CHECKS attempts are checked at once,
+      the others are refused without waiting.
+
+The backoff is not applied to a username alone: otherwise, anyone knowing
+it could keep its owner locked out by failing from other IPs. The
+username bucket still bounds the guesses spread over many IPs; an IP
+which logged in as that user in the last LOGIN_TRUSTED_TTL seconds is
+exempt from it, so that such a flood only slows down unknown IPs.
+
+The place of the concurrency cap is taken before `check`, so that an
+attempt refused for lack of place does not use up the tokens of its IP
+and username.
+
+The state is kept in the process: pre-forked workers each throttle the
+attempts they receive, so that with N workers the limits are up to N
+times looser. Behind a reverse proxy, every attempt comes from
+the proxy's IP, so that only the username limits apply usefully.
+
+Usage:
+    try:
+        with throttle.verification():
+            throttle.check(client_ip, full_name)
+            result = login(db, data)
+    except LoginThrottled as e:
+        ...  # 429, Retry-After: e.retry_after
+    throttle.record(client_ip, full_name, result["success"])
+"""
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from epic_event.settings import (LOGIN_BACKOFF_BASE,
+                                 LOGIN_BACKOFF_FREE_FAILURES,
+                                 LOGIN_BACKOFF_MAX, LOGIN_IP_BURST,
+                                 LOGIN_IP_RATE, LOGIN_MAX_CONCURRENT_CHECKS,
+                                 LOGIN_THROTTLE_MAX_ENTRIES,
+                                 LOGIN_TRUSTED_TTL, LOGIN_USER_BURST,
+                                 LOGIN_USER_RATE)
+
+logger = logging.getLogger(__name__)
+
+
+class LoginThrottled(RuntimeError):
+    """
+    Raised when a login attempt is refused.
+
+    Attributes:
+        retry_after: Seconds before the client may try again.
+    """
+
+    def __init__(self, retry_after: float):
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(
+            "Trop de tentatives de connexion, veuillez réessayer dans "
+            f"{self.retry_after} s.")
+
+
+class Bucket:
+    """
+    Attempts of one client IP, username, or IP and username pair.
+
+    Attributes:
+        tokens: Attempts allowed right now.
+        updated: Time of the last attempt (seconds since the epoch).
+        failures: Failed attempts since the last success.
+        blocked_until: End of the backoff delay.
+        last_success: Time of the last successful login.
+    """
+
+    __slots__ = ("tokens", "updated", "failures", "blocked_until",
+                 "last_success")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+        self.failures = 0
+        self.blocked_until = 0.0
+        self.last_success = 0.0
+
+
+class LoginThrottle:
+    """
+    Rate limits, backoff and concurrency cap of the login attempts.
+
+    Thread-safe.
+
+    Attributes:
+        ip_burst, ip_rate: Token bucket of each client IP (attempts, and
+            attempts per second).
+        user_burst, user_rate: Token bucket of each username.
+        free_failures: Failures allowed before the backoff starts.
+        backoff_base: First backoff delay, in seconds.
+        backoff_max: Longest backoff delay, in seconds.
+        max_concurrent: Attempts checked at once.
+        max_entries: IPs, usernames and pairs tracked (0: no limit).
+        trusted_ttl: Seconds an IP stays exempt from the username bucket
+            after logging in as that user.
+        counters: Attempts allowed, and refused by cause.
+    """
+
+    def __init__(self, ip_burst: float = LOGIN_IP_BURST,
+                 ip_rate: float = LOGIN_IP_RATE,
+                 user_burst: float = LOGIN_USER_BURST,
+                 user_rate: float = LOGIN_USER_RATE,
+                 free_failures: int = LOGIN_BACKOFF_FREE_FAILURES,
+                 backoff_base: float = LOGIN_BACKOFF_BASE,
+                 backoff_max: float = LOGIN_BACKOFF_MAX,
+                 max_concurrent: int = LOGIN_MAX_CONCURRENT_CHECKS,
+                 max_entries: int = LOGIN_THROTTLE_MAX_ENTRIES,
+                 trusted_ttl: float = LOGIN_TRUSTED_TTL):
+        self.ip_burst = ip_burst
+        self.ip_rate = ip_rate
+        self.user_burst = user_burst
+        self.user_rate = user_rate
+        self.free_failures = free_failures
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_concurrent = max_concurrent
+        self.max_entries = max_entries
+        self.trusted_ttl = trusted_ttl
+        self.counters = {"allowed": 0, "ip": 0, "user": 0, "backoff": 0,
+                         "concurrency": 0}
+        self._buckets: "OrderedDict[Tuple[str, ...], Bucket]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._checks = threading.BoundedSemaphore(max_concurrent)
+
+    def _limits(self, client_ip: str, username: str) -> List[
+            Tuple[Tuple[str, ...], Optional[float], float, bool]]:
+        """
+        Return the buckets of an attempt.
+
+        Each one is (key, burst, rate, backoff): burst is None for the
+        pair, which has no token bucket, and backoff tells whether the
+        failures block the key. The pair comes before the username, whose
+        bucket it may exempt.
+        """
+        limits = [(("ip", client_ip), self.ip_burst, self.ip_rate, True)]
+        if username:
+            name = username.strip().lower()
+            limits.append((("pair", client_ip, name), None, 0.0, True))
+            limits.append((("user", name), self.user_burst, self.user_rate,
+                           False))
+        return limits
+
+    def _bucket(self, key: Tuple[str, ...], burst: Optional[float],
+                rate: float, now: float) -> Bucket:
+        """Return the bucket of a key, refilled up to now."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = Bucket(burst or 0.0, now)
+            if self.max_entries and len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+            return bucket
+        self._buckets.move_to_end(key)
+        elapsed = now - bucket.updated
+        if elapsed >= self.backoff_max and bucket.blocked_until <= now:
+            bucket.failures = 0
+        if burst is not None:
+            bucket.tokens = min(burst, bucket.tokens + elapsed * rate)
+        bucket.updated = now
+        return bucket
+
+    def check(self, client_ip: str, username: str) -> None:
+        """
+        Count an attempt, or refuse it.
+
+        Args:
+            client_ip: Address of the client.
+            username: Submitted username (may be empty).
+
+        Raises:
+            LoginThrottled: If the IP or the username is out of attempts,
+                or the IP or the pair is in backoff.
+        """
+        with self._lock:
+            now = time.time()
+            buckets = []
+            trusted = False
+            for key, burst, rate, backoff in self._limits(client_ip,
+                                                          username):
+                bucket = self._bucket(key, burst, rate, now)
+                if key[0] == "pair":
+                    trusted = now - bucket.last_success < self.trusted_ttl
+                if backoff and bucket.blocked_until > now:
+                    self.counters["backoff"] += 1
+                    raise LoginThrottled(bucket.blocked_until - now)
+                if burst is None or (key[0] == "user" and trusted):
+                    continue
+                if bucket.tokens < 1:
+                    self.counters[key[0]] += 1
+                    raise LoginThrottled((1 - bucket.tokens) / rate)
+                buckets.append(bucket)
+            for bucket in buckets:
+                bucket.tokens -= 1
+            self.counters["allowed"] += 1
+
+    @contextmanager
+    def verification(self) -> Iterator[None]:
+        """
+        Hold one of the max_concurrent places while a password is checked.
+
+        Raises:
+            LoginThrottled: If every place is taken.
+        """
+        if not self._checks.acquire(blocking=False):
+            with self._lock:
+                self.counters["concurrency"] += 1
+            raise LoginThrottled(1)
+        try:
+            yield
+        finally:
+            self._checks.release()
+
+    def record(self, client_ip: str, username: str, success: bool) -> None:
+        """
+        Record the outcome of an allowed attempt.
+
+        A success clears the failures of the IP and the pair, and trusts
+        the pair for trusted_ttl seconds; a failure beyond free_failures
+        starts or doubles their backoff.
+        """
+        with self._lock:
+            now = time.time()
+            for key, burst, rate, backoff in self._limits(client_ip,
+                                                          username):
+                if not backoff:
+                    continue
+                bucket = self._bucket(key, burst, rate, now)
+                if success:
+                    bucket.failures = 0
+                    bucket.blocked_until = 0.0
+                    bucket.last_success = now
+                    continue
+                bucket.failures += 1
+                excess = bucket.failures - self.free_failures
+                if excess > 0:
+                    delay = min(self.backoff_base * 2 ** min(excess - 1, 32),
+                                self.backoff_max)
+                    bucket.blocked_until = now + delay
+                    if excess == 1:
+                        logger.warning("Login backoff started for %s",
+                                       " ".join(key))
+
+    def stats(self) -> Dict[str, int]:
+        """Return the counters and the number of tracked keys."""
+        with self._lock:
+            return dict(self.counters, tracked=len(self._buckets))
@@ -1,5 +1,4 @@
 import logging
-import uuid
 from datetime import date, datetime
 from typing import Any, Dict, Union
 
@@ -7,11 +6,14 @@ import sentry_sdk
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from epic_event.models import (SESSION_CONTEXT, Client, Collaborator, Contract,
-                               Event)
+from epic_event import sessions
+from epic_event.models import Client, Collaborator, Contract, Event
+from epic_event.password_hashing import PasswordHashingBusy
 from epic_event.permission import has_permission, login_required, user_can
-from epic_event.render_engine import TemplateRenderer, make_query_string
-from epic_event.settings import entities
+from epic_event.render_engine import (LIST_PARAMETERS, TemplateRenderer,
+                                      TemplateStream, make_page_links,
+                                      make_query_string)
+from epic_event.settings import MAX_PAGE_SIZE, PAGE_SIZE, entities
 
 logger = logging.getLogger(__name__)
 renderer = TemplateRenderer()
@@ -31,11 +33,11 @@ def get_model(entity_name):
     return model
 
 
-def home() -> str:
-    """Render the home page."""
+def home(error: str = "") -> str:
+    """Render the home page, with the login form's error message if any."""
     return renderer.render_template(
         "index.html",
-        {"error": ""})
+        {"error": error})
 
 
 def login(db: Session, data: Dict[str, list[str]]) -> dict:
@@ -53,6 +55,8 @@ def login(db: Session, data: Dict[str, list[str]]) -> dict:
             - {'success': True, 'session_id': str} if authentication succeeds.
             - {'success': False, 'html': str} if authentication fails,
               with rendered login page including an error message.
+            - {'success': False, 'busy': True, 'html': str} if the
+              password could not be checked because the server is busy.
     """
     full_name = data.get("full_name", [""])[0]
     password = data.get("password", [""])[0]
@@ -63,12 +67,22 @@ def login(db: Session, data: Dict[str, list[str]]) -> dict:
 
     if users:
         user = users[0]
-        if user.check_password(password):
-            session_id = str(uuid.uuid4())
-            SESSION_CONTEXT[session_id] = {
-                "user": user,
-                "Display_archive": False
-            }
+        try:
+            valid = user.check_password(password)
+        except PasswordHashingBusy as e:
+            logger.warning("Connexion de %s refusée : %s", full_name, e)
+            return {"success": False, "busy": True,
+                    "html": renderer.render_template("index.html",
+                                                     {"error": str(e)})}
+        if valid:
+            if db.is_modified(user):
+                # check_password rehashed the password at the current
+                # cost; a failed save keeps the old hash, still valid.
+                try:
+                    user.save(db)
+                except SQLAlchemyError:
+                    pass
+            session_id = sessions.session_store.create(user.id, user.role)
             sentry_sdk.set_user({
                 "id": user.id,
                 "username": user.full_name,
@@ -92,7 +106,7 @@ def logout(**kwargs) -> str:
     """
     session_id = kwargs.get("session_id", {})
     if session_id:
-        SESSION_CONTEXT.pop(session_id, None)
+        sessions.session_store.delete(session_id)
         sentry_sdk.set_user(None)
     return renderer.render_template("index.html",
                                     {"error": ""})
@@ -149,7 +163,14 @@ def user_password_post_view(pk, data: Dict[str, str], **kwargs) -> str:
     new = data.get("new_password", "")
     confirm = data.get("confirm_password", "")
 
-    if not user.check_password(current_password):
+    try:
+        valid = user.check_password(current_password)
+    except PasswordHashingBusy as e:
+        return renderer.render_template(
+            "password_change.html",
+            {"user": user, "error": str(e), "success": ""})
+
+    if not valid:
         return renderer.render_template(
             "password_change.html",
             {
@@ -176,7 +197,12 @@ def user_password_post_view(pk, data: Dict[str, str], **kwargs) -> str:
                 "success": ""
             })
 
-    user.set_password(new)
+    try:
+        user.set_password(new)
+    except PasswordHashingBusy as e:
+        return renderer.render_template(
+            "password_change.html",
+            {"user": user, "error": str(e), "success": ""})
     user.save(session)
     return renderer.render_template(
         "password_change.html",
@@ -189,24 +215,31 @@ def user_password_post_view(pk, data: Dict[str, str], **kwargs) -> str:
 
 @login_required
 def entity_list_view(query_params: Dict[str, list[str]],
-                     **kwargs) -> str:
+                     **kwargs) -> Union[str, TemplateStream]:
     """
     Render a list view for the specified entity with sorting and archive filtering.
 
+    The list is paginated by keyset: 'after' (or 'before') is the id of the
+    last (or first) row of the previous (or next) page. The other
+    parameters are filters of the model's `filterable_fields`, with the
+    lookups of `Entity.filter_by_fields` (e.g. '/events?support__isnull=1',
+    '/contracts?signed=0').
+
     Args:
         query_params (Dict[str, list[str]]): HTTP GET query parameters for sorting
-            (e.g., 'sort' and 'order').
+            (e.g., 'sort' and 'order'), pagination ('after', 'before',
+            'per_page') and filtering.
 
     Kwargs:
         session: SQLAlchemy session instance.
         entity_name (str): Name of the entity type to list.
-        session_id: Contextual session identifier for archive filtering.
+        display_archive (bool): Whether the user shows archived entities.
         user: Current authenticated collaborator.
 
     Returns:
-        str: Rendered HTML string of the entity list page or error page.
+        TemplateStream | str: The entity list page, rendered lazily so it
+            can be streamed, or the rendered error page.
     """
-    session_id = kwargs.get("session_id")
     entity_name = kwargs.get("entity_name", "")
     user = kwargs.get("user")
     session = kwargs.get("session")
@@ -224,14 +257,34 @@ def entity_list_view(query_params: Dict[str, list[str]],
     sort_field = query_params.get("sort", ["id"])[0]
     order = query_params.get("order", ["asc"])[0]
     descending = order == "desc"
-    show_archived = SESSION_CONTEXT[session_id].get("Display_archive", False)
+    show_archived = kwargs.get("display_archive", False)
     query_strings = make_query_string(query_params)
+    after = _int_param(query_params, "after")
+    before = _int_param(query_params, "before")
+    per_page = _int_param(query_params, "per_page") or PAGE_SIZE
+    per_page = max(1, min(per_page, MAX_PAGE_SIZE))
+    criteria = []
+    if entity_name == "collaborators":
+        criteria.append(model.role != "admin")
+
+    try:
+        filters = model.parse_filters(
+            {key: values[0] for key, values in query_params.items()
+             if key not in LIST_PARAMETERS and values})
+    except ValueError as e:
+        logger.warning("Erreur de filtre : %s", e)
+        return renderer.render_template(
+            "index.html",
+            {
+                "user": user,
+                "error": f"Filtre invalide : {e}"
+            })
 
     try:
-        items = model.order_by_fields(session, sort_field, descending,
-                                      archived=show_archived)
-        if entity_name == "collaborators":
-            items = [item for item in items if item.role != "admin"]
+        page = model.keyset_page(session, sort_field, descending,
+                                 archived=show_archived, after=after,
+                                 before=before, limit=per_page,
+                                 criteria=criteria, filters=filters)
     except (AttributeError, ValueError) as e:
         logger.warning("Erreur de tri : %s", e)
         return renderer.render_template(
@@ -250,13 +303,15 @@ def entity_list_view(query_params: Dict[str, list[str]],
                 "error": "Erreur base de données lors du tri"
             })
 
-    return renderer.render_template(
+    return renderer.stream_template(
         f"{entity_name}.html",
         {
             "user": user,
-            entity_name: items,
+            entity_name: page.items,
+            "page_links": make_page_links(query_params, page, sort_field,
+                                          descending, per_page),
             "sort": sort_field,
-            "order": order,
+            "order": "desc" if descending else "asc",
             "show_archived": show_archived,
             "sort_links": query_strings,
             "with_sorting": True,
@@ -266,6 +321,14 @@ def entity_list_view(query_params: Dict[str, list[str]],
         })
 
 
+def _int_param(query_params: Dict[str, list[str]], name: str) -> Any:
+    """Return a query parameter as an int, or None if absent or invalid."""
+    try:
+        return int(query_params[name][0])
+    except (KeyError, IndexError, ValueError):
+        return None
+
+
 @login_required
 def entity_detail_view(pk: int, **kwargs) -> str:
     """
@@ -277,14 +340,12 @@ def entity_detail_view(pk: int, **kwargs) -> str:
     Kwargs:
         session: SQLAlchemy session instance.
         entity_name (str): Name of the entity to display.
-        session_id: Contextual session identifier for archive filtering.
+        display_archive (bool): Whether the user shows archived entities.
         user: Current authenticated collaborator.
 
     Returns:
         str: Rendered HTML string of the entity detail page or error page.
     """
-    session_id = kwargs.get("session_id")
-
     entity_name = kwargs.get("entity_name", "")
     user = kwargs.get("user", None)
     session = kwargs.get("session")
@@ -299,13 +360,10 @@ def entity_detail_view(pk: int, **kwargs) -> str:
                 "error": "Entité inconnue"
             })
 
-    items = model.filter_by_fields(session,
-                                   archived=SESSION_CONTEXT[session_id].get(
-                                       "Display_archive",
-                                       False),
-                                   id=pk
-                                   )
-    if not items:
+    item = model.get(session, pk,
+                     include_archived=kwargs.get("display_archive", False),
+                     load_plan="detail")
+    if not item:
         logger.exception(
             "L'entité %s avec l'id=%s est introuvable", entity_name, pk)
         return renderer.render_template(
@@ -315,7 +373,6 @@ def entity_detail_view(pk: int, **kwargs) -> str:
                 "error": f"{entity_name.capitalize()} introuvable"
             })
 
-    item = items[0]
     context = {
         "user": user,
         "with_sorting": False,
@@ -430,7 +487,12 @@ def entity_create_post_view(data: Dict[str, Any], **kwargs) -> Union[
             email=data["email"],
             role=data["role"]
         )
-        instance.set_password(data["password"])
+        try:
+            instance.set_password(data["password"])
+        except PasswordHashingBusy as e:
+            return renderer.render_template(
+                f"{entity_name}_create.html",
+                {"user": user, "error": str(e)})
 
     elif entity_name == "contracts":
         data["signed"] = Contract.normalize_signed(data["signed"])
@@ -487,8 +549,9 @@ def entity_update_view(pk: int, **kwargs) -> str:
     Kwargs:
         session: SQLAlchemy session.
         entity_name (str): Name of the entity to update.
-        session_id: Current session context ID.
+        display_archive (bool): Whether the user shows archived entities.
         user: Current authenticated collaborator.
+        item: The entity, as loaded by the permission check.
         headers (Optional[Dict[str, str]]): A dictionary of HTTP headers passed
          from the request context.
 
@@ -497,7 +560,6 @@ def entity_update_view(pk: int, **kwargs) -> str:
 
     """
 
-    session_id = kwargs.get("session_id")
     user = kwargs.get("user")
     entity_name = kwargs.get("entity_name")
     session = kwargs.get("session")
@@ -511,18 +573,15 @@ def entity_update_view(pk: int, **kwargs) -> str:
                 "user": user,
                 "error": "Entité inconnue"})
 
-    items = model.filter_by_fields(session,
-                                   archived=SESSION_CONTEXT[session_id].get(
-                                       "Display_archive",
-                                       False),
-                                   id=pk
-                                   )
+    item = kwargs.get("item") or model.get(
+        session, pk,
+        include_archived=kwargs.get("display_archive", False))
     context = {
         "user": user,
-        entity_name[:-1]: items[0],
+        entity_name[:-1]: item,
         "error": ""
     }
-    if not items:
+    if not item:
         logger.exception(
             "L'entité %s entity_name avec l'id= %s pk est introuvable",
             entity_name, pk)
@@ -559,8 +618,9 @@ def entity_update_post_view(pk: int,
     Kwargs:
         session: SQLAlchemy session.
         entity_name (str): Name of the entity.
-        session_id: Current session context ID.
+        display_archive (bool): Whether the user shows archived entities.
         user: Current authenticated collaborator.
+        item: The entity, as loaded by the permission check.
 
     Returns:
         bool or str: True if successful, otherwise the rendered error template.
@@ -571,7 +631,6 @@ def entity_update_post_view(pk: int,
         SQLAlchemyError: If a database error occurs during the commit.
     """
 
-    session_id = kwargs.get("session_id")
     user = kwargs.get("user")
     entity_name = kwargs.get("entity_name")
     session = kwargs.get("session")
@@ -585,13 +644,10 @@ def entity_update_post_view(pk: int,
                 "user": user,
                 "error": "Entité inconnue"})
 
-    items = model.filter_by_fields(session,
-                                   archived=SESSION_CONTEXT[session_id].get(
-                                       "Display_archive",
-                                       False),
-                                   id=pk
-                                   )
-    if not items:
+    instance = kwargs.get("item") or model.get(
+        session, pk,
+        include_archived=kwargs.get("display_archive", False))
+    if not instance:
         logger.exception(
             "L'entité %s avec l'id=%s est introuvable",
             entity_name, pk)
@@ -602,8 +658,6 @@ def entity_update_post_view(pk: int,
                 "error": f"{entity_name.capitalize()} introuvable"
             })
 
-    instance = items[0]
-
     try:
         if entity_name == "events":
             data["start_date"] = Event.combine_datetime(data, "start", instance.start_date)
@@ -696,6 +750,7 @@ def entity_delete_view(pk: int, **kwargs) -> \
         session: SQLAlchemy session instance.
         user: Current authenticated collaborator.
         entity_name (str): Name of the entity to delete.
+        item: The entity, as loaded by the permission check.
 
     Returns:
         Union[bool, str]:
@@ -722,9 +777,9 @@ def entity_delete_view(pk: int, **kwargs) -> \
                 "error": "Entité inconnue"
             })
 
-    items = model.filter_by_fields(session, id=pk)
+    item = kwargs.get("item") or model.get(session, pk)
 
-    if not items:
+    if not item:
         logger.exception(
             "L'entité %s avec l'id=%s est introuvable",
             entity_name, pk)
@@ -735,8 +790,6 @@ def entity_delete_view(pk: int, **kwargs) -> \
                 "error": f"{entity_name.capitalize()} introuvable"
             })
 
-    item = items[0]
-
     try:
         model.soft_delete(session, pk)
         logger.info(
@@ -777,6 +830,7 @@ def client_contact_view(client_id: int, **kwargs) -> Union[bool, str]:
     Kwargs:
         session: SQLAlchemy session instance.
         user: Current authenticated collaborator.
+        item: The client, as loaded by the permission check.
 
     Returns:
         Union[bool, str]:
@@ -792,8 +846,8 @@ def client_contact_view(client_id: int, **kwargs) -> Union[bool, str]:
     user = kwargs.get("user")
     session = kwargs.get("session")
 
-    clients = Client.filter_by_fields(session, id=client_id)
-    if not clients:
+    client = kwargs.get("item") or Client.get(session, client_id)
+    if not client:
         logger.exception("Client introuvable")
         return renderer.render_template(
             "index.html",
@@ -801,8 +855,6 @@ def client_contact_view(client_id: int, **kwargs) -> Union[bool, str]:
                 "user": user,
                 "error": "Client introuvable"
             })
-
-    client = clients[0]
     try:
         client.last_contact_date = datetime.today().date()
         client.validate_all(session)
@@ -1,18 +1,72 @@
 import argparse
+import asyncio
 import logging.config
 import os
 import subprocess
 import sys
-from http.server import HTTPServer
+from http.server import HTTPServer, ThreadingHTTPServer
 from pathlib import Path
 
 import sentry_sdk
 from sentry_sdk.integrations.logging import LoggingIntegration
 
-from epic_event.models import Database, load_data_in_database
+from epic_event import sessions
+from epic_event.async_server import AsyncHTTPServer
+from epic_event.data_versions import share_data_versions
+from epic_event.models import Database, collaborator, load_data_in_database
 from epic_event.models.utils import load_super_user, load_test_data_in_database
+from epic_event.password_hashing import PasswordHashingService
+from epic_event.prefork import (PreforkSupervisor, PreforkWorkerServer,
+                                ThreadingPreforkWorkerServer,
+                                create_listen_socket)
 from epic_event.router import MyHandler
-from epic_event.settings import DATABASES, PORT, SENTRY_DSN, setup_logging
+from epic_event.sessions import SignedCookieSessionStore, SQLiteSessionStore
+from epic_event.settings import (DATABASE_PRAGMAS, DATABASES,
+                                 KEEP_ALIVE_TIMEOUT, PORT, SENTRY_DSN,
+                                 SESSION_BACKEND, SESSION_SIGNING_KEY_VERSION,
+                                 SESSION_SIGNING_KEYS, SESSION_SWEEP_INTERVAL,
+                                 WAL_CHECKPOINT_INTERVAL, WORKER_MAX_REQUESTS,
+                                 WORKER_MAX_RSS_MB, setup_logging)
+
+parser = argparse.ArgumentParser(
+    description="Lancer le serveur en mode normal ou test.")
+parser.add_argument("mode", nargs="?", default="main",
+                    choices=["main", "test", "demo"])
+parser.add_argument("--engine", choices=["http", "asyncio"], default="http",
+                    help="Moteur du serveur : http.server (par défaut) ou "
+                         "asyncio.")
+parser.add_argument("--threaded", action="store_true",
+                    help="Traiter chaque requête dans un thread, "
+                         "avec sa propre session SQLAlchemy.")
+parser.add_argument("--keep-alive", action="store_true",
+                    help="Connexions HTTP/1.1 persistantes (implique "
+                         "--threaded).")
+parser.add_argument("--workers", type=int, default=0,
+                    help="Nombre de processus workers pré-forkés "
+                         "(0 : un seul processus).")
+parser.add_argument("--max-requests", type=int, default=WORKER_MAX_REQUESTS,
+                    help="Requêtes traitées avant le recyclage d'un worker "
+                         "(0 : illimité).")
+parser.add_argument("--max-rss-mb", type=int, default=WORKER_MAX_RSS_MB,
+                    help="Mémoire résidente (Mo) au-delà de laquelle un "
+                         "worker est recyclé (0 : illimitée).")
+
+args = parser.parse_args()
+operating_mode = args.mode
+
+if args.workers and not hasattr(os, "fork"):
+    parser.error("--workers n'est disponible que sur un système POSIX.")
+if args.workers and args.engine == "asyncio":
+    parser.error("--workers n'est disponible qu'avec le moteur http.")
+if args.keep_alive:
+    # An idle persistent connection would block a single-threaded server.
+    args.threaded = True
+
+# The bcrypt process pool is forked first, while the process has a single
+# thread: sentry_sdk.init starts threads, and a fork may copy their locks
+# in a held state. Pre-forked workers run bcrypt inline: each one is a
+# process.
+password_service = None if args.workers else PasswordHashingService()
 
 sentry_logging = LoggingIntegration(level=logging.INFO,
                                     event_level=logging.INFO)
@@ -29,21 +83,37 @@ setup_logging()
 logger = logging.getLogger(__name__)
 logger.info("Serveur lancé avec journalisation.")
 
-parser = argparse.ArgumentParser(
-    description="Lancer le serveur en mode normal ou test.")
-parser.add_argument("mode", nargs="?", default="main",
-                    choices=["main", "test", "demo"])
 
-args = parser.parse_args()
-operating_mode = args.mode
+def remove_database(path):
+    """Delete a database file, with its write-ahead log and shared memory."""
+    for file in (path, Path(f"{path}-wal"), Path(f"{path}-shm")):
+        if file.exists():
+            os.remove(file)
+
+
+def use_session_store(db):
+    """
+    Replace the memory session store according to SESSION_BACKEND.
+
+    Pre-forked workers each have their own memory: they share the sessions
+    in SQLite instead. The stores use the engine of `db`.
+    """
+    if SESSION_BACKEND == "signed":
+        sessions.set_session_store(SignedCookieSessionStore(
+            SESSION_SIGNING_KEYS, SESSION_SIGNING_KEY_VERSION,
+            engine=db.engine))
+    elif SESSION_BACKEND == "sqlite" or args.workers:
+        sessions.set_session_store(SQLiteSessionStore(db.engine))
+
 
 if operating_mode == "demo":
     path = Path(DATABASES[operating_mode])
-    if path.exists():
-        os.remove(path)
+    remove_database(path)
 
-database = Database(DATABASES[operating_mode])
+database = Database(DATABASES[operating_mode],
+                    DATABASE_PRAGMAS[operating_mode])
 database.initialize_database()
+use_session_store(database)
 
 session = database.get_session()
 
@@ -56,11 +126,101 @@ else:
 
 MyHandler.session = session
 MyHandler.database = database
+MyHandler.request_scoped_sessions = args.threaded
+if args.keep_alive:
+    MyHandler.protocol_version = "HTTP/1.1"
+    MyHandler.timeout = KEEP_ALIVE_TIMEOUT
+
+
+def run_worker(listen_socket):
+    """
+    Serve requests in a pre-forked worker until it is recycled.
+
+    The worker builds its own database engine: connections opened by the
+    parent must not be shared across the fork. The data versions of the
+    fragment cache are shared with the other workers through it. Each
+    request gets its own session, so that none sees objects loaded before
+    another worker changed them.
+    """
+    worker_database = Database(DATABASES[operating_mode],
+                               DATABASE_PRAGMAS[operating_mode])
+    share_data_versions(worker_database.engine)
+    worker_database.start_checkpoints(WAL_CHECKPOINT_INTERVAL)
+    use_session_store(worker_database)
+    sessions.session_store.start_sweeper(SESSION_SWEEP_INTERVAL)
+    MyHandler.database = worker_database
+    MyHandler.session = None
+    MyHandler.request_scoped_sessions = True
+
+    worker_class = (ThreadingPreforkWorkerServer if args.threaded
+                    else PreforkWorkerServer)
+    httpd = worker_class(listen_socket, MyHandler,
+                         max_requests=args.max_requests,
+                         max_rss_mb=args.max_rss_mb)
+    try:
+        httpd.serve_until_recycled()
+    finally:
+        httpd.server_close()
+        sessions.session_store.stop_sweeper()
+        worker_database.stop_checkpoints()
+        worker_database.engine.dispose()
+
+
+def start_background_threads():
+    """Start the WAL checkpoints and the session sweeper."""
+    database.start_checkpoints(WAL_CHECKPOINT_INTERVAL)
+    sessions.session_store.start_sweeper(SESSION_SWEEP_INTERVAL)
+
+
+def log_login_throttling():
+    """Log the login attempts allowed and refused since the start."""
+    logger.info("Tentatives de connexion : %s",
+                MyHandler.login_throttle.stats())
+
+
+def serve(server_address):
+    """
+    Serve until interrupted with the engine chosen on the command line.
+
+    Both engines use the bcrypt process pool forked at startup.
+    """
+    if args.engine == "asyncio":
+        server = AsyncHTTPServer(server_address,
+                                 cpu_executor=password_service)
+        start_background_threads()
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            pass
+        log_login_throttling()
+        return
+
+    if args.workers:
+        listen_socket = create_listen_socket(server_address)
+        session.close()
+        database.engine.dispose()
+        PreforkSupervisor(listen_socket, args.workers,
+                          run_worker).serve_forever()
+        return
+
+    collaborator.password_executor = password_service
+    start_background_threads()
+    server_class = ThreadingHTTPServer if args.threaded else HTTPServer
+    httpd = server_class(server_address, MyHandler)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        collaborator.password_executor = None
+        password_service.shutdown()
+        log_login_throttling()
+
 
 if __name__ == "__main__":
     port = PORT[operating_mode]
     server_address = ("", port)
-    httpd = HTTPServer(server_address, MyHandler)
 
     if operating_mode == "demo":
 
@@ -72,12 +232,7 @@ if __name__ == "__main__":
         if choice == "1":
             print(
                 f"Serveur actif en mode manuel sur http://localhost:{port}")
-            try:
-                httpd.serve_forever()
-            except KeyboardInterrupt:
-                pass
-            finally:
-                httpd.server_close()
+            serve(server_address)
 
         elif choice == "2":
             print("Démarrage automatique : serveur + démo Selenium")
@@ -86,21 +241,14 @@ if __name__ == "__main__":
             print(f"Serveur actif sur http://localhost:{port}")
 
             try:
-                httpd.serve_forever()
-            except KeyboardInterrupt:
-                pass
+                serve(server_address)
             finally:
-                httpd.server_close()
                 selenium_process.terminate()
-                os.remove(path)
+                database.engine.dispose()
+                remove_database(path)
         else:
             print("Choix invalide. Arrêt.")
 
     else:
         print(f"Serveur actif sur http://localhost:{port}")
-        try:
-            httpd.serve_forever()
-        except KeyboardInterrupt:
-            pass
-        finally:
-            httpd.server_close()
+        serve(server_address)